@@ -54,17 +54,23 @@ REST_FRAMEWORK = {
     ],
 }
 
+# The core.pipeline classes are the stock session/CSRF/auth/messages/
+# clickjacking middleware, skipped for LEAN_MIDDLEWARE_PREFIXES: the JWT-only
+# JSON API under /api/ doesn't pay for them, while /admin/ keeps the full stack.
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.pipeline.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.pipeline.CsrfViewMiddleware',
+    'core.pipeline.AuthenticationMiddleware',
+    'core.pipeline.MessageMiddleware',
+    'core.pipeline.XFrameOptionsMiddleware',
+    'core.middleware.JWTPrincipalMiddleware',  # bearer token parsed once per request
 ]
 
+LEAN_MIDDLEWARE_PREFIXES = ['/api/']
+
 # CORS Settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = False  # Changed to False to avoid conflicts
@@ -160,6 +166,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. PBKDF2 iterations are tuned per host with
+# `python manage.py calibrate_password_hasher` (see core/hashers.py). The
+# login views rehash any password stored with a non-preferred hasher or
+# outdated parameters on its next successful login.
+PASSWORD_HASHERS = [
+    'core.hashers.CalibratedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# Local development only: PASSWORD_HASHER_PROFILE=fast puts MD5 first so
+# create_dummy_data.py seeds in seconds. Run the server with the same profile
+# to log in as the seeded accounts; the default list can't verify MD5. Never
+# set it in production. The test suite uses MD5 via backend/test_settings.py.
+if os.environ.get('PASSWORD_HASHER_PROFILE') == 'fast':
+    PASSWORD_HASHERS.insert(0, 'django.contrib.auth.hashers.MD5PasswordHasher')
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -191,3 +215,31 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
+
+# Core authentication tuning (defaults live in core/conf.py)
+CORE_AUTH = {
+    "USER_CACHE_SIZE": 2048,
+    # Saving or deactivating a user only clears the cache of the process that
+    # made the change. Every other worker keeps serving its copy, is_active and
+    # is_staff included, for up to USER_CACHE_TTL seconds (and keeps accepting
+    # the user's retired tokens for up to TOKEN_VERSION_CACHE_TTL). Lower both
+    # if a deactivation must bite sooner.
+    "USER_CACHE_TTL": 30,
+    # Set to a CACHES alias (e.g. "default" backed by Redis/Memcached) to share
+    # resolved users across workers. The shared entry is cleared on save, but
+    # the staleness window above still applies to each worker's local copy.
+    "USER_CACHE_BACKEND": None,
+    "TOKEN_CACHE_SIZE": 4096,
+    # Switch to "legacy" while servers that only read list claims are still live
+    "TOKEN_CLAIMS_FORMAT": "compact",
+    # Login password checks run on a bounded pool; beyond MAX_PENDING logins get 503
+    "PASSWORD_POOL_WORKERS": 2,
+    "PASSWORD_POOL_MAX_PENDING": 16,
+    # Login attempts per phone / per IP. Set LOGIN_THROTTLE_BACKEND to a shared
+    # CACHES alias so the limits hold across workers instead of per process.
+    "LOGIN_THROTTLE_PHONE_RATE": "5/min",
+    "LOGIN_THROTTLE_IP_RATE": "30/min",
+    "LOGIN_THROTTLE_BACKEND": None,
+    # Written by `manage.py calibrate_password_hasher --write`; host-specific
+    "PASSWORD_HASHER_CALIBRATION_FILE": os.path.join(BASE_DIR, 'password_hasher.json'),
+}
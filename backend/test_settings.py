@@ -0,0 +1,26 @@
+"""
+Settings for the test suite: pytest (see pytest.ini) and `manage.py test`.
+
+    python manage.py test --settings=backend.test_settings
+    DJANGO_SETTINGS_MODULE=backend.test_settings pytest
+"""
+
+from backend.settings import *  # noqa: F401,F403
+from backend.settings import BASE_DIR, DATABASES, PASSWORD_HASHERS as _PASSWORD_HASHERS
+
+
+# MD5 first so the suite isn't dominated by hashing (what
+# PASSWORD_HASHER_PROFILE=fast does for local seeding).
+_MD5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+PASSWORD_HASHERS = [_MD5] + [hasher for hasher in _PASSWORD_HASHERS if hasher != _MD5]
+
+# The threaded booking tests (core/test_booking.py) need writers that queue.
+# SQLite's default in-memory test database is shared-cache, where a second
+# writer fails at once with "table is locked"; on disk, with IMMEDIATE
+# transactions and a busy timeout, it waits its turn instead.
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'] = {
+        **DATABASES['default'],
+        'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+        'TEST': {'NAME': str(BASE_DIR / 'test_db.sqlite3')},
+    }
@@ -1,8 +1,20 @@
+from functools import lru_cache
+from types import MappingProxyType
+
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from core.models import User
+from core.user_cache import get_user_cache
+from core.conf import auth_settings
+from core.token_cache import get_token_cache
+from core.revocation import get_revocation_list, is_token_revoked
+from core.token_version import TOKEN_VERSION_CLAIM, ROLE_VERSION_CLAIM, get_token_version_cache, token_versions
+from core.middleware import TokenResolution, aresolve_request_token, resolve_request_token
+from core.principal import token_principal
+from core.claims import encode_claims, has_permission_claims, has_role_claims
 
 """
 OPTIMIZATION: Token-Based Role Extraction
@@ -56,49 +68,68 @@ def compute_user_roles(user):
     return sorted(set(roles))
 
 
-def get_user_permissions(user, roles):
+# Role -> permission matrix, built once at import. Roles are listed in
+# precedence order: a user gets the permissions of their highest role only.
+ROLE_PRECEDENCE = ('superuser', 'admin', 'staff', 'student')
+
+ROLE_PERMISSIONS = MappingProxyType({
+    'superuser': frozenset([
+        'user.create', 'user.read', 'user.update', 'user.delete',
+        'mess.create', 'mess.read', 'mess.update', 'mess.delete',
+        'booking.create', 'booking.read', 'booking.update', 'booking.delete',
+        'coupon.create', 'coupon.read', 'coupon.update', 'coupon.delete',
+        'report.read', 'report.export', 'audit.read'
+    ]),
+    'admin': frozenset([
+        'user.read', 'user.update', 'user.delete',
+        'mess.create', 'mess.read', 'mess.update', 'mess.delete',
+        'booking.read', 'booking.update', 'booking.delete',
+        'coupon.create', 'coupon.read', 'coupon.update', 'coupon.delete',
+        'report.read', 'report.export', 'audit.read'
+    ]),
+    'staff': frozenset([
+        'user.read',
+        'mess.read', 'mess.update',
+        'booking.read', 'booking.update',
+        'coupon.create', 'coupon.read', 'coupon.update',
+        'report.read'
+    ]),
+    'student': frozenset([
+        'user.read', 'user.update',  # Typically refers to own profile
+        'mess.read',
+        'booking.create', 'booking.read', 'booking.update',  # Own bookings
+        'coupon.read',  # Own coupons
+    ]),
+})
+
+# All authenticated users
+BASE_PERMISSIONS = frozenset(['auth.login', 'auth.logout', 'auth.refresh'])
+
+
+@lru_cache(maxsize=64)
+def effective_permissions(roles):
     """
-    Get user permissions based on roles.
-    You can replace this with Django permissions/groups if needed.
+    Effective permissions for a frozenset of roles, memoized per role set.
+    There are only a handful of distinct role sets, so this is computed a few
+    times per process at most.
     """
-    permissions = []
-
-    if 'superuser' in roles:
-        permissions.extend([
-            'user.create', 'user.read', 'user.update', 'user.delete',
-            'mess.create', 'mess.read', 'mess.update', 'mess.delete',
-            'booking.create', 'booking.read', 'booking.update', 'booking.delete',
-            'coupon.create', 'coupon.read', 'coupon.update', 'coupon.delete',
-            'report.read', 'report.export', 'audit.read'
-        ])
-    elif 'admin' in roles:
-        permissions.extend([
-            'user.read', 'user.update', 'user.delete',
-            'mess.create', 'mess.read', 'mess.update', 'mess.delete',
-            'booking.read', 'booking.update', 'booking.delete',
-            'coupon.create', 'coupon.read', 'coupon.update', 'coupon.delete',
-            'report.read', 'report.export', 'audit.read'
-        ])
-    elif 'staff' in roles:
-        permissions.extend([
-            'user.read',
-            'mess.read', 'mess.update',
-            'booking.read', 'booking.update',
-            'coupon.create', 'coupon.read', 'coupon.update',
-            'report.read'
-        ])
-    elif 'student' in roles:
-        permissions.extend([
-            'user.read', 'user.update',  # Typically refers to own profile
-            'mess.read',
-            'booking.create', 'booking.read', 'booking.update',  # Own bookings
-            'coupon.read',  # Own coupons
-        ])
+    for role in ROLE_PRECEDENCE:
+        if role in roles:
+            return ROLE_PERMISSIONS[role] | BASE_PERMISSIONS
+    return BASE_PERMISSIONS
 
-    # All authenticated users
-    permissions.extend(['auth.login', 'auth.logout', 'auth.refresh'])
 
-    return sorted(set(permissions))
+@lru_cache(maxsize=64)
+def _sorted_permissions(roles):
+    return tuple(sorted(effective_permissions(roles)))
+
+
+def get_user_permissions(user, roles):
+    """
+    Get user permissions based on roles.
+    Reads the precomputed ROLE_PERMISSIONS matrix; returns a new sorted list.
+    """
+    return list(_sorted_permissions(frozenset(roles)))
 
 
 # ---------------------------------
@@ -109,53 +140,126 @@ class CoreUserJWTAuthentication(JWTAuthentication):
     JWT auth that fetches users from core_user instead of auth_user.
     Includes role-based authentication support.
     Optimized to extract roles from JWT token instead of computing from database.
+
+    With claims_only enabled (per class, or globally via
+    CORE_AUTH["CLAIMS_ONLY_PRINCIPAL"]) the user is a ClaimsPrincipal built from
+    the token and the User row is only loaded if a view needs a non-claim field.
+
+    Async views call aauthenticate() instead, which returns the same result
+    without blocking the event loop:
+    user, token = await CoreUserJWTAuthentication().aauthenticate(request)
     """
+    claims_only = None  # None -> follow CORE_AUTH["CLAIMS_ONLY_PRINCIPAL"]
 
-    def get_user(self, validated_token):
-        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+    def use_claims_only(self):
+        if self.claims_only is None:
+            return auth_settings.CLAIMS_ONLY_PRINCIPAL
+        return self.claims_only
 
-        if user_id is None:
-            raise AuthenticationFailed("Token contained no user_id")
+    def get_validated_token(self, raw_token):
+        """
+        Reuse an earlier verification of the same raw token when possible.
+        Misses fall through to simplejwt, which raises InvalidToken as usual.
+        Revoked tokens raise InvalidToken too.
+        """
+        token_cache = get_token_cache()
+        validated_token = token_cache.get(raw_token)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.put(raw_token, validated_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
 
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
         try:
-            user = User.objects.get(pk=user_id)
+            # Served from the two-tier user cache; only a miss reaches core_user
+            user = get_user_cache().get_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        return self._check_active(user)
+
+    async def aget_user(self, validated_token):
+        """Async get_user()."""
+        user_id = self._user_id(validated_token)
+        try:
+            user = await get_user_cache().aget_user(user_id)
         except User.DoesNotExist:
             raise AuthenticationFailed("User not found", code="user_not_found")
+        return self._check_active(user)
 
+    @staticmethod
+    def _user_id(validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise AuthenticationFailed("Token contained no user_id")
+        return user_id
+
+    @staticmethod
+    def _check_active(user):
         if not user.is_active:
             raise AuthenticationFailed("User inactive", code="user_inactive")
-
         return user
 
+    @staticmethod
+    def _validated(resolution):
+        """The resolution's token; None without credentials, raises for bad ones."""
+        if resolution.reason in (TokenResolution.MISSING, TokenResolution.BAD_FORMAT):
+            return None
+        if resolution.token is None:
+            raise InvalidToken(resolution.error['message'])
+        return resolution.token
+
     def authenticate(self, request):
         """
         Override authenticate to extract role information from JWT token.
         This is more efficient as it avoids database queries for role computation.
         """
-        header = self.get_header(request)
-        if header is None:
+        # Token parsed once per request (JWTPrincipalMiddleware), shared with
+        # the decorators in core/decorators.py
+        resolution = resolve_request_token(request)
+        validated_token = self._validated(resolution)
+        if validated_token is None:
             return None
 
-        raw_token = self.get_raw_token(header)
-        if raw_token is None:
+        if self.use_claims_only():
+            return (resolution.principal, validated_token)
+
+        return (self._annotate(self.get_user(validated_token), validated_token), validated_token)
+
+    async def aauthenticate(self, request):
+        """Async authenticate() for async views."""
+        resolution = await aresolve_request_token(request)
+        validated_token = self._validated(resolution)
+        if validated_token is None:
             return None
 
-        validated_token = self.get_validated_token(raw_token)
-        user = self.get_user(validated_token)
+        if self.use_claims_only():
+            return (resolution.principal, validated_token)
 
-        # Extract roles from JWT token instead of computing from database
-        # This is more efficient as roles are already computed and stored in token
-        user.roles = validated_token.get('roles', [])
-        user.permissions = validated_token.get('permissions', [])
-        
-        # Also extract other user info from token for convenience
-        user.token_name = validated_token.get('name', '')
-        user.token_email = validated_token.get('email', '')
-        user.token_phone = validated_token.get('phone', '')
-        user.token_is_staff = validated_token.get('is_staff', False)
-        user.token_is_superuser = validated_token.get('is_superuser', False)
+        return (self._annotate(await self.aget_user(validated_token), validated_token), validated_token)
+
+    @staticmethod
+    def _annotate(user, validated_token):
+        # Roles, permissions and the other token claims are read from the
+        # token's immutable TokenPrincipal, built once per token and cached
+        # with it, instead of computing them from the database
+        user.principal = token_principal(validated_token)
+        return user
 
-        return (user, validated_token)
+
+class ClaimsOnlyJWTAuthentication(CoreUserJWTAuthentication):
+    """
+    Opt-in claims-only mode for read-only endpoints.
+    Serves requests with zero auth queries as long as the view only reads
+    fields carried by the token.
+
+    Usage:
+    class MealAvailabilityView(APIView):
+        authentication_classes = [ClaimsOnlyJWTAuthentication]
+    """
+    claims_only = True
 
 
 class RoleBasedJWTAuthentication(CoreUserJWTAuthentication):
@@ -170,8 +274,9 @@ class RoleBasedJWTAuthentication(CoreUserJWTAuthentication):
         This maintains backward compatibility while being more efficient.
         """
         # If roles are already extracted from token, use them
-        if hasattr(user, 'roles') and user.roles:
-            return user.roles
+        principal = getattr(user, 'principal', None)
+        if principal is not None and principal.roles:
+            return list(principal.roles)
         
         # Fallback to computing roles (for backward compatibility)
         return compute_user_roles(user)
@@ -197,26 +302,29 @@ def create_tokens_with_roles(user):
     email = getattr(user, 'email', '')
     phone = getattr(user, 'phone', '')
 
+    # Roles/permissions travel as registry bitmasks (core/claims.py); phone is
+    # left out of the tokens to keep the Authorization header small.
+    claims = {
+        'user_id': user_id,
+        'name': name,
+        'email': email,
+        'is_staff': getattr(user, 'is_staff', False),
+        'is_superuser': getattr(user, 'is_superuser', False),
+        TOKEN_VERSION_CLAIM: getattr(user, 'token_version', 0),
+        ROLE_VERSION_CLAIM: getattr(user, 'role_version', 0),
+        **encode_claims(roles, permissions),
+    }
+    if auth_settings.TOKEN_CLAIMS_FORMAT == 'legacy':
+        claims['phone'] = phone
+
     # ---- Add custom claims to REFRESH token ----
-    refresh['user_id'] = user_id
-    refresh['name'] = name
-    refresh['email'] = email
-    refresh['phone'] = phone
-    refresh['roles'] = roles
-    refresh['is_staff'] = getattr(user, 'is_staff', False)
-    refresh['is_superuser'] = getattr(user, 'is_superuser', False)
-    refresh['permissions'] = permissions
+    for claim, value in claims.items():
+        refresh[claim] = value
 
     # ---- Add custom claims to ACCESS token as well ----
     access = refresh.access_token
-    access['user_id'] = user_id
-    access['name'] = name
-    access['email'] = email
-    access['phone'] = phone
-    access['roles'] = roles
-    access['is_staff'] = getattr(user, 'is_staff', False)
-    access['is_superuser'] = getattr(user, 'is_superuser', False)
-    access['permissions'] = permissions
+    for claim, value in claims.items():
+        access[claim] = value
 
     return {
         'refresh': str(refresh),
@@ -232,22 +340,119 @@ def create_tokens_with_roles(user):
     }
 
 
+def refresh_tokens(raw_refresh):
+    """
+    Issue a new access token for a refresh token, carrying its role and
+    permission claims forward.
+
+    While the user's token generations are cached and their role_version is
+    unchanged this reads no database rows. If roles changed since the refresh
+    token was issued (or it predates the claims), the claims are re-derived
+    from the user and a new refresh token is returned as well.
+    Raises InvalidToken for invalid, revoked or retired refresh tokens.
+    """
+    try:
+        refresh = RefreshToken(raw_refresh)
+    except TokenError as e:
+        raise InvalidToken(str(e))
+
+    user_id = refresh.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        raise InvalidToken("Token contained no user_id")
+
+    revocations = get_revocation_list()
+    jti = refresh.get(api_settings.JTI_CLAIM)
+    if jti is not None and revocations.is_revoked(jti):
+        raise InvalidToken("Token has been revoked")
+
+    # Unlike access tokens, a refresh token only needs the session generation
+    # to match; a newer role_version means "re-derive", not "reject".
+    token_version, role_version = get_token_version_cache().current(user_id)
+    claimed_token_version, claimed_role_version = token_versions(refresh)
+    if claimed_token_version != token_version:
+        raise InvalidToken("Token has been revoked")
+
+    if (claimed_role_version != role_version
+            or not has_role_claims(refresh) or not has_permission_claims(refresh)):
+        try:
+            # From the database, not the user cache: the role change may have
+            # been made by another worker, and a local copy up to
+            # USER_CACHE_TTL old would re-issue the retired role_version
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            raise InvalidToken("User not found")
+        get_user_cache().invalidate(user_id)
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            revocations.revoke(refresh, reason='rotated')
+        tokens = create_tokens_with_roles(user)
+        return {'access': tokens['access'], 'refresh': tokens['refresh']}
+
+    data = {'access': str(refresh.access_token)}
+    if api_settings.ROTATE_REFRESH_TOKENS:
+        if api_settings.BLACKLIST_AFTER_ROTATION:
+            revocations.revoke(refresh, reason='rotated')
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+    return data
+
+
 # ------------------------------------
 # Quick server-side verification utils
 # ------------------------------------
+def user_role_set(user):
+    """
+    The user's roles as a frozenset.
+    Authenticated users answer from their TokenPrincipal; otherwise it is built
+    from user.roles or, as a last resort, computed from the user flags, and
+    cached on the instance.
+    """
+    principal = getattr(user, 'principal', None)
+    if principal is not None and principal.role_set:
+        return principal.role_set
+    roles = getattr(user, '_role_set', None)
+    if roles is None:
+        token_roles = getattr(user, 'roles', None)
+        roles = frozenset(token_roles) if token_roles else _fallback_roles(user)
+        user._role_set = roles
+    return roles
+
+
+def user_permission_set(user):
+    """The user's permissions as a frozenset (see user_role_set)."""
+    principal = getattr(user, 'principal', None)
+    if principal is not None and principal.permission_set:
+        return principal.permission_set
+    permissions = getattr(user, '_permission_set', None)
+    if permissions is None:
+        token_permissions = getattr(user, 'permissions', None)
+        if token_permissions:
+            permissions = frozenset(token_permissions)
+        else:
+            permissions = effective_permissions(_fallback_roles(user))
+        user._permission_set = permissions
+    return permissions
+
+
+def _fallback_roles(user):
+    """
+    Roles computed from user flags, for users without token claims.
+    Memoized on the instance so N checks cost one computation.
+    """
+    roles = getattr(user, '_computed_roles', None)
+    if roles is None:
+        roles = frozenset(compute_user_roles(user))
+        user._computed_roles = roles
+    return roles
+
+
 def verify_user_permission(user, required_permission):
     """
     Verify if user has a specific permission.
     Optimized to use token-based permissions if available.
     """
-    # If permissions are already extracted from token, use them
-    if hasattr(user, 'permissions') and user.permissions:
-        return required_permission in user.permissions
-    
-    # Fallback to computing permissions (for backward compatibility)
-    roles = compute_user_roles(user)
-    permissions = get_user_permissions(user, roles)
-    return required_permission in permissions
+    return required_permission in user_permission_set(user)
 
 
 def verify_user_role(user, required_role):
@@ -255,10 +460,4 @@ def verify_user_role(user, required_role):
     Verify if user has a specific role.
     Optimized to use token-based roles if available.
     """
-    # If roles are already extracted from token, use them
-    if hasattr(user, 'roles') and user.roles:
-        return required_role in user.roles
-    
-    # Fallback to computing roles (for backward compatibility)
-    roles = compute_user_roles(user)
-    return required_role in roles
+    return required_role in user_role_set(user)
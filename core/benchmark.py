@@ -0,0 +1,135 @@
+"""
+Micro-benchmark harness for the authentication hot path.
+
+Each benchmark warms the callable up, then times ``rounds`` batches of
+``iterations`` calls with time.perf_counter() and reports per-call statistics
+(min, median, mean, stdev, p95 over the rounds, in microseconds) together with
+the number of SQL queries one warm call issues.
+
+Results are compared against the JSON baselines in
+core/benchmark_baselines.json:
+
+- a call that issues more queries than its baseline is a regression;
+- with BENCHMARK_TIMING=1, a median slower than ``baseline *
+  BENCHMARK_TOLERANCE`` (default 3.0; wall clock numbers vary between
+  machines) plus SLACK_US is a regression. The slack keeps sub-microsecond
+  checks from failing on scheduler noise.
+
+Wall clock checks are opt-in so the default test run only fails on what is
+deterministic: query counts.
+
+Usage:
+pytest core/test_benchmarks.py                           # query counts only
+BENCHMARK_TIMING=1 pytest core/test_benchmarks.py -s     # also time and compare
+BENCHMARK_SAVE=1 pytest core/test_benchmarks.py          # record new baselines
+pytest -m "not performance"                              # skip them
+"""
+
+import json
+import os
+import statistics
+import time
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'benchmark_baselines.json')
+SLACK_US = 5.0
+
+
+def timing_enabled():
+    """True when wall clock numbers should be measured and checked (BENCHMARK_TIMING=1)."""
+    return os.environ.get('BENCHMARK_TIMING') == '1'
+
+
+class BenchmarkResult:
+
+    def __init__(self, name, samples, iterations, queries):
+        self.name = name
+        self.samples = sorted(samples)  # per-call microseconds, one per round
+        self.iterations = iterations
+        self.queries = queries
+
+    @property
+    def median(self):
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self):
+        return self.samples[min(len(self.samples) - 1, round(0.95 * (len(self.samples) - 1)))]
+
+    def as_dict(self):
+        return {
+            "rounds": len(self.samples),
+            "iterations": self.iterations,
+            "min_us": round(self.samples[0], 3),
+            "median_us": round(self.median, 3),
+            "mean_us": round(statistics.fmean(self.samples), 3),
+            "stdev_us": round(statistics.stdev(self.samples), 3) if len(self.samples) > 1 else 0.0,
+            "p95_us": round(self.p95, 3),
+            "queries": self.queries,
+        }
+
+    def __str__(self):
+        return (f"{self.name:<40} median {self.median:9.2f} us  min {self.samples[0]:9.2f} us  "
+                f"p95 {self.p95:9.2f} us  queries {self.queries}")
+
+
+def run_benchmark(name, func, warmup=20, rounds=15, iterations=20, using='default'):
+    """Time func() and count the queries of one warm call."""
+    for _ in range(warmup):
+        func()
+
+    with CaptureQueriesContext(connections[using]) as queries:
+        func()
+
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    return BenchmarkResult(name, samples, iterations, len(queries))
+
+
+class Baselines:
+    """The stored baselines, compared against and optionally rewritten."""
+
+    def __init__(self, path=BASELINE_FILE, tolerance=None, save=None, timing=None):
+        self.path = path
+        self.tolerance = float(tolerance if tolerance is not None else os.environ.get('BENCHMARK_TOLERANCE', 3.0))
+        self.save = save if save is not None else os.environ.get('BENCHMARK_SAVE') == '1'
+        # Recording baselines needs real timings
+        self.timing = self.save or (timing if timing is not None else timing_enabled())
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        self.results = {}
+
+    def check(self, result):
+        """Record result; return a list of regressions against its baseline (empty if none)."""
+        self.results[result.name] = result.as_dict()
+        baseline = self.entries.get(result.name)
+        if self.save or baseline is None:
+            return []
+
+        problems = []
+        if result.queries > baseline['queries']:
+            problems.append(f"{result.name}: {result.queries} queries, baseline {baseline['queries']}")
+        limit = baseline['median_us'] * self.tolerance + SLACK_US
+        if self.timing and result.median > limit:
+            problems.append(f"{result.name}: median {result.median:.2f} us exceeds "
+                            f"{self.tolerance}x baseline ({baseline['median_us']:.2f} us)")
+        return problems
+
+    def write(self):
+        """Merge this run's results into the baseline file (BENCHMARK_SAVE=1 only)."""
+        if not self.save or not self.results:
+            return
+        self.entries.update(self.results)
+        with open(self.path, 'w') as f:
+            json.dump(dict(sorted(self.entries.items())), f, indent=2)
+            f.write('\n')
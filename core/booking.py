@@ -0,0 +1,175 @@
+"""
+Capacity-aware booking of MealType slots.
+
+A slot's seats are claimed with one conditional UPDATE:
+
+    UPDATE core_mealtype SET seats_taken = seats_taken + 1
+    WHERE id = %s AND (capacity IS NULL OR seats_taken < capacity)
+
+The database evaluates the condition and the increment under the row's write
+lock, so concurrent requests can never push seats_taken past capacity. No
+SELECT ... FOR UPDATE and no retry loop: a request that finds no seat updates
+zero rows and gets SlotFull straight away.
+
+book_slot() claims the seat first and inserts the Booking second, in one
+transaction, without reading anything beforehand. The partial unique index
+on active (user, meal_slot) pairs is the duplicate check: a second booking
+fails on the INSERT and the IntegrityError, which rolls the seat claim back,
+becomes AlreadyBooked. Cancelled rows are outside the index, so booking again
+after cancelling just inserts a new row.
+
+Both book_slot() and book_slots() lock the slot row before they insert, so a
+single and a bulk booking for the same slot queue on that lock instead of
+deadlocking on each other's rows.
+
+A slot already seen full is refused without touching its row lock.
+
+book_slots() books many slots for one user (a week of meals) in a fixed
+number of queries: the slots are locked in one SELECT ... FOR UPDATE, seats
+are checked in Python against the locked rows, the bookings go in with one
+bulk_create (which returns their primary keys) and the seats are taken with
+one UPDATE.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+
+from core.models import Booking, MealType
+
+
+class SlotFull(Exception):
+    """Raised when a meal slot has no seats left."""
+
+    def __init__(self, slot):
+        super().__init__(f"Meal slot {slot.pk} is full")
+        self.slot = slot
+
+
+class AlreadyBooked(Exception):
+    """Raised when the user already holds a booking for the slot."""
+
+
+# book_slots() outcomes
+BOOKED = 'booked'
+ALREADY_BOOKED = 'already_booked'
+FULL = 'full'
+NOT_FOUND = 'not_found'
+
+
+def _seat_available():
+    return Q(capacity__isnull=True) | Q(seats_taken__lt=F('capacity'))
+
+
+def claim_seat(slot_id):
+    """Take one seat in the slot; False when it is full."""
+    return MealType.objects.filter(_seat_available(), pk=slot_id).update(seats_taken=F('seats_taken') + 1) == 1
+
+
+def release_seat(slot_id):
+    MealType.objects.filter(pk=slot_id, seats_taken__gt=0).update(seats_taken=F('seats_taken') - 1)
+
+
+def book_slot(user, slot):
+    """
+    Book a seat in slot for user.
+
+    Usage:
+    try:
+        booking = book_slot(user, slot)
+    except SlotFull:
+        ...  # 409
+    except AlreadyBooked:
+        ...  # 400
+    """
+    if slot.is_full():
+        # Answered with one read, without the slot's row lock
+        if Booking.objects.active().filter(user=user, meal_slot=slot).exists():
+            raise AlreadyBooked()
+        raise SlotFull(slot)
+    try:
+        with transaction.atomic():
+            # Slot row lock first, the same order as book_slots()
+            if not claim_seat(slot.pk):
+                if Booking.objects.active().filter(user=user, meal_slot=slot).exists():
+                    raise AlreadyBooked()
+                raise SlotFull(slot)
+            booking = Booking.objects.create(user=user, meal_slot=slot)
+    except IntegrityError:
+        # Only the unique constraint is expected here; anything else (a user
+        # deleted meanwhile) is a real error
+        if Booking.objects.active().filter(user=user, meal_slot=slot).exists():
+            raise AlreadyBooked()
+        raise
+    return booking
+
+
+def cancel_booking(booking):
+    """Cancel booking and free its seat; False if it was already cancelled."""
+    with transaction.atomic():
+        if not Booking.objects.filter(pk=booking.pk, cancelled=False).update(cancelled=True):
+            return False
+        release_seat(booking.meal_slot_id)
+    booking.cancelled = True
+    return True
+
+
+def _insert_each(bookings):
+    inserted = []
+    for booking in bookings:
+        try:
+            with transaction.atomic():
+                booking.save(force_insert=True)
+        except IntegrityError:
+            continue
+        inserted.append(booking)
+    return inserted
+
+
+def book_slots(user_id, slot_ids):
+    """
+    Book every slot in slot_ids for one user, as far as seats allow.
+
+    Returns {slot_id: (outcome, booking or None)} with outcome one of BOOKED,
+    ALREADY_BOOKED, FULL, NOT_FOUND.
+
+    Usage:
+    for slot_id, (outcome, booking) in book_slots(user.pk, [3, 4, 5]).items():
+        ...
+    """
+    outcomes = {slot_id: (NOT_FOUND, None) for slot_id in slot_ids}
+    with transaction.atomic():
+        # Locked in primary key order so overlapping batches can't deadlock
+        slots = list(MealType.objects.select_for_update().filter(pk__in=slot_ids).order_by('pk'))
+        held = set(
+            Booking.objects.active()
+            .filter(user_id=user_id, meal_slot_id__in=slot_ids)
+            .values_list('meal_slot_id', flat=True)
+        )
+        wanted = []
+        for slot in slots:
+            if slot.pk in held:
+                outcomes[slot.pk] = (ALREADY_BOOKED, None)
+            elif slot.is_full():
+                outcomes[slot.pk] = (FULL, None)
+            else:
+                wanted.append(slot.pk)
+        if not wanted:
+            return outcomes
+
+        bookings = [Booking(user_id=user_id, meal_slot_id=slot_id) for slot_id in wanted]
+        try:
+            with transaction.atomic():
+                created = Booking.objects.bulk_create(bookings)
+        except IntegrityError:
+            # book_slot() and book_slots() both lock the slot row before
+            # inserting, so they wait on the locks held here; only a row
+            # written around this module (the admin, a shell) gets here.
+            # Insert one at a time so exactly the conflicting slots are refused
+            # and only rows inserted by this call take a seat.
+            created = _insert_each(bookings)
+        created = {booking.meal_slot_id: booking for booking in created}
+        MealType.objects.filter(pk__in=created).update(seats_taken=F('seats_taken') + 1)
+    for slot_id in wanted:
+        booking = created.get(slot_id)
+        outcomes[slot_id] = (BOOKED, booking) if booking else (ALREADY_BOOKED, None)
+    return outcomes
@@ -0,0 +1,117 @@
+"""
+Versioned permission registry and compact role/permission token claims.
+
+Tokens carry roles and permissions as integer bitmasks instead of string lists:
+
+    {"pv": 1, "rb": 0b01001, "pb": 0b...}
+
+Bit ``i`` of ``rb``/``pb`` is ``ROLES[i]``/``PERMISSIONS[i]`` of registry
+version ``pv``. Registries are append-only; reordering or removing a name
+requires a new version so tokens issued under the old layout still decode.
+
+Tokens issued before the bitmask rollout (with ``roles``/``permissions``
+lists) are still accepted: every reader goes through token_roles() /
+token_permissions(), which understand both formats.
+"""
+
+from functools import lru_cache
+
+from core.conf import auth_settings
+
+
+ROLE_BITS_CLAIM = 'rb'
+PERMISSION_BITS_CLAIM = 'pb'
+REGISTRY_VERSION_CLAIM = 'pv'
+
+# version -> (roles, permissions); append new names at the end only
+REGISTRIES = {
+    1: (
+        ('superuser', 'admin', 'staff', 'student', 'user'),
+        (
+            'user.create', 'user.read', 'user.update', 'user.delete',
+            'mess.create', 'mess.read', 'mess.update', 'mess.delete',
+            'booking.create', 'booking.read', 'booking.update', 'booking.delete',
+            'coupon.create', 'coupon.read', 'coupon.update', 'coupon.delete',
+            'report.read', 'report.export', 'audit.read',
+            'auth.login', 'auth.logout', 'auth.refresh',
+        ),
+    ),
+}
+REGISTRY_VERSION = max(REGISTRIES)
+
+_EMPTY = frozenset()
+
+
+@lru_cache(maxsize=None)
+def _bit_index(version, kind):
+    names = REGISTRIES[version][kind]
+    return {name: 1 << i for i, name in enumerate(names)}
+
+
+def encode(names, kind, version=REGISTRY_VERSION):
+    """Encode role (kind=0) or permission (kind=1) names as a bitmask."""
+    index = _bit_index(version, kind)
+    mask = 0
+    for name in names:
+        mask |= index[name]
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def decode(mask, kind, version):
+    """Decode a bitmask to a frozenset of names. Unknown versions decode to nothing."""
+    if version not in REGISTRIES:
+        return _EMPTY
+    names = REGISTRIES[version][kind]
+    return frozenset(name for i, name in enumerate(names) if mask >> i & 1)
+
+
+@lru_cache(maxsize=1024)
+def _sorted(names):
+    return tuple(sorted(names))
+
+
+def encode_claims(roles, permissions):
+    """Claims to write into a token for the given role and permission names."""
+    if auth_settings.TOKEN_CLAIMS_FORMAT == 'legacy':
+        return {'roles': list(roles), 'permissions': list(permissions)}
+    return {
+        REGISTRY_VERSION_CLAIM: REGISTRY_VERSION,
+        ROLE_BITS_CLAIM: encode(roles, 0),
+        PERMISSION_BITS_CLAIM: encode(permissions, 1),
+    }
+
+
+def _token_names(token, kind, bits_claim, list_claim):
+    mask = token.get(bits_claim)
+    if mask is not None:
+        return decode(mask, kind, token.get(REGISTRY_VERSION_CLAIM, REGISTRY_VERSION))
+    return frozenset(token.get(list_claim, ()))
+
+
+def token_roles(token):
+    """Roles carried by a token (bitmask or legacy list) as a frozenset."""
+    return _token_names(token, 0, ROLE_BITS_CLAIM, 'roles')
+
+
+def token_permissions(token):
+    """Permissions carried by a token (bitmask or legacy list) as a frozenset."""
+    return _token_names(token, 1, PERMISSION_BITS_CLAIM, 'permissions')
+
+
+def token_role_list(token):
+    """Sorted list of token roles, for JSON responses."""
+    return list(_sorted(token_roles(token)))
+
+
+def token_permission_list(token):
+    """Sorted list of token permissions, for JSON responses."""
+    return list(_sorted(token_permissions(token)))
+
+
+def has_role_claims(token):
+    return ROLE_BITS_CLAIM in token or 'roles' in token
+
+
+def has_permission_claims(token):
+    return PERMISSION_BITS_CLAIM in token or 'permissions' in token
@@ -0,0 +1,99 @@
+"""
+Settings for the core authentication layer.
+
+Values are read from the ``CORE_AUTH`` dict in Django settings, falling back to
+the defaults below. Usage mirrors simplejwt's ``api_settings``:
+
+    from core.conf import auth_settings
+    auth_settings.USER_CACHE_TTL
+"""
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+DEFAULTS = {
+    # Per-process LRU of User rows used by CoreUserJWTAuthentication.get_user
+    "USER_CACHE_SIZE": 2048,
+    # Seconds a cached user stays valid in the local tier. Keeps cross-process
+    # staleness bounded, since post_save only clears the local tier of the
+    # process that did the write.
+    "USER_CACHE_TTL": 30,
+    # Alias from CACHES used as the shared tier, or None to disable it
+    "USER_CACHE_BACKEND": None,
+    "USER_CACHE_BACKEND_TTL": 300,
+    # Make CoreUserJWTAuthentication return a ClaimsPrincipal for every view
+    # instead of loading the User row. Views can also opt in individually with
+    # core.auth.ClaimsOnlyJWTAuthentication.
+    "CLAIMS_ONLY_PRINCIPAL": False,
+    # Verified access tokens kept per process, each until its exp
+    "TOKEN_CACHE_SIZE": 4096,
+    # Tokens accepted per request by auth/token/introspect/
+    "INTROSPECTION_MAX_TOKENS": 100,
+    # "compact": roles/permissions as registry bitmasks (core/claims.py).
+    # "legacy": string lists plus phone, for a mixed deploy where older
+    # servers still read the list claims. Both formats are always accepted.
+    "TOKEN_CLAIMS_FORMAT": "compact",
+    # Dedicated threads for check_password in the login views
+    "PASSWORD_POOL_WORKERS": 2,
+    # Verifications allowed in flight (running + queued) before logins get 503
+    "PASSWORD_POOL_MAX_PENDING": 16,
+    # Seconds a login waits for its verification before giving up with 503
+    "PASSWORD_POOL_TIMEOUT": 5,
+    # Retry-After sent with the 503
+    "PASSWORD_POOL_RETRY_AFTER": 1,
+    # PBKDF2 iterations for core.hashers.CalibratedPBKDF2PasswordHasher. None
+    # falls back to the calibration file, then to Django's default.
+    "PASSWORD_HASH_ITERATIONS": None,
+    # JSON written by `manage.py calibrate_password_hasher --write`
+    "PASSWORD_HASHER_CALIBRATION_FILE": None,
+    # Revoked jtis the per-process Bloom filter is sized for before it grows
+    "REVOCATION_BLOOM_CAPACITY": 100_000,
+    # Filter false positive rate; each false positive costs one indexed query
+    "REVOCATION_BLOOM_ERROR_RATE": 0.001,
+    # Seconds before a process sees tokens revoked by another process
+    "REVOCATION_SYNC_INTERVAL": 5,
+    # Seconds between full rebuilds, which drop expired revocations
+    "REVOCATION_REBUILD_INTERVAL": 3600,
+    # Per-process cache of users' token generations (core/token_version.py).
+    # The TTL bounds how long another process keeps accepting retired tokens
+    # when USER_CACHE_BACKEND is not set.
+    "TOKEN_VERSION_CACHE_SIZE": 8192,
+    "TOKEN_VERSION_CACHE_TTL": 30,
+    # Login attempts admitted per phone number / per client IP (DRF rate
+    # format; None disables the rule). Checked before any query or hashing.
+    "LOGIN_THROTTLE_PHONE_RATE": "5/min",
+    "LOGIN_THROTTLE_IP_RATE": "30/min",
+    # Alias from CACHES to enforce the limits across workers, or None for
+    # per-process token buckets
+    "LOGIN_THROTTLE_BACKEND": None,
+    # Buckets kept per process in local mode
+    "LOGIN_THROTTLE_CACHE_SIZE": 65536,
+}
+
+
+class AuthSettings:
+    def __init__(self, defaults):
+        self.defaults = defaults
+        self._cached = {}
+
+    def __getattr__(self, name):
+        if name not in self.defaults:
+            raise AttributeError(f"Invalid CORE_AUTH setting: {name}")
+        if name not in self._cached:
+            user_settings = getattr(settings, "CORE_AUTH", {})
+            self._cached[name] = user_settings.get(name, self.defaults[name])
+        return self._cached[name]
+
+    def reload(self):
+        self._cached = {}
+
+
+auth_settings = AuthSettings(DEFAULTS)
+
+
+@receiver(setting_changed)
+def reload_auth_settings(*args, **kwargs):
+    if kwargs["setting"] in ("CORE_AUTH", "CACHES"):
+        auth_settings.reload()
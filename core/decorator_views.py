@@ -16,7 +16,8 @@ from core.decorators import (
     superuser_only,
     staff_only,
     student_only,
-    authenticated_only
+    authenticated_only,
+    access_required
 )
 
 
@@ -34,7 +35,7 @@ def admin_dashboard(request):
     return JsonResponse({
         "message": "Welcome to Admin Dashboard",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Admin Dashboard",
         "features": [
             "User Management",
@@ -55,7 +56,7 @@ def create_user(request):
     return JsonResponse({
         "message": "User creation endpoint",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Create User",
         "note": "This endpoint would handle user creation logic"
     })
@@ -71,7 +72,7 @@ def system_settings(request):
     return JsonResponse({
         "message": "System Settings",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "System Settings",
         "settings": {
             "mess_timing": "Configure meal timings",
@@ -95,7 +96,7 @@ def staff_dashboard(request):
     return JsonResponse({
         "message": "Welcome to Staff Dashboard",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Staff Dashboard",
         "features": [
             "Mess Management",
@@ -115,7 +116,7 @@ def superuser_panel(request):
     return JsonResponse({
         "message": "Welcome to Superuser Panel",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Superuser Panel",
         "features": [
             "Full System Access",
@@ -136,7 +137,7 @@ def student_portal(request):
     return JsonResponse({
         "message": "Welcome to Student Portal",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Student Portal",
         "features": [
             "View Mess Menu",
@@ -161,7 +162,7 @@ def user_list(request):
     return JsonResponse({
         "message": "User List",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "User List",
         "required_permission": "user.read",
         "note": "This endpoint would return list of users"
@@ -178,7 +179,7 @@ def user_management(request):
     return JsonResponse({
         "message": "User Management",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "User Management",
         "required_permissions": ["user.create", "user.update"],
         "note": "This endpoint can create and update users"
@@ -195,7 +196,7 @@ def flexible_access(request):
     return JsonResponse({
         "message": "Flexible Access Endpoint",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Flexible Access",
         "required_permissions": ["mess.read", "booking.read"],
         "access_type": "ANY permission required",
@@ -217,13 +218,30 @@ def user_profile(request):
     return JsonResponse({
         "message": "User Profile",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "User Profile",
         "access_type": "Any authenticated user",
         "note": "This endpoint shows user's own profile"
     })
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+@authenticated_only
+async def async_user_profile(request):
+    """
+    User profile as an async view - the decorators detect ``async def`` and
+    authenticate on the event loop (no thread hop under ASGI).
+    """
+    return JsonResponse({
+        "message": "User Profile",
+        "user_id": request.user_id,
+        "user_info": request.principal.as_dict(),
+        "endpoint": "Async User Profile",
+        "access_type": "Any authenticated user",
+    })
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 @jwt_token_required
@@ -234,10 +252,10 @@ def token_info(request):
     return JsonResponse({
         "message": "Token Information",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Token Info",
         "access_type": "Any valid JWT token",
-        "token_data": request.token_data
+        "token_data": request.principal.as_dict()
     })
 
 
@@ -247,18 +265,17 @@ def token_info(request):
 
 @csrf_exempt
 @require_http_methods(["GET"])
-@role_required('admin')
-@permission_required(['user.delete'])
+@access_required(any_roles=['admin'], all_permissions=['user.delete'])
 def admin_user_delete(request):
     """
     Admin user deletion - requires admin role AND user.delete permission.
-    Note: This demonstrates combining decorators (though it's better to use
-    a single decorator with complex logic).
+    Note: Both requirements are compiled into a single access rule instead of
+    stacking @role_required and @permission_required.
     """
     return JsonResponse({
         "message": "Admin User Deletion",
         "user_id": request.user_id,
-        "user_info": request.token_data,
+        "user_info": request.principal.as_dict(),
         "endpoint": "Admin User Delete",
         "requirements": {
             "role": "admin",
@@ -306,7 +323,9 @@ def decorator_test_info(request):
             "@student_only": "Students only",
             "@role_required(['admin', 'staff'])": "Specific roles required",
             "@permission_required(['user.read'])": "Specific permissions required",
-            "@permission_required(['user.read', 'mess.read'], require_all=False)": "Any permission required"
+            "@permission_required(['user.read', 'mess.read'], require_all=False)": "Any permission required",
+            "@access_required(any_roles=['admin'], all_permissions=['user.delete'])": "Roles AND permissions in one check",
+            "async def views": "Every decorator above also wraps async views"
         },
         "usage_examples": {
             "admin_dashboard": "/api/decorator/admin-dashboard/",
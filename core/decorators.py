@@ -3,429 +3,279 @@ Django Decorators for JWT Token Validation and Role-Based Access Control
 
 This module provides decorators for protecting API endpoints with JWT token validation
 and role-based access control.
+
+All decorators are built on one engine: a decorator's requirements are compiled
+once, when the decorator is applied at import time, into an AccessRule whose
+checks are plain set operations over frozensets. A request then only pays for
+the (shared, once per request) token resolution plus those set tests.
+
+Every decorator also accepts ``async def`` views: the wrapper is then a
+coroutine function that resolves the token with aresolve_request_token(), so
+async views authenticate without leaving the event loop.
 """
 
 import functools
+from asgiref.sync import iscoroutinefunction
 from django.http import JsonResponse
-from django.conf import settings
 from rest_framework import status
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from core.auth import verify_user_role, verify_user_permission
+from core.middleware import aresolve_request_token, resolve_request_token
+
+
+ADMIN_ROLES = frozenset(['admin', 'superuser'])
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else [value]
+
+
+class AccessRule:
+    """
+    Compiled access requirements: every check must pass (logical AND).
+
+    Each check is a closure ``check(resolution) -> None | denial dict`` built
+    from precomputed frozensets and messages, so evaluating a rule does no
+    imports, list building or string formatting unless access is denied.
+
+    Usage:
+    rule = AccessRule(any_roles=['admin'], all_permissions=['user.delete'])
+    denial = rule.evaluate(resolution)  # None when access is granted
+    """
+
+    def __init__(self, any_roles=None, all_permissions=None, any_permissions=None, admin=False):
+        checks = []
+        if admin:
+            checks.append(self._compile_admin())
+        if any_roles:
+            checks.append(self._compile_any_roles(_as_list(any_roles)))
+        if all_permissions:
+            checks.append(self._compile_all_permissions(_as_list(all_permissions)))
+        if any_permissions:
+            checks.append(self._compile_any_permissions(_as_list(any_permissions)))
+        self.checks = tuple(checks)
+
+    def evaluate(self, resolution):
+        for check in self.checks:
+            denial = check(resolution)
+            if denial is not None:
+                return denial
+        return None
+
+    @staticmethod
+    def _compile_admin():
+        def check(resolution):
+            principal = resolution.token_principal
+            if ADMIN_ROLES & resolution.role_set or principal.is_staff or principal.is_superuser:
+                return None
+            return {
+                'error': 'Access denied',
+                'message': 'This endpoint requires admin privileges',
+                'required_role': 'admin',
+                'user_roles': list(principal.roles)
+            }
+        return check
+
+    @staticmethod
+    def _compile_any_roles(required):
+        required_set = frozenset(required)
+        message = f'This endpoint requires one of the following roles: {", ".join(required)}'
+
+        def check(resolution):
+            if required_set & resolution.role_set:
+                return None
+            return {
+                'error': 'Access denied',
+                'message': message,
+                'required_roles': required,
+                'user_roles': list(resolution.token_principal.roles)
+            }
+        return check
+
+    @staticmethod
+    def _compile_all_permissions(required):
+        required_set = frozenset(required)
+        message = f'This endpoint requires all of the following permissions: {", ".join(required)}'
+
+        def check(resolution):
+            if required_set <= resolution.permission_set:
+                return None
+            granted = resolution.permission_set
+            return {
+                'error': 'Access denied',
+                'message': message,
+                'required_permissions': required,
+                'missing_permissions': [perm for perm in required if perm not in granted],
+                'user_permissions': list(resolution.token_principal.permissions)
+            }
+        return check
+
+    @staticmethod
+    def _compile_any_permissions(required):
+        required_set = frozenset(required)
+        message = f'This endpoint requires at least one of the following permissions: {", ".join(required)}'
+
+        def check(resolution):
+            if required_set & resolution.permission_set:
+                return None
+            return {
+                'error': 'Access denied',
+                'message': message,
+                'required_permissions': required,
+                'user_permissions': list(resolution.token_principal.permissions)
+            }
+        return check
+
+
+def _admit(request, resolution, rule):
+    """
+    Return the error response for a request that may not proceed, or None
+    after attaching user_id and the token's principal to it.
+    """
+    if resolution.token is None:
+        return JsonResponse(resolution.error, status=resolution.status_code)
+
+    principal = resolution.token_principal
+    user_id = principal.user_id
+    if not user_id:
+        return JsonResponse({
+            'error': 'Invalid token',
+            'message': 'Token does not contain user information'
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    if rule is not None:
+        denial = rule.evaluate(resolution)
+        if denial is not None:
+            return JsonResponse(denial, status=status.HTTP_403_FORBIDDEN)
+
+    # Add user information to request (the principal is cached with the token)
+    request.user_id = user_id
+    request.principal = principal
+    return None
+
+
+def _view_failed():
+    return JsonResponse({
+        'error': 'Token validation failed',
+        'message': 'An error occurred while validating the token'
+    }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _protect(view_func, rule=None):
+    """Wrap view_func (sync or async) with token validation and, if given, a compiled AccessRule."""
+    if iscoroutinefunction(view_func):
+        @functools.wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            refused = _admit(request, await aresolve_request_token(request), rule)
+            if refused is not None:
+                return refused
+            try:
+                return await view_func(request, *args, **kwargs)
+            except Exception:
+                return _view_failed()
+    else:
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            # Token is parsed and verified once per request (see core/middleware.py);
+            # expiry is enforced there by simplejwt.
+            refused = _admit(request, resolve_request_token(request), rule)
+            if refused is not None:
+                return refused
+            try:
+                return view_func(request, *args, **kwargs)
+            except Exception:
+                return _view_failed()
+
+    wrapper.access_rule = rule
+    return wrapper
+
+
+def access_required(any_roles=None, all_permissions=None, any_permissions=None):
+    """
+    Decorator combining role and permission requirements in a single check.
+    Requires JWT token validation.
+
+    Usage:
+    @access_required(any_roles=['admin'], all_permissions=['user.delete'])
+    def admin_user_delete(request):
+        # Admin role AND user.delete permission
+        pass
+    """
+    rule = AccessRule(any_roles=any_roles, all_permissions=all_permissions, any_permissions=any_permissions)
+
+    def decorator(view_func):
+        return _protect(view_func, rule)
+    return decorator
 
 
 def jwt_token_required(view_func):
     """
     Decorator to validate JWT token and ensure user is authenticated.
-    
+
     Usage:
     @jwt_token_required
     def my_api_view(request):
         # Your view logic here
         pass
     """
-    @functools.wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        # Get the Authorization header
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        
-        if not auth_header:
-            return JsonResponse({
-                'error': 'Authorization header is required',
-                'message': 'Please provide a valid JWT token in the Authorization header'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        # Check if it's a Bearer token
-        if not auth_header.startswith('Bearer '):
-            return JsonResponse({
-                'error': 'Invalid authorization header format',
-                'message': 'Authorization header must start with "Bearer "'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        # Extract the token
-        token = auth_header.split(' ')[1]
-        
-        try:
-            # Validate the token using custom settings
-            from django.conf import settings
-            from rest_framework_simplejwt.settings import api_settings
-            
-            # Use the custom user_id claim from settings
-            user_id_claim = getattr(api_settings, 'USER_ID_CLAIM', 'user_id')
-            
-            # Validate the token
-            access_token = AccessToken(token)
-            
-            # Get user_id from token using the custom claim
-            user_id = access_token.get(user_id_claim)
-            if not user_id:
-                return JsonResponse({
-                    'error': 'Invalid token',
-                    'message': 'Token does not contain user information'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            # Check if token is expired (using the correct method)
-            from datetime import datetime
-            exp_timestamp = access_token.get('exp')
-            if exp_timestamp:
-                exp_datetime = datetime.fromtimestamp(exp_timestamp)
-                if datetime.now() > exp_datetime:
-                    return JsonResponse({
-                        'error': 'Token expired',
-                        'message': 'JWT token has expired. Please login again.'
-                    }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            # Add user_id to request for use in view
-            request.user_id = user_id
-            request.token_data = {
-                'user_id': user_id,
-                'name': access_token.get('name'),
-                'email': access_token.get('email'),
-                'roles': access_token.get('roles', []),
-                'permissions': access_token.get('permissions', []),
-                'is_staff': access_token.get('is_staff', False),
-                'is_superuser': access_token.get('is_superuser', False)
-            }
-            
-            return view_func(request, *args, **kwargs)
-            
-        except (InvalidToken, TokenError) as e:
-            return JsonResponse({
-                'error': 'Invalid token',
-                'message': str(e)
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        except Exception as e:
-            return JsonResponse({
-                'error': 'Token validation failed',
-                'message': 'An error occurred while validating the token'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    return wrapper
+    return _protect(view_func)
+
+
+_ADMIN_RULE = AccessRule(admin=True)
 
 
 def admin_only(view_func):
     """
     Decorator to ensure only admin users can access the endpoint.
     Requires JWT token validation.
-    
+
     Usage:
     @admin_only
     def admin_only_view(request):
         # Only admins can access this
         pass
     """
-    @functools.wraps(view_func)
-    def wrapper(request, *args, **kwargs):
-        # First validate JWT token
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        
-        if not auth_header:
-            return JsonResponse({
-                'error': 'Authorization header is required',
-                'message': 'Please provide a valid JWT token in the Authorization header'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        if not auth_header.startswith('Bearer '):
-            return JsonResponse({
-                'error': 'Invalid authorization header format',
-                'message': 'Authorization header must start with "Bearer "'
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        token = auth_header.split(' ')[1]
-        
-        try:
-            # Validate the token using custom settings
-            from django.conf import settings
-            from rest_framework_simplejwt.settings import api_settings
-            
-            # Use the custom user_id claim from settings
-            user_id_claim = getattr(api_settings, 'USER_ID_CLAIM', 'user_id')
-            
-            # Validate the token
-            access_token = AccessToken(token)
-            
-            # Check if token is expired (using the correct method)
-            from datetime import datetime
-            exp_timestamp = access_token.get('exp')
-            if exp_timestamp:
-                exp_datetime = datetime.fromtimestamp(exp_timestamp)
-                if datetime.now() > exp_datetime:
-                    return JsonResponse({
-                        'error': 'Token expired',
-                        'message': 'JWT token has expired. Please login again.'
-                    }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            # Get user information from token using the custom claim
-            user_id = access_token.get(user_id_claim)
-            roles = access_token.get('roles', [])
-            is_staff = access_token.get('is_staff', False)
-            is_superuser = access_token.get('is_superuser', False)
-            
-            # Check if user has admin role
-            has_admin_role = (
-                'admin' in roles or 
-                'superuser' in roles or 
-                is_staff or 
-                is_superuser
-            )
-            
-            if not has_admin_role:
-                return JsonResponse({
-                    'error': 'Access denied',
-                    'message': 'This endpoint requires admin privileges',
-                    'required_role': 'admin',
-                    'user_roles': roles
-                }, status=status.HTTP_403_FORBIDDEN)
-            
-            # Add user information to request
-            request.user_id = user_id
-            request.token_data = {
-                'user_id': user_id,
-                'name': access_token.get('name'),
-                'email': access_token.get('email'),
-                'roles': roles,
-                'permissions': access_token.get('permissions', []),
-                'is_staff': is_staff,
-                'is_superuser': is_superuser
-            }
-            
-            return view_func(request, *args, **kwargs)
-            
-        except (InvalidToken, TokenError) as e:
-            return JsonResponse({
-                'error': 'Invalid token',
-                'message': str(e)
-            }, status=status.HTTP_401_UNAUTHORIZED)
-        except Exception as e:
-            return JsonResponse({
-                'error': 'Token validation failed',
-                'message': 'An error occurred while validating the token'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    return wrapper
+    return _protect(view_func, _ADMIN_RULE)
 
 
 def role_required(required_roles):
     """
     Decorator to ensure user has specific roles.
     Requires JWT token validation.
-    
+
     Usage:
     @role_required(['admin', 'staff'])
     def admin_or_staff_view(request):
         # Only admin or staff can access this
         pass
-    
+
     @role_required('superuser')
     def superuser_only_view(request):
         # Only superuser can access this
         pass
     """
-    def decorator(view_func):
-        @functools.wraps(view_func)
-        def wrapper(request, *args, **kwargs):
-            # Validate JWT token
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            
-            if not auth_header:
-                return JsonResponse({
-                    'error': 'Authorization header is required',
-                    'message': 'Please provide a valid JWT token in the Authorization header'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if not auth_header.startswith('Bearer '):
-                return JsonResponse({
-                    'error': 'Invalid authorization header format',
-                    'message': 'Authorization header must start with "Bearer "'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            token = auth_header.split(' ')[1]
-            
-            try:
-                # Validate the token using custom settings
-                from django.conf import settings
-                from rest_framework_simplejwt.settings import api_settings
-                
-                # Use the custom user_id claim from settings
-                user_id_claim = getattr(api_settings, 'USER_ID_CLAIM', 'user_id')
-                
-                # Validate the token
-                access_token = AccessToken(token)
-                
-                # Check if token is expired (using the correct method)
-                from datetime import datetime
-                exp_timestamp = access_token.get('exp')
-                if exp_timestamp:
-                    exp_datetime = datetime.fromtimestamp(exp_timestamp)
-                    if datetime.now() > exp_datetime:
-                        return JsonResponse({
-                            'error': 'Token expired',
-                            'message': 'JWT token has expired. Please login again.'
-                        }, status=status.HTTP_401_UNAUTHORIZED)
-                
-                # Get user information from token using the custom claim
-                user_id = access_token.get(user_id_claim)
-                roles = access_token.get('roles', [])
-                
-                # Convert required_roles to list if it's a string
-                required_roles_list = required_roles if isinstance(required_roles, list) else [required_roles]
-                
-                # Check if user has any of the required roles
-                has_required_role = any(role in roles for role in required_roles_list)
-                
-                if not has_required_role:
-                    return JsonResponse({
-                        'error': 'Access denied',
-                        'message': f'This endpoint requires one of the following roles: {", ".join(required_roles_list)}',
-                        'required_roles': required_roles_list,
-                        'user_roles': roles
-                    }, status=status.HTTP_403_FORBIDDEN)
-                
-                # Add user information to request
-                request.user_id = user_id
-                request.token_data = {
-                    'user_id': user_id,
-                    'name': access_token.get('name'),
-                    'email': access_token.get('email'),
-                    'roles': roles,
-                    'permissions': access_token.get('permissions', []),
-                    'is_staff': access_token.get('is_staff', False),
-                    'is_superuser': access_token.get('is_superuser', False)
-                }
-                
-                return view_func(request, *args, **kwargs)
-                
-            except (InvalidToken, TokenError) as e:
-                return JsonResponse({
-                    'error': 'Invalid token',
-                    'message': str(e)
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            except Exception as e:
-                return JsonResponse({
-                    'error': 'Token validation failed',
-                    'message': 'An error occurred while validating the token'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        return wrapper
-    return decorator
+    return access_required(any_roles=required_roles)
 
 
 def permission_required(required_permissions, require_all=True):
     """
     Decorator to ensure user has specific permissions.
     Requires JWT token validation.
-    
+
     Usage:
     @permission_required(['user.read', 'user.update'])
     def user_management_view(request):
         # User must have both user.read and user.update permissions
         pass
-    
+
     @permission_required(['user.read', 'mess.read'], require_all=False)
     def flexible_view(request):
         # User must have either user.read OR mess.read permission
         pass
     """
-    def decorator(view_func):
-        @functools.wraps(view_func)
-        def wrapper(request, *args, **kwargs):
-            # Validate JWT token
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            
-            if not auth_header:
-                return JsonResponse({
-                    'error': 'Authorization header is required',
-                    'message': 'Please provide a valid JWT token in the Authorization header'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            if not auth_header.startswith('Bearer '):
-                return JsonResponse({
-                    'error': 'Invalid authorization header format',
-                    'message': 'Authorization header must start with "Bearer "'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            
-            token = auth_header.split(' ')[1]
-            
-            try:
-                # Validate the token using custom settings
-                from django.conf import settings
-                from rest_framework_simplejwt.settings import api_settings
-                
-                # Use the custom user_id claim from settings
-                user_id_claim = getattr(api_settings, 'USER_ID_CLAIM', 'user_id')
-                
-                # Validate the token
-                access_token = AccessToken(token)
-                
-                # Check if token is expired (using the correct method)
-                from datetime import datetime
-                exp_timestamp = access_token.get('exp')
-                if exp_timestamp:
-                    exp_datetime = datetime.fromtimestamp(exp_timestamp)
-                    if datetime.now() > exp_datetime:
-                        return JsonResponse({
-                            'error': 'Token expired',
-                            'message': 'JWT token has expired. Please login again.'
-                        }, status=status.HTTP_401_UNAUTHORIZED)
-                
-                # Get user information from token using the custom claim
-                user_id = access_token.get(user_id_claim)
-                permissions = access_token.get('permissions', [])
-                
-                # Convert required_permissions to list if it's a string
-                required_permissions_list = required_permissions if isinstance(required_permissions, list) else [required_permissions]
-                
-                # Check permissions based on require_all flag
-                if require_all:
-                    # User must have ALL required permissions
-                    has_all_permissions = all(perm in permissions for perm in required_permissions_list)
-                    if not has_all_permissions:
-                        missing_permissions = [perm for perm in required_permissions_list if perm not in permissions]
-                        return JsonResponse({
-                            'error': 'Access denied',
-                            'message': f'This endpoint requires all of the following permissions: {", ".join(required_permissions_list)}',
-                            'required_permissions': required_permissions_list,
-                            'missing_permissions': missing_permissions,
-                            'user_permissions': permissions
-                        }, status=status.HTTP_403_FORBIDDEN)
-                else:
-                    # User must have ANY of the required permissions
-                    has_any_permission = any(perm in permissions for perm in required_permissions_list)
-                    if not has_any_permission:
-                        return JsonResponse({
-                            'error': 'Access denied',
-                            'message': f'This endpoint requires at least one of the following permissions: {", ".join(required_permissions_list)}',
-                            'required_permissions': required_permissions_list,
-                            'user_permissions': permissions
-                        }, status=status.HTTP_403_FORBIDDEN)
-                
-                # Add user information to request
-                request.user_id = user_id
-                request.token_data = {
-                    'user_id': user_id,
-                    'name': access_token.get('name'),
-                    'email': access_token.get('email'),
-                    'roles': access_token.get('roles', []),
-                    'permissions': permissions,
-                    'is_staff': access_token.get('is_staff', False),
-                    'is_superuser': access_token.get('is_superuser', False)
-                }
-                
-                return view_func(request, *args, **kwargs)
-                
-            except (InvalidToken, TokenError) as e:
-                return JsonResponse({
-                    'error': 'Invalid token',
-                    'message': str(e)
-                }, status=status.HTTP_401_UNAUTHORIZED)
-            except Exception as e:
-                return JsonResponse({
-                    'error': 'Token validation failed',
-                    'message': 'An error occurred while validating the token'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        return wrapper
-    return decorator
+    if require_all:
+        return access_required(all_permissions=required_permissions)
+    return access_required(any_permissions=required_permissions)
 
 
 # Convenience decorators for common use cases
@@ -446,4 +296,4 @@ def student_only(view_func):
 
 def authenticated_only(view_func):
     """Decorator to ensure user is authenticated (any valid JWT token)."""
-    return jwt_token_required(view_func) 
\ No newline at end of file
+    return jwt_token_required(view_func)
@@ -0,0 +1,80 @@
+"""
+Host-calibrated password hashing.
+
+Django's PBKDF2 iteration count is a constant chosen for "typical" hardware;
+on our hosts it decides how much CPU every login burns. The
+``calibrate_password_hasher`` management command measures the hashers on the
+host and can write the iteration count that meets a target latency to the
+calibration file. CalibratedPBKDF2PasswordHasher picks it up from there (or
+from ``CORE_AUTH["PASSWORD_HASH_ITERATIONS"]``, which wins), and because it
+keeps the ``pbkdf2_sha256`` algorithm name, existing hashes keep verifying and
+are rehashed with the new count on the next successful login.
+"""
+
+import json
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from core.conf import auth_settings
+
+
+@lru_cache(maxsize=1)
+def calibrated_iterations():
+    """Iteration count from the calibration file, or None if there is none."""
+    path = auth_settings.PASSWORD_HASHER_CALIBRATION_FILE
+    if not path:
+        return None
+    try:
+        data = json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    iterations = data.get("iterations")
+    return iterations if isinstance(iterations, int) and iterations > 0 else None
+
+
+def write_calibration(path, iterations, **details):
+    """Persist a calibration result and make this process use it."""
+    payload = {"iterations": iterations, **details}
+    Path(path).write_text(json.dumps(payload, indent=2) + "\n")
+    calibrated_iterations.cache_clear()
+    return payload
+
+
+@receiver(setting_changed)
+def clear_calibration_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] == "CORE_AUTH":
+        calibrated_iterations.cache_clear()
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with a per-deployment iteration count.
+
+    Usage (settings.PASSWORD_HASHERS, first entry):
+    'core.hashers.CalibratedPBKDF2PasswordHasher',
+    """
+
+    @property
+    def iterations(self):
+        return (
+            auth_settings.PASSWORD_HASH_ITERATIONS
+            or calibrated_iterations()
+            or PBKDF2PasswordHasher.iterations
+        )
+
+
+def time_hasher(hasher, password="calibration-password", rounds=3, **encode_kwargs):
+    """Median seconds one ``hasher.encode`` takes on this host."""
+    salt = hasher.salt()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hasher.encode(password, salt, **encode_kwargs)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2]
@@ -0,0 +1,101 @@
+"""
+Benchmark the configured password hashers and recommend PBKDF2 iterations.
+
+    python manage.py calibrate_password_hasher --target-ms 150
+    python manage.py calibrate_password_hasher --target-ms 150 --write
+"""
+
+from datetime import datetime, timezone
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hashers
+from django.core.management.base import BaseCommand, CommandError
+
+from core.conf import auth_settings
+from core.hashers import time_hasher, write_calibration
+
+
+# OWASP's floor for PBKDF2-HMAC-SHA256; a fast host must not talk us below it
+DEFAULT_MIN_ITERATIONS = 600_000
+ROUND_TO = 10_000
+
+
+class Command(BaseCommand):
+    help = "Measure password hashing cost on this host and recommend (or write) a PBKDF2 iteration count."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target-ms", type=float, default=100.0,
+                            help="Desired time for one password check, in milliseconds (default: 100).")
+        parser.add_argument("--rounds", type=int, default=5,
+                            help="Timed hashes per measurement; the median is used (default: 5).")
+        parser.add_argument("--min-iterations", type=int, default=DEFAULT_MIN_ITERATIONS,
+                            help=f"Never recommend fewer PBKDF2 iterations (default: {DEFAULT_MIN_ITERATIONS}).")
+        parser.add_argument("--write", action="store_true",
+                            help="Write the recommendation to CORE_AUTH['PASSWORD_HASHER_CALIBRATION_FILE'].")
+
+    def handle(self, *args, **options):
+        target = options["target_ms"] / 1000
+        rounds = options["rounds"]
+        if target <= 0 or rounds < 1:
+            raise CommandError("--target-ms and --rounds must be positive")
+
+        self.stdout.write(f"{'hasher':<40} {'iterations':>12} {'ms':>10}")
+        for hasher in get_hashers():
+            iterations = getattr(hasher, "iterations", None)
+            try:
+                seconds = time_hasher(hasher, rounds=rounds)
+            except ValueError as e:
+                # Argon2/bcrypt without their optional libraries installed
+                self.stdout.write(f"{hasher.algorithm:<40} {'-':>12} {'unavailable':>10}  ({e})")
+                continue
+            shown = iterations if isinstance(iterations, int) else "-"
+            self.stdout.write(f"{hasher.algorithm:<40} {shown:>12} {seconds * 1000:>10.2f}")
+
+        pbkdf2 = next((h for h in get_hashers() if isinstance(h, PBKDF2PasswordHasher)), None)
+        if pbkdf2 is None:
+            raise CommandError("No PBKDF2 hasher in PASSWORD_HASHERS; nothing to calibrate")
+
+        iterations, seconds = self._calibrate(pbkdf2, target, rounds, options["min_iterations"])
+        self.stdout.write(
+            f"\nRecommended {pbkdf2.algorithm} iterations: {iterations} "
+            f"(~{seconds * 1000:.1f} ms, target {options['target_ms']:.1f} ms)"
+        )
+        if seconds > target * 1.5:
+            self.stdout.write(self.style.WARNING(
+                "The minimum iteration count alone exceeds the target on this host."
+            ))
+
+        if not options["write"]:
+            self.stdout.write(
+                'Set CORE_AUTH["PASSWORD_HASH_ITERATIONS"] or rerun with --write to apply it.'
+            )
+            return
+
+        path = auth_settings.PASSWORD_HASHER_CALIBRATION_FILE
+        if not path:
+            raise CommandError("CORE_AUTH['PASSWORD_HASHER_CALIBRATION_FILE'] is not set")
+        write_calibration(
+            path,
+            iterations,
+            algorithm=pbkdf2.algorithm,
+            target_ms=options["target_ms"],
+            measured_ms=round(seconds * 1000, 2),
+            calibrated_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path}"))
+
+    def _calibrate(self, hasher, target, rounds, min_iterations):
+        """
+        PBKDF2 cost is linear in iterations: extrapolate from a probe, then
+        re-measure the candidate once to absorb fixed per-hash overhead.
+        """
+        probe = 100_000
+        per_iteration = time_hasher(hasher, rounds=rounds, iterations=probe) / probe
+        iterations = self._round(target / per_iteration, min_iterations)
+
+        seconds = time_hasher(hasher, rounds=rounds, iterations=iterations)
+        iterations = self._round(iterations * target / seconds, min_iterations)
+        return iterations, time_hasher(hasher, rounds=rounds, iterations=iterations)
+
+    @staticmethod
+    def _round(iterations, min_iterations):
+        return max(min_iterations, int(round(iterations / ROUND_TO)) * ROUND_TO or ROUND_TO)
@@ -0,0 +1,18 @@
+"""
+Delete revocations whose tokens have expired; they can no longer be presented.
+
+    python manage.py purge_revoked_tokens
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete RevokedToken rows past their token's expiry."
+
+    def handle(self, *args, **options):
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired revocation(s)"))
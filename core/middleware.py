@@ -0,0 +1,216 @@
+"""
+Single-pass bearer token resolution.
+
+JWTPrincipalMiddleware parses and verifies the Authorization header once per
+request and stores the outcome on ``request.token_resolution``. The decorators
+in core/decorators.py and CoreUserJWTAuthentication both read it through
+resolve_request_token(), so stacked decorators (e.g. @role_required +
+@permission_required) and DRF views never verify the same token twice.
+Without the middleware, the first consumer resolves and memoizes it instead.
+
+The middleware is async-capable: under ASGI with async views it resolves via
+aresolve_request_token() on the event loop instead of in a thread.
+"""
+
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from core.principal import ClaimsPrincipal, token_principal
+from core.token_cache import averify_access_token, verify_access_token
+
+
+class TokenResolution:
+    """
+    Outcome of reading the bearer token of one request.
+
+    Either ``token`` is the verified AccessToken, or ``error`` holds the JSON
+    body the decorators answer with, ``status_code`` its HTTP status and
+    ``reason`` one of MISSING, BAD_FORMAT or INVALID. Anything other than a
+    token error (a database outage in the revocation check, a bug) is not a
+    resolution: it propagates.
+    """
+
+    MISSING = 'missing'
+    BAD_FORMAT = 'bad_format'
+    INVALID = 'invalid'
+
+    def __init__(self, token=None, error=None, status_code=None, reason=None, parse_seconds=0.0):
+        self.token = token
+        self.error = error
+        self.status_code = status_code
+        self.reason = reason
+        self.parse_seconds = parse_seconds
+        self._principal = None
+
+    @property
+    def principal(self):
+        """ClaimsPrincipal (request.user in claims-only mode) for the token, built on first access."""
+        if self._principal is None and self.token is not None:
+            self._principal = ClaimsPrincipal(self.token)
+        return self._principal
+
+    @property
+    def token_principal(self):
+        """The token's cached TokenPrincipal."""
+        return token_principal(self.token)
+
+    @property
+    def role_set(self):
+        """Token roles as a frozenset (empty without role claims)."""
+        return token_principal(self.token).role_set or frozenset()
+
+    @property
+    def permission_set(self):
+        """Token permissions as a frozenset (empty without permission claims)."""
+        return token_principal(self.token).permission_set or frozenset()
+
+
+class ResolutionStats:
+    """Process-wide counters for token resolution cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def record(self, seconds):
+        with self._lock:
+            self.resolutions += 1
+            self.total_seconds += seconds
+
+    def clear(self):
+        self.resolutions = 0
+        self.total_seconds = 0.0
+
+    def stats(self):
+        return {
+            "resolutions": self.resolutions,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_us": round(self.total_seconds / self.resolutions * 1e6, 2) if self.resolutions else 0.0,
+        }
+
+
+resolution_stats = ResolutionStats()
+
+
+# Header parsing only: simplejwt's header name, accepted types and
+# two-part check, without its token validation
+_header_parser = JWTAuthentication()
+
+_TOKEN_ERRORS = (TokenError, InvalidToken, AuthenticationFailed)
+
+
+def _read_header(request):
+    """(raw_token, None) for a bearer header, else (None, the failed TokenResolution)."""
+    header = _header_parser.get_header(request)
+
+    if not header:
+        return None, TokenResolution(error={
+            'error': 'Authorization header is required',
+            'message': 'Please provide a valid JWT token in the Authorization header'
+        }, status_code=status.HTTP_401_UNAUTHORIZED, reason=TokenResolution.MISSING)
+
+    try:
+        raw_token = _header_parser.get_raw_token(header)
+    except AuthenticationFailed as exc:
+        # A bearer header with a missing or extra value
+        return None, _rejected(exc)
+
+    if raw_token is None:
+        return None, TokenResolution(error={
+            'error': 'Invalid authorization header format',
+            'message': 'Authorization header must start with "Bearer "'
+        }, status_code=status.HTTP_401_UNAUTHORIZED, reason=TokenResolution.BAD_FORMAT)
+
+    return raw_token.decode(), None
+
+
+def _rejected(exc):
+    message = exc.detail if isinstance(exc, AuthenticationFailed) else exc
+    return TokenResolution(error={
+        'error': 'Invalid token',
+        'message': str(message)
+    }, status_code=status.HTTP_401_UNAUTHORIZED, reason=TokenResolution.INVALID)
+
+
+def _resolve(request):
+    token, failed = _read_header(request)
+    if failed is not None:
+        return failed
+    try:
+        return TokenResolution(token=verify_access_token(token))
+    except _TOKEN_ERRORS as e:
+        return _rejected(e)
+
+
+async def _aresolve(request):
+    token, failed = _read_header(request)
+    if failed is not None:
+        return failed
+    try:
+        return TokenResolution(token=await averify_access_token(token))
+    except _TOKEN_ERRORS as e:
+        return _rejected(e)
+
+
+def _memoize(request, resolution, start):
+    resolution.parse_seconds = time.perf_counter() - start
+    resolution_stats.record(resolution.parse_seconds)
+    request.token_resolution = resolution
+    return resolution
+
+
+def resolve_request_token(request):
+    """
+    Return the TokenResolution for this request, resolving it on first call.
+    Accepts a Django HttpRequest or a DRF Request.
+    """
+    request = getattr(request, '_request', request)
+    resolution = getattr(request, 'token_resolution', None)
+    if resolution is None:
+        start = time.perf_counter()
+        resolution = _memoize(request, _resolve(request), start)
+    return resolution
+
+
+async def aresolve_request_token(request):
+    """Async resolve_request_token(); both share the memoized resolution."""
+    request = getattr(request, '_request', request)
+    resolution = getattr(request, 'token_resolution', None)
+    if resolution is None:
+        start = time.perf_counter()
+        resolution = _memoize(request, await _aresolve(request), start)
+    return resolution
+
+
+class JWTPrincipalMiddleware:
+    """
+    Resolve the bearer token once, before any view or decorator runs.
+
+    Usage (settings.MIDDLEWARE):
+    'core.middleware.JWTPrincipalMiddleware',
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        resolve_request_token(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        await aresolve_request_token(request)
+        return await self.get_response(request)
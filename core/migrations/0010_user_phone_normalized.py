@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:10
+
+import re
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+# Frozen copy of core.pydantic_models.normalize_phone as of this migration, so
+# later changes to the live function never change what it backfilled.
+_PHONE_NOISE = re.compile(r'[^\d+]')
+
+
+def normalize_phone(phone):
+    cleaned = _PHONE_NOISE.sub('', phone.strip())
+    return cleaned[:1] + cleaned[1:].replace('+', '')
+
+
+def populate_phone_normalized(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    by_number = defaultdict(list)
+    for user_id, phone in User.objects.values_list('user_id', 'phone'):
+        by_number[normalize_phone(phone)].append(user_id)
+
+    clashes = {number: ids for number, ids in by_number.items() if len(ids) > 1}
+    if clashes:
+        raise RuntimeError(
+            "These users' phone numbers only differ in formatting; merge or fix them "
+            f"before migrating (normalized number -> user ids): {clashes}"
+        )
+
+    users = [User(user_id=ids[0], phone_normalized=number) for number, ids in by_number.items()]
+    User.objects.bulk_update(users, ['phone_normalized'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_user_role_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='phone_normalized',
+            field=models.CharField(editable=False, max_length=20, null=True),
+        ),
+        migrations.RunPython(populate_phone_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='phone_normalized',
+            field=models.CharField(editable=False, max_length=20, unique=True),
+        ),
+    ]
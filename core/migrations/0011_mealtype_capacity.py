@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_seats_taken(apps, schema_editor):
+    MealType = apps.get_model('core', 'MealType')
+    slots = MealType.objects.annotate(active=Count('booking', filter=Q(booking__cancelled=False)))
+    updated = []
+    for slot in slots.filter(active__gt=0):
+        slot.seats_taken = slot.active
+        updated.append(slot)
+    MealType.objects.bulk_update(updated, ['seats_taken'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_user_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mealtype',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mealtype',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_seats_taken, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 from datetime import timedelta
+from core.pydantic_models import normalize_phone
 
 
 #manages the creation of custom user model
@@ -45,6 +46,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=100)
     room_no = models.CharField(max_length=10, null=True, blank=True)
     phone = models.CharField(max_length=15, unique=True)
+    # normalize_phone(phone), kept in sync by save(); login looks users up by it
+    phone_normalized = models.CharField(max_length=20, unique=True, editable=False)
     email = models.EmailField(unique=True)
     roll_no = models.CharField(max_length=20, unique=True, null=True, blank=True)
     password = models.CharField(max_length=130)
@@ -55,6 +58,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_staff = models.BooleanField(default=False)
     is_superuser = models.BooleanField(default=False)
 
+    # bumped to retire every token issued so far (see core/token_version.py)
+    token_version = models.PositiveIntegerField(default=0)
+    # bumped when roles change; refresh then re-derives the token claims
+    role_version = models.PositiveIntegerField(default=0)
+
     date_joined = models.DateTimeField(default=timezone.now)
 
     #instead of username it asks to enter phone number
@@ -65,6 +73,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     #use the custom manager
     objects = UserManager()
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'phone' in update_fields:
+            self.phone_normalized = normalize_phone(self.phone)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'phone_normalized'}
+        super().save(*args, **kwargs)
+
     # user name will be displayed
     def __str__(self):
         return self.name
@@ -113,6 +129,12 @@ class MealType(models.Model):
     delayed = models.BooleanField(default=False)
     delay_minutes = models.PositiveIntegerField(null=True, blank=True)
     reserve_meal = models.BooleanField(default=False)
+    capacity = models.PositiveIntegerField(null=True, blank=True)   # None = unlimited
+    # Active bookings; only changed by core/booking.py with conditional UPDATEs
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+
+    def is_full(self):
+        return self.capacity is not None and self.seats_taken >= self.capacity
 
 class Feedback(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -158,10 +180,24 @@ class Booking(models.Model):
 
     objects = BookingManager()
 
-    # one user -> one booking per meal_slot
-    # Prevents duplicate bookings for the same meal slot by the same user.
+    # one user -> one active booking per meal_slot
+    # Prevents duplicate bookings for the same meal slot by the same user;
+    # cancelled rows are left out, so a student can book again after cancelling.
+    # Partial index: only the active rows are indexed.
     class Meta:
-        unique_together = ("user", "meal_slot")   #1 booking per slot per student
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "meal_slot"],
+                condition=models.Q(cancelled=False),
+                name="unique_active_booking",
+            ),
+        ]
+        # Keyset pagination order (core/pagination.py): all bookings for staff,
+        # one user's for students and history
+        indexes = [
+            models.Index(fields=["created_at", "booking_id"], name="booking_created_idx"),
+            models.Index(fields=["user", "created_at", "booking_id"], name="booking_user_created_idx"),
+        ]
 
     
     # bookings can be cancelled only 1 hour before the meal_slot
@@ -187,6 +223,17 @@ class AuditLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     details = models.TextField()
 
+class RevokedToken(models.Model):
+    # Denylisted token ids; read through core/revocation.py, never per request
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)  # rows are useless after the token's exp
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    reason = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"Revoked {self.jti}"
+
 
 
 
@@ -0,0 +1,130 @@
+"""
+Keyset pagination for booking lists.
+
+Pages are read newest first in (created_at, booking_id) order. A cursor holds
+the (created_at, booking_id) of the row a page ends on, and the next page is
+
+    WHERE created_at < %s OR (created_at = %s AND booking_id < %s)
+    ORDER BY created_at DESC, booking_id DESC LIMIT page_size + 1
+
+which the (created_at, booking_id) indexes on Booking answer by seeking, so a
+page costs the same on page 1 and page 10,000 and no COUNT(*) is run.
+booking_id breaks created_at ties, so the order is total and cursors stay
+valid while bookings are added or cancelled: no row is skipped or repeated.
+
+DRF's CursorPagination positions on a single field plus an offset for ties;
+this one keys on both columns.
+
+Usage:
+paginator = KeysetPagination()
+page = paginator.paginate_queryset(queryset, request, view=self)
+return paginator.get_paginated_response(Serializer(page, many=True).data)
+"""
+
+import base64
+import contextlib
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Responds with {"next": url or null, "previous": url or null, "results": [...]}.
+    Clients follow the links; the cursors in them are opaque.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+    # Newest first; the pk breaks ties
+    position_fields = ('created_at', 'booking_id')
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        time_field, key_field = self.position_fields
+        if reverse:
+            # Walking back towards newer rows: read oldest first, then flip
+            ordering = (time_field, key_field)
+            lookup = 'gt'
+        else:
+            ordering = (f'-{time_field}', f'-{key_field}')
+            lookup = 'lt'
+        if position is not None:
+            when, key = position
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__{lookup}': when}) | Q(**{time_field: when, f'{key_field}__{lookup}': key})
+            )
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        page = rows[:page_size]
+        if reverse:
+            page.reverse()
+
+        # Coming from a cursor means there are rows on the side we came from
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = page
+        return page
+
+    def get_page_size(self, request):
+        with contextlib.suppress(KeyError, ValueError):
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Paged past the end: the first page is the way back
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        time_field, key_field = self.position_fields
+        cursor = self.encode_cursor(getattr(row, time_field), getattr(row, key_field), reverse)
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    @staticmethod
+    def encode_cursor(when, key, reverse):
+        payload = json.dumps([when.isoformat(), key, int(reverse)], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        """((created_at, booking_id), reverse) from the request, or (None, False) for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            payload = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            when, key, reverse = json.loads(payload)
+            position = (datetime.fromisoformat(when), int(key))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
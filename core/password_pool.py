@@ -0,0 +1,164 @@
+"""
+Bounded pool for password verification.
+
+PBKDF2 holds a CPU for tens of milliseconds per check. Running every login's
+check_password on the request thread lets a login storm occupy every worker,
+so the login views hand verification to a small dedicated thread pool
+(hashlib releases the GIL while hashing) with a hard cap on queued work.
+When the cap is reached the caller gets PasswordPoolSaturated immediately
+and answers 503 with Retry-After instead of queueing behind the storm.
+
+verify_and_update() also produces the replacement hash for passwords stored
+with outdated hasher parameters, so the rehash cost stays on the pool too.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from core.conf import auth_settings
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when no verification slot is free; retry_after is in seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password verification pool is saturated")
+        self.retry_after = retry_after
+
+
+def _check_and_rehash(password, encoded):
+    rehashed = []
+    valid = check_password(password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return valid, (rehashed[0] if rehashed else None)
+
+
+class PasswordVerificationPool:
+    """
+    Usage:
+    pool = get_password_pool()
+    try:
+        valid = pool.verify(raw_password, user.password)
+    except PasswordPoolSaturated as e:
+        ...  # 503, Retry-After: e.retry_after
+
+    valid, new_encoded = pool.verify_and_update(raw_password, user.password)
+    """
+
+    def __init__(self, max_workers, max_pending, timeout, retry_after):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-verify')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.clear_stats()
+
+    def clear_stats(self):
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.total_hash = 0.0
+        self.max_wait = 0.0
+
+    def _run(self, func, password, encoded, submitted_at):
+        started_at = time.perf_counter()
+        try:
+            return func(password, encoded)
+        finally:
+            finished_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self.total_wait += wait
+                self.total_hash += finished_at - started_at
+                self.max_wait = max(self.max_wait, wait)
+
+    def verify(self, password, encoded):
+        return self._submit(check_password, password, encoded)
+
+    def verify_and_update(self, password, encoded):
+        """
+        Return ``(valid, new_encoded)``. new_encoded is a fresh hash from the
+        preferred hasher when the password is valid but stored with another
+        hasher or outdated parameters, otherwise None. Saving it is up to
+        the caller.
+        """
+        return self._submit(_check_and_rehash, password, encoded)
+
+    def _submit(self, func, password, encoded):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated(self.retry_after)
+            self._pending += 1
+
+        future = self._executor.submit(self._run, func, password, encoded, time.perf_counter())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # The hash still finishes in the background and frees its slot
+            with self._lock:
+                self.timed_out += 1
+            raise PasswordPoolSaturated(self.retry_after)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        completed = self.completed
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "completed": completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self.total_wait / completed * 1000, 3) if completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "avg_hash_ms": round(self.total_hash / completed * 1000, 3) if completed else 0.0,
+        }
+
+
+_password_pool = None
+_password_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    """Return the process-wide PasswordVerificationPool."""
+    global _password_pool
+    if _password_pool is None:
+        with _password_pool_lock:
+            if _password_pool is None:
+                _password_pool = PasswordVerificationPool(
+                    max_workers=auth_settings.PASSWORD_POOL_WORKERS,
+                    max_pending=auth_settings.PASSWORD_POOL_MAX_PENDING,
+                    timeout=auth_settings.PASSWORD_POOL_TIMEOUT,
+                    retry_after=auth_settings.PASSWORD_POOL_RETRY_AFTER,
+                )
+    return _password_pool
+
+
+def reset_password_pool():
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is not None:
+            _password_pool.shutdown()
+        _password_pool = None
+
+
+@receiver(setting_changed)
+def reset_password_pool_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] == "CORE_AUTH":
+        reset_password_pool()
@@ -1,7 +1,7 @@
 # permissions.py
 
 from rest_framework.permissions import BasePermission, SAFE_METHODS
-from core.auth import verify_user_permission, verify_user_role
+from core.auth import user_permission_set, user_role_set
 
 
 class IsAdmin(BasePermission):
@@ -28,29 +28,38 @@ class ReadOnly(BasePermission):
         return request.method in SAFE_METHODS
 
 
+def _as_frozenset(value):
+    return frozenset(value) if isinstance(value, (list, tuple, set, frozenset)) else frozenset([value])
+
+
 # Generic Role-Based Permission Class
 class HasRole(BasePermission):
     """
     Allow access only to users with specific roles.
     Supports single role, multiple roles, or any combination.
+    The requirement is a frozenset built once (when the class is created by
+    has_role), so a request costs one intersection test against the role set
+    of the user's TokenPrincipal.
     
     Usage:
     - HasRole('admin')  # Single role
     - HasRole(['admin', 'staff'])  # Any of these roles
     - HasRole('superuser')  # Single role
     """
-    def __init__(self, required_roles):
-        self.required_roles = required_roles if isinstance(required_roles, list) else [required_roles]
+    required_roles = frozenset()
+
+    def __init__(self, required_roles=None):
+        if required_roles is not None:
+            self.required_roles = _as_frozenset(required_roles)
     
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
+        user = request.user
+        if not user or not user.is_authenticated:
             return False
         
         # Check if user has any of the required roles
-        for role in self.required_roles:
-            if verify_user_role(request.user, role):
-                return True
-        return False
+        roles = user_role_set(user)
+        return not self.required_roles.isdisjoint(roles)
 
 
 # Generic Permission-Based Permission Class
@@ -58,83 +67,72 @@ class HasPermission(BasePermission):
     """
     Allow access only to users with specific permissions.
     Supports single permission, multiple permissions (ALL required), or any combination.
+    Checked with one subset (ALL) or intersection (ANY) test.
     
     Usage:
     - HasPermission('user.read')  # Single permission
     - HasPermission(['user.read', 'user.update'])  # ALL permissions required
     - HasPermission('mess.create')  # Single permission
     """
-    def __init__(self, required_permissions, require_all=True):
-        self.required_permissions = required_permissions if isinstance(required_permissions, list) else [required_permissions]
-        self.require_all = require_all  # True = ALL permissions required, False = ANY permission
+    required_permissions = frozenset()
+    require_all = True  # True = ALL permissions required, False = ANY permission
+
+    def __init__(self, required_permissions=None, require_all=None):
+        if required_permissions is not None:
+            self.required_permissions = _as_frozenset(required_permissions)
+        if require_all is not None:
+            self.require_all = require_all
     
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
+        user = request.user
+        if not user or not user.is_authenticated:
             return False
         
+        granted = user_permission_set(user)
         if self.require_all:
             # Check if user has ALL required permissions
-            for permission in self.required_permissions:
-                if not verify_user_permission(request.user, permission):
-                    return False
-            return True
-        else:
-            # Check if user has ANY of the required permissions
-            for permission in self.required_permissions:
-                if verify_user_permission(request.user, permission):
-                    return True
-            return False
+            return self.required_permissions <= granted
+        # Check if user has ANY of the required permissions
+        return not self.required_permissions.isdisjoint(granted)
 
 
 # Factory functions for creating permission classes
 def has_role(required_roles):
     """
     Factory function to create a HasRole permission class.
+    The requirement set is computed here, once per class.
     """
-    class RolePermission(HasRole):
-        def __init__(self):
-            super().__init__(required_roles)
-    
-    return RolePermission
+    return type('RolePermission', (HasRole,), {
+        'required_roles': _as_frozenset(required_roles),
+    })
 
 
 def has_permission(required_permissions, require_all=True):
     """
     Factory function to create a HasPermission permission class.
+    The requirement set is computed here, once per class.
     """
-    class PermissionPermission(HasPermission):
-        def __init__(self):
-            super().__init__(required_permissions, require_all)
-    
-    return PermissionPermission
+    return type('PermissionPermission', (HasPermission,), {
+        'required_permissions': _as_frozenset(required_permissions),
+        'require_all': require_all,
+    })
 
 
 # Convenience Classes for Common Patterns
-class AdminOrStaff(BasePermission):
+class AdminOrStaff(HasRole):
     """
     Allow access to admin or staff users.
     Convenience class for common admin/staff access pattern.
     """
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and (
-            verify_user_role(request.user, 'admin') or 
-            verify_user_role(request.user, 'staff') or
-            verify_user_role(request.user, 'superuser')
-        )
+    required_roles = frozenset(['admin', 'staff', 'superuser'])
 
 
-class StudentOrAdmin(BasePermission):
+class StudentOrAdmin(HasRole):
     """
     Allow access to students or admin users.
     Convenience class for endpoints accessible to both students and admins.
     """
-    def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and (
-            verify_user_role(request.user, 'student') or 
-            verify_user_role(request.user, 'admin') or
-            verify_user_role(request.user, 'staff') or
-            verify_user_role(request.user, 'superuser')
-        )
+    required_roles = frozenset(['student', 'admin', 'staff', 'superuser'])
 
 
 # Example of how to use the generic classes (for documentation)
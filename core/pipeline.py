@@ -0,0 +1,62 @@
+"""
+Per-URL-prefix middleware pipelines.
+
+The JSON API is JWT-only and never uses sessions, cookies-based CSRF,
+django.contrib.messages or frame options, yet the stock middleware runs for
+every request. The classes below are drop-in subclasses of those middleware
+that step aside for paths under ``settings.LEAN_MIDDLEWARE_PREFIXES``: the
+request goes straight to the next layer and their process_view hooks return
+None. Everywhere else (notably ``/admin/``) they behave exactly like their
+parents.
+
+Because they subclass the originals, Django's system checks (e.g. the admin's
+"SessionMiddleware must be in MIDDLEWARE") keep passing.
+
+Usage (settings.MIDDLEWARE):
+'core.pipeline.SessionMiddleware',  # instead of django.contrib.sessions...
+"""
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+
+
+class LeanPrefixMixin:
+    """Skip this middleware for requests under the lean prefixes."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.lean_prefixes = tuple(getattr(settings, 'LEAN_MIDDLEWARE_PREFIXES', ()))
+
+    def is_lean(self, request):
+        return request.path_info.startswith(self.lean_prefixes)
+
+    def __call__(self, request):
+        if self.is_lean(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+def _lean(middleware_class):
+    attrs = {
+        '__module__': __name__,
+        '__doc__': f"{middleware_class.__module__}.{middleware_class.__name__}, skipped for lean prefixes.",
+    }
+    # Only middleware that has a view hook gets one; Django calls every
+    # registered process_view on every request.
+    if hasattr(middleware_class, 'process_view'):
+        def process_view(self, request, view_func, view_args, view_kwargs):
+            if self.is_lean(request):
+                return None
+            return middleware_class.process_view(self, request, view_func, view_args, view_kwargs)
+        attrs['process_view'] = process_view
+    return type(middleware_class.__name__, (LeanPrefixMixin, middleware_class), attrs)
+
+
+SessionMiddleware = _lean(sessions_middleware.SessionMiddleware)
+CsrfViewMiddleware = _lean(csrf.CsrfViewMiddleware)
+AuthenticationMiddleware = _lean(auth_middleware.AuthenticationMiddleware)
+MessageMiddleware = _lean(messages_middleware.MessageMiddleware)
+XFrameOptionsMiddleware = _lean(clickjacking.XFrameOptionsMiddleware)
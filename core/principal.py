@@ -0,0 +1,175 @@
+"""
+Authenticated principals built from validated JWT claims.
+
+TokenPrincipal is the immutable, slotted identity of one verified access
+token: user id, name/email/phone, staff flags, and roles/permissions as sorted
+tuples (for responses) and frozensets (for checks). It is built once per
+token by token_principal() and kept on the token object, which itself lives
+in the verified-token cache (core/token_cache.py), so repeated requests with
+the same bearer token reuse it. The decorators expose it as
+``request.principal`` and CoreUserJWTAuthentication as
+``request.user.principal``.
+
+ClaimsPrincipal is the request.user of the claims-only authentication mode
+(see core.auth.ClaimsOnlyJWTAuthentication). Everything the token carries is
+answered from its TokenPrincipal; any other attribute loads the real core.User
+through the user cache on first access.
+"""
+
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from core.claims import has_role_claims, has_permission_claims, token_roles, token_permissions
+from core.models import User
+from core.user_cache import get_user_cache
+
+
+# Identity claims. Those missing from a token are left out of
+# TokenPrincipal.claimed, so ClaimsPrincipal reads fall through to the User.
+CLAIM_ATTRIBUTES = ('name', 'email', 'phone', 'is_staff', 'is_superuser')
+
+
+class TokenPrincipal:
+    """
+    Usage:
+    principal = token_principal(validated_token)
+    principal.role_set       # frozenset, or None if the token has no role claims
+    principal.roles          # sorted tuple, for responses
+    principal.as_dict()      # JSON-ready
+    """
+
+    __slots__ = (
+        'user_id', 'name', 'email', 'phone', 'is_staff', 'is_superuser',
+        'roles', 'permissions', 'role_set', 'permission_set', 'claimed',
+    )
+
+    def __init__(self, user_id, name='', email='', phone='', is_staff=False, is_superuser=False,
+                 role_set=None, permission_set=None, claimed=frozenset()):
+        values = {
+            'user_id': user_id,
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'is_staff': is_staff,
+            'is_superuser': is_superuser,
+            'role_set': role_set,
+            'permission_set': permission_set,
+            'roles': tuple(sorted(role_set or ())),
+            'permissions': tuple(sorted(permission_set or ())),
+            'claimed': claimed,
+        }
+        for attr, value in values.items():
+            object.__setattr__(self, attr, value)
+
+    @classmethod
+    def from_token(cls, validated_token):
+        return cls(
+            user_id=validated_token.get(api_settings.USER_ID_CLAIM),
+            name=validated_token.get('name', ''),
+            email=validated_token.get('email', ''),
+            phone=validated_token.get('phone', ''),
+            is_staff=validated_token.get('is_staff', False),
+            is_superuser=validated_token.get('is_superuser', False),
+            role_set=token_roles(validated_token) if has_role_claims(validated_token) else None,
+            permission_set=token_permissions(validated_token) if has_permission_claims(validated_token) else None,
+            claimed=frozenset(claim for claim in CLAIM_ATTRIBUTES if claim in validated_token),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def as_dict(self):
+        return {
+            'user_id': self.user_id,
+            'name': self.name,
+            'email': self.email,
+            'roles': list(self.roles),
+            'permissions': list(self.permissions),
+            'is_staff': self.is_staff,
+            'is_superuser': self.is_superuser,
+        }
+
+    def __repr__(self):
+        return f"<TokenPrincipal user_id={self.user_id!r} roles={self.roles!r}>"
+
+
+def token_principal(validated_token):
+    """The token's TokenPrincipal, built on first use and kept on the token."""
+    principal = getattr(validated_token, 'principal', None)
+    if principal is None:
+        principal = validated_token.principal = TokenPrincipal.from_token(validated_token)
+    return principal
+
+
+def _claim_property(attr):
+    def get(self):
+        if attr in self.principal.claimed:
+            return getattr(self.principal, attr)
+        return getattr(self.user, attr)
+    return property(get)
+
+
+class ClaimsPrincipal:
+    """
+    Stand-in for request.user that avoids the core_user lookup.
+
+    Usage:
+    principal = ClaimsPrincipal(validated_token)
+    principal.roles      # from the token, no query
+    principal.room_no    # not in the token -> loads the User once
+    """
+
+    __slots__ = ('principal', '_user', '_role_set', '_permission_set', '_computed_roles')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, validated_token):
+        principal = token_principal(validated_token)
+        if principal.user_id is None:
+            raise AuthenticationFailed("Token contained no user_id")
+        self.principal = principal
+        self._user = None
+
+    user_id = property(lambda self: self.principal.user_id)
+    pk = property(lambda self: self.principal.user_id)
+    roles = property(lambda self: self.principal.roles)
+    permissions = property(lambda self: self.principal.permissions)
+
+    name = _claim_property('name')
+    email = _claim_property('email')
+    phone = _claim_property('phone')
+    is_staff = _claim_property('is_staff')
+    is_superuser = _claim_property('is_superuser')
+
+    @property
+    def user(self):
+        """The backing core.User, loaded on first access."""
+        if self._user is None:
+            try:
+                user = get_user_cache().get_user(self.user_id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found", code="user_not_found")
+            if not user.is_active:
+                raise AuthenticationFailed("User inactive", code="user_inactive")
+            self._user = user
+        return self._user
+
+    def __getattr__(self, name):
+        # Only reached for attributes not answered by the claims
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        if isinstance(other, (ClaimsPrincipal, User)):
+            return str(self.pk) == str(other.pk)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self.pk))
+
+    def __str__(self):
+        return self.principal.name or str(self.user_id)
@@ -108,6 +108,19 @@ def validate_email(email: str) -> str:
     return email
 
 
+_PHONE_NOISE = re.compile(r'[^\d+]')
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Canonical form of a phone number: digits only, keeping a leading '+'.
+    "+1-555-123-4567" and "+1 (555) 123 4567" both become "+15551234567".
+    Stored in User.phone_normalized and used for login lookups.
+    """
+    cleaned = _PHONE_NOISE.sub('', phone.strip())
+    return cleaned[:1] + cleaned[1:].replace('+', '')
+
+
 def validate_phone_number(phone: str) -> str:
     """
     Enhanced phone number validation with better international support.
@@ -118,7 +131,7 @@ def validate_phone_number(phone: str) -> str:
     phone = phone.strip()
     
     # Remove all non-digit characters except +
-    cleaned = re.sub(r'[^\d+]', '', phone)
+    cleaned = normalize_phone(phone)
     
     # Check if it starts with + (international format)
     if cleaned.startswith('+'):
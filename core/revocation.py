@@ -0,0 +1,286 @@
+"""
+Token revocation by ``jti``.
+
+Revoked token ids live in the RevokedToken table. Each process mirrors the
+table in a Bloom filter, so the common "not revoked" answer costs a few hash
+probes and no I/O; only a filter hit (a revoked token or a rare false
+positive) is confirmed against the table. The filter picks up rows revoked by
+other processes every REVOCATION_SYNC_INTERVAL seconds with one indexed query
+on revoked_at, and is rebuilt every REVOCATION_REBUILD_INTERVAL seconds to shed
+rows whose tokens have expired.
+
+verify_access_token() in core/token_cache.py consults is_token_revoked(), so
+CoreUserJWTAuthentication and the decorators in core/decorators.py both
+reject revoked tokens. It also covers tokens retired wholesale by a
+user's token generation (core/token_version.py).
+
+ais_token_revoked() is the same check for async callers: filter probes run on
+the event loop and the occasional sync, rebuild or confirmation goes through
+the async ORM.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from core.conf import auth_settings
+from core.models import RevokedToken
+from core.token_version import ais_token_version_current, is_token_version_current
+
+
+# Sync windows overlap by this much so rows from transactions that committed
+# late (revoked_at is set at insert, not at commit) are still picked up.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings, sized for ``capacity`` entries at
+    ``error_rate`` false positives. Uses double hashing over one blake2b digest.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def _hashes(key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def _positions(self, key):
+        h1, h2 = self._hashes(key)
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        """
+        Add key; returns False (and leaves count alone) if it already tested
+        present, so count is the number of distinct keys minus false positives.
+        """
+        positions = self._positions(key)
+        bits = self.bits
+        if all(bits[pos >> 3] & (1 << (pos & 7)) for pos in positions):
+            return False
+        for pos in positions:
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        return True
+
+    def __contains__(self, key):
+        # Probes are computed lazily: a non-member usually fails on the first one or two
+        h1, h2 = self._hashes(key)
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            pos = (h1 + i * h2) % num_bits
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+
+class RevocationList:
+    """
+    Usage:
+    revocations = get_revocation_list()
+    revocations.revoke(token, reason='logout')
+    revocations.is_revoked(token['jti'])
+    """
+
+    def __init__(self, capacity, error_rate, sync_interval, rebuild_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._sync_from = None
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self.checks = 0
+        self.filter_hits = 0
+        self.confirmed = 0
+        self.syncs = 0
+        self.rebuilds = 0
+
+    def is_revoked(self, jti):
+        self._refresh()
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+        self.filter_hits += 1
+        revoked = RevokedToken.objects.filter(jti=jti).exists()
+        if revoked:
+            self.confirmed += 1
+        return revoked
+
+    async def ais_revoked(self, jti):
+        """Async is_revoked()."""
+        await self._arefresh()
+        self.checks += 1
+        if jti not in self._bloom:
+            return False
+        self.filter_hits += 1
+        revoked = await RevokedToken.objects.filter(jti=jti).aexists()
+        if revoked:
+            self.confirmed += 1
+        return revoked
+
+    def revoke(self, token, reason=''):
+        """Denylist a verified token (access or refresh) until its exp."""
+        jti = token[api_settings.JTI_CLAIM]
+        RevokedToken.objects.get_or_create(jti=jti, defaults={
+            'user_id': token.get(api_settings.USER_ID_CLAIM),
+            'expires_at': datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+            'reason': reason,
+        })
+        self._refresh()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def _due(self):
+        """'rebuild', 'sync' or None, depending on how old the filter is."""
+        now = time.monotonic()
+        if self._bloom is None or now - self._built_at >= self.rebuild_interval:
+            return 'rebuild'
+        if now - self._synced_at >= self.sync_interval:
+            return 'sync'
+        return None
+
+    def _refresh(self):
+        due = self._due()
+        if due == 'rebuild':
+            self.rebuild()
+        elif due == 'sync':
+            self.sync()
+
+    async def _arefresh(self):
+        due = self._due()
+        if due == 'rebuild':
+            await self._arebuild()
+        elif due == 'sync':
+            await self._async_sync()
+
+    @staticmethod
+    def _live(started):
+        return RevokedToken.objects.filter(expires_at__gt=started).values_list('jti', flat=True)
+
+    def _revoked_since(self):
+        return RevokedToken.objects.filter(revoked_at__gte=self._sync_from).values_list('jti', flat=True)
+
+    def rebuild(self):
+        started = timezone.now()
+        self._install(list(self._live(started)), started)
+
+    async def _arebuild(self):
+        started = timezone.now()
+        self._install([jti async for jti in self._live(started)], started)
+
+    def _install(self, jtis, started):
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._sync_from = started - SYNC_OVERLAP
+            self._built_at = self._synced_at = time.monotonic()
+            self.rebuilds += 1
+
+    def sync(self):
+        started = timezone.now()
+        if self._merge(list(self._revoked_since()), started):
+            self.rebuild()
+
+    async def _async_sync(self):
+        started = timezone.now()
+        if self._merge([jti async for jti in self._revoked_since()], started):
+            await self._arebuild()
+
+    def _merge(self, jtis, started):
+        """Add newly revoked jtis; True if the filter is past capacity and needs a rebuild."""
+        with self._lock:
+            for jti in jtis:
+                self._bloom.add(jti)
+            self._sync_from = started - SYNC_OVERLAP
+            self._synced_at = time.monotonic()
+            self.syncs += 1
+        # Past capacity the false positive rate climbs; resize now
+        return len(self._bloom) > self._bloom.capacity
+
+    def stats(self):
+        bloom = self._bloom
+        return {
+            "entries": len(bloom) if bloom else 0,
+            "capacity": bloom.capacity if bloom else self.capacity,
+            "bits": bloom.num_bits if bloom else 0,
+            "hashes": bloom.num_hashes if bloom else 0,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "confirmed": self.confirmed,
+            "false_positives": self.filter_hits - self.confirmed,
+            "syncs": self.syncs,
+            "rebuilds": self.rebuilds,
+        }
+
+
+_revocation_list = None
+_revocation_list_lock = threading.Lock()
+
+
+def get_revocation_list():
+    """Return the process-wide RevocationList."""
+    global _revocation_list
+    if _revocation_list is None:
+        with _revocation_list_lock:
+            if _revocation_list is None:
+                _revocation_list = RevocationList(
+                    capacity=auth_settings.REVOCATION_BLOOM_CAPACITY,
+                    error_rate=auth_settings.REVOCATION_BLOOM_ERROR_RATE,
+                    sync_interval=auth_settings.REVOCATION_SYNC_INTERVAL,
+                    rebuild_interval=auth_settings.REVOCATION_REBUILD_INTERVAL,
+                )
+    return _revocation_list
+
+
+def is_token_revoked(token):
+    """
+    True if the verified token's jti has been revoked or its user's token
+    generation has moved on. Tokens without a jti skip the denylist.
+    """
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is not None and get_revocation_list().is_revoked(jti):
+        return True
+    return not is_token_version_current(token)
+
+
+async def ais_token_revoked(token):
+    """Async is_token_revoked()."""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if jti is not None and await get_revocation_list().ais_revoked(jti):
+        return True
+    return not await ais_token_version_current(token)
+
+
+def reset_revocation_list():
+    global _revocation_list
+    with _revocation_list_lock:
+        _revocation_list = None
+
+
+@receiver(setting_changed)
+def reset_revocation_list_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] == "CORE_AUTH":
+        reset_revocation_list()
@@ -4,7 +4,7 @@ from .models import User, Mess, Booking, Coupon, Menu, MealType, Feedback, MessI
 from django.contrib.auth.hashers import make_password
 
 # Add Pydantic integration
-from .pydantic_models import UserPydantic, MessPydantic, CouponPydantic
+from .pydantic_models import UserPydantic, MessPydantic, CouponPydantic, normalize_phone
 from pydantic import ValidationError
 
 class PydanticValidatedSerializer(serializers.ModelSerializer):
@@ -79,6 +79,12 @@ class RegisterSerializer(PydanticValidatedSerializer):
             raise serializers.ValidationError("Email already registered")
         return value
 
+    def validate_phone(self, value):
+        # The same number in another format would hit the phone_normalized unique index
+        if User.objects.filter(phone_normalized=normalize_phone(value)).exists():
+            raise serializers.ValidationError("Phone number already registered")
+        return value
+
     def validate_roll_no(self, value):
         if User.objects.filter(roll_no=value).exists():
             raise serializers.ValidationError("Roll-no already registered")
@@ -1,8 +1,69 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import Group
+from core.booking import release_seat
+from core.models import Booking, User
+from core.user_cache import get_user_cache
+from core.token_version import (
+    ROLE_VERSION_FIELDS, TOKEN_VERSION_FIELDS, bump_role_version, bump_token_version, get_token_version_cache
+)
 
 @receiver(post_migrate)
 def create_user_groups(sender, **kwargs):
     Group.objects.get_or_create(name='Admin')
     Group.objects.get_or_create(name='Student')
+
+
+# Keep the auth user cache coherent: is_active / is_staff changes apply on
+# this process's next request. Other workers only see them once their local
+# copy expires (CORE_AUTH["USER_CACHE_TTL"]); see backend/settings.py.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    get_user_cache().invalidate(instance.pk)
+    get_token_version_cache().invalidate(instance.pk)
+
+
+# Deactivation retires the user's outstanding tokens; role changes retire
+# their access tokens and make the next refresh re-derive claims. The stored
+# row is only read when a save may touch one of those fields.
+_GENERATION_FIELDS = ('token_version', 'role_version')
+_WATCHED_FIELDS = {*TOKEN_VERSION_FIELDS, *ROLE_VERSION_FIELDS, *_GENERATION_FIELDS}
+
+
+@receiver(pre_save, sender=User)
+def detect_token_version_change(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & _WATCHED_FIELDS:
+        return
+    stored = User.objects.filter(pk=instance.pk).values(*_WATCHED_FIELDS).first()
+    if not stored:
+        return
+    # A full save must not write back a generation that was bumped meanwhile
+    for field in _GENERATION_FIELDS:
+        setattr(instance, field, max(getattr(instance, field), stored[field]))
+
+    def changed(fields):
+        return any(stored[field] != getattr(instance, field) for field in fields)
+
+    instance._generation_bumps = (changed(TOKEN_VERSION_FIELDS), changed(ROLE_VERSION_FIELDS))
+
+
+@receiver(post_save, sender=User)
+def retire_tokens_on_change(sender, instance, created, **kwargs):
+    retire_session, retire_claims = instance.__dict__.pop('_generation_bumps', (False, False))
+    if retire_session:
+        instance.token_version = bump_token_version(instance.pk)
+    if retire_claims:
+        instance.role_version = bump_role_version(instance.pk)
+
+
+# An active booking holds a seat in its slot (MealType.seats_taken). Bookings
+# are normally cancelled (core.booking.cancel_booking frees the seat), but a
+# delete through the admin, a queryset or a cascade from User/MealType must
+# free it too, or the slot would stay full for good.
+@receiver(post_delete, sender=Booking)
+def release_seat_of_deleted_booking(sender, instance, **kwargs):
+    if not instance.cancelled:
+        release_seat(instance.meal_slot_id)
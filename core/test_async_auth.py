@@ -0,0 +1,94 @@
+"""
+Tests for async authentication (aauthenticate, async decorators, async middleware).
+"""
+
+import asyncio
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, TestCase
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+from core.auth import ClaimsOnlyJWTAuthentication, CoreUserJWTAuthentication, create_tokens_with_roles
+from core.decorators import authenticated_only, role_required
+from core.middleware import JWTPrincipalMiddleware
+from core.models import User
+from core.revocation import get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import get_token_version_cache, reset_token_version_cache
+from core.user_cache import get_user_cache, reset_user_cache
+
+
+RESETS = (reset_token_cache, reset_revocation_list, reset_token_version_cache, reset_user_cache)
+
+
+class AsyncAuthenticationTest(TestCase):
+
+    def setUp(self):
+        for reset in RESETS:
+            reset()
+        self.user = User.objects.create_user(
+            name="Async Student", email="async@test.com", phone="8181818181",
+            roll_no="ASY001", password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.user)['access']
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        for reset in RESETS:
+            reset()
+
+    def request(self, token=None):
+        return self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+
+    async def test_aauthenticate_loads_user_through_async_orm(self):
+        user, token = await CoreUserJWTAuthentication().aauthenticate(self.request())
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.principal.roles, ('student', 'user'))
+        self.assertEqual(get_user_cache().db_loads, 1)
+        self.assertEqual(get_token_version_cache().db_loads, 1)
+
+        principal, _ = await ClaimsOnlyJWTAuthentication().aauthenticate(self.request())
+        self.assertEqual(principal.pk, self.user.pk)
+        self.assertIsNone(await CoreUserJWTAuthentication().aauthenticate(self.factory.get('/')))
+
+    async def test_aauthenticate_rejects_revoked_tokens(self):
+        revoked = create_tokens_with_roles(self.user)['access']
+        await sync_to_async(get_revocation_list().revoke)(AccessToken(revoked))
+
+        with self.assertRaises(InvalidToken):
+            await CoreUserJWTAuthentication().aauthenticate(self.request(revoked))
+
+    async def test_async_decorated_views(self):
+        @role_required('admin')
+        async def admin_view(request):
+            return JsonResponse({'ok': True})
+
+        @authenticated_only
+        async def profile_view(request):
+            return JsonResponse({'user_id': request.user_id})
+
+        self.assertEqual((await profile_view(self.request())).status_code, 200)
+        self.assertEqual((await admin_view(self.request())).status_code, 403)
+        self.assertEqual((await profile_view(self.factory.get('/'))).status_code, 401)
+
+    async def test_async_client_through_middleware(self):
+        response = await self.async_client.get(
+            '/api/decorator/async/user-profile', headers={'authorization': f'Bearer {self.token}'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user_id'], self.user.pk)
+
+    async def test_middleware_resolves_in_async_mode(self):
+        seen = []
+
+        async def get_response(request):
+            seen.append(request.token_resolution.token['user_id'])
+            return HttpResponse()
+
+        middleware = JWTPrincipalMiddleware(get_response)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        await middleware(self.request())
+        self.assertEqual(seen, [self.user.pk])
+
@@ -0,0 +1,239 @@
+"""
+Tests for the authentication caches (user cache, verified-token cache, LRU primitives).
+"""
+
+import time
+
+from django.http import JsonResponse
+from django.test import TestCase, RequestFactory, override_settings
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework.exceptions import AuthenticationFailed
+from core.models import Booking, Coupon, MealType, Mess, User
+from core.auth import create_tokens_with_roles, CoreUserJWTAuthentication, ClaimsOnlyJWTAuthentication
+from core.principal import ClaimsPrincipal
+from core.lru import LRUCache
+from core.user_cache import get_user_cache, reset_user_cache
+from core.token_cache import get_token_cache, reset_token_cache, token_digest, verify_access_token
+from core.decorators import jwt_token_required
+from core.revocation import get_revocation_list
+from core.token_version import get_token_version_cache
+
+
+class MockRequest:
+    def __init__(self, token):
+        self.META = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+
+class LRUCacheTest(TestCase):
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(maxsize=2, ttl=-1)
+        cache.set('a', 1)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+class UserCacheTest(TestCase):
+
+    def setUp(self):
+        reset_user_cache()
+        self.user = User.objects.create_user(
+            name="Cache Student",
+            email="cache@test.com",
+            phone="1212121212",
+            roll_no="CACHE001",
+            password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.user)['access']
+        self.auth = CoreUserJWTAuthentication()
+
+    def tearDown(self):
+        reset_user_cache()
+
+    def test_repeat_authentication_hits_cache(self):
+        self.auth.authenticate(MockRequest(self.token))
+
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate(MockRequest(self.token))
+
+        self.assertEqual(user.pk, self.user.pk)
+        stats = get_user_cache().stats()
+        self.assertEqual(stats['db_loads'], 1)
+        self.assertEqual(stats['local']['hits'], 1)
+
+    def test_cached_instance_is_not_shared_between_requests(self):
+        first, _ = self.auth.authenticate(MockRequest(self.token))
+        first.room_no = 'tampered'
+        second, _ = self.auth.authenticate(MockRequest(self.token))
+
+        self.assertNotEqual(second.room_no, 'tampered')
+        # The token's principal is shared, and immutable
+        self.assertIs(first.principal, second.principal)
+        with self.assertRaises(AttributeError):
+            first.principal.roles = ('tampered',)
+
+    def test_deactivation_applies_immediately(self):
+        self.auth.authenticate(MockRequest(self.token))
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(MockRequest(self.token))
+
+    def test_deleted_user_is_rejected(self):
+        self.auth.authenticate(MockRequest(self.token))
+        self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.get_user(AccessToken(self.token))
+
+    @override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        CORE_AUTH={'USER_CACHE_BACKEND': 'default'},
+    )
+    def test_shared_tier_serves_cold_process(self):
+        self.auth.authenticate(MockRequest(self.token))
+        # Simulate another worker: empty local tier, warm shared tier
+        get_user_cache().local.clear()
+
+        with self.assertNumQueries(0):
+            self.auth.authenticate(MockRequest(self.token))
+
+        self.assertEqual(get_user_cache().stats()['shared_hits'], 1)
+
+
+class ClaimsOnlyPrincipalTest(APITestCase):
+
+    def setUp(self):
+        reset_user_cache()
+        self.user = User.objects.create_user(
+            name="Claims Student",
+            email="claims@test.com",
+            phone="3434343434",
+            roll_no="CLAIMS001",
+            room_no="B-12",
+            password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.user)['access']
+        # Revocation state is loaded once per sync interval / TTL, not per request
+        get_revocation_list().rebuild()
+        get_token_version_cache().current(self.user.pk)
+
+    def tearDown(self):
+        reset_user_cache()
+
+    def test_principal_answers_claims_without_queries(self):
+        with self.assertNumQueries(0):
+            principal, _ = ClaimsOnlyJWTAuthentication().authenticate(MockRequest(self.token))
+            self.assertEqual(principal.roles, ('student', 'user'))
+            self.assertEqual(principal.name, "Claims Student")
+            self.assertFalse(principal.is_staff)
+            self.assertEqual(principal, self.user)
+
+    def test_non_claim_field_loads_user_lazily(self):
+        principal, _ = ClaimsOnlyJWTAuthentication().authenticate(MockRequest(self.token))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(principal.room_no, "B-12")
+            self.assertEqual(principal.roll_no, "CLAIMS001")
+
+    def test_read_only_endpoint_serves_without_auth_queries(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        # Only the meal slot listing itself hits the database
+        with self.assertNumQueries(1):
+            response = self.client.get('/booking/availability/')
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CORE_AUTH={'CLAIMS_ONLY_PRINCIPAL': True})
+    def test_global_setting_enables_claims_only(self):
+        user, _ = CoreUserJWTAuthentication().authenticate(MockRequest(self.token))
+
+        self.assertIsInstance(user, ClaimsPrincipal)
+
+    @override_settings(CORE_AUTH={'CLAIMS_ONLY_PRINCIPAL': True})
+    def test_own_booking_and_coupon_lists_under_global_setting(self):
+        other = User.objects.create(name="Other", email="other@test.com", phone="3535353535")
+        mess = Mess.objects.create(name="Main Mess", location="Block-A")
+        slot = MealType.objects.create(mess=mess, type="Lunch", session_time="12.30")
+        booking = Booking.objects.create(user=self.user, meal_slot=slot)
+        Booking.objects.create(user=other, meal_slot=slot)
+        coupon_fields = dict(mess=mess, session_time="12.30", location="Block-A", created_by="admin", meal_type="Lunch")
+        coupon = Coupon.objects.create(user=self.user, **coupon_fields)
+        Coupon.objects.create(user=other, **coupon_fields)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        bookings = self.client.get('/api/booking/')
+        coupons = self.client.get('/api/coupons/my/')
+
+        self.assertEqual(bookings.status_code, 200)
+        self.assertEqual([row['booking_id'] for row in bookings.json()['results']], [booking.pk])
+        self.assertEqual(coupons.status_code, 200)
+        self.assertEqual([row['c_id'] for row in coupons.json()], [coupon.pk])
+
+
+class VerifiedTokenCacheTest(TestCase):
+
+    def setUp(self):
+        reset_token_cache()
+        self.user = User.objects.create_user(
+            name="Token Student",
+            email="token@test.com",
+            phone="5656565656",
+            roll_no="TOKEN001",
+            password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.user)['access']
+
+    def tearDown(self):
+        reset_token_cache()
+
+    def test_drf_and_decorator_paths_share_verifications(self):
+        CoreUserJWTAuthentication().authenticate(MockRequest(self.token))
+
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = jwt_token_required(lambda request: JsonResponse({'ok': True}))(request)
+
+        self.assertEqual(response.status_code, 200)
+        stats = get_token_cache().stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_expired_entry_is_reverified(self):
+        token = verify_access_token(self.token)
+        get_token_cache().entries.set(token_digest('expired'), token, expires_at=time.time() - 1)
+
+        self.assertIsNone(get_token_cache().get('expired'))
+        self.assertEqual(get_token_cache().stats()['expirations'], 1)
+
+    def test_invalid_token_is_not_cached(self):
+        with self.assertRaises(TokenError):
+            verify_access_token(self.token + 'x')
+
+        self.assertEqual(len(get_token_cache().entries), 0)
+
+    @override_settings(CORE_AUTH={'TOKEN_CACHE_SIZE': 1})
+    def test_eviction_is_reported(self):
+        other = create_tokens_with_roles(self.user)['access']
+        verify_access_token(self.token)
+        verify_access_token(other)
+
+        self.assertEqual(get_token_cache().stats()['evictions'], 1)
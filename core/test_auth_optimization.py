@@ -12,6 +12,7 @@ from rest_framework import status
 from core.models import User
 from core.auth import compute_user_roles, create_tokens_with_roles, CoreUserJWTAuthentication
 from rest_framework_simplejwt.tokens import AccessToken
+from core.claims import token_role_list, token_permission_list
 
 
 class JWTAuthenticationOptimizationTest(APITestCase):
@@ -61,7 +62,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         
         # Decode access token to check roles
         access_token = AccessToken(token_data['access'])
-        token_roles = access_token.get('roles', [])
+        token_roles = token_role_list(access_token)
         
         # Verify roles are embedded in token
         self.assertIn('student', token_roles)
@@ -72,7 +73,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         # Test admin user
         token_data = create_tokens_with_roles(self.admin_user)
         access_token = AccessToken(token_data['access'])
-        token_roles = access_token.get('roles', [])
+        token_roles = token_role_list(access_token)
         
         self.assertIn('admin', token_roles)
         self.assertIn('staff', token_roles)
@@ -81,7 +82,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         # Test superuser
         token_data = create_tokens_with_roles(self.superuser)
         access_token = AccessToken(token_data['access'])
-        token_roles = access_token.get('roles', [])
+        token_roles = token_role_list(access_token)
         
         self.assertIn('superuser', token_roles)
         self.assertIn('staff', token_roles)
@@ -104,10 +105,11 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         authenticated_user, token = auth.authenticate(mock_request)
         
         # Verify roles are extracted from token
-        self.assertEqual(authenticated_user.roles, ['student', 'user'])
-        self.assertIsNotNone(authenticated_user.permissions)
-        self.assertEqual(authenticated_user.token_name, "Test Student")
-        self.assertEqual(authenticated_user.token_email, "student@test.com")
+        principal = authenticated_user.principal
+        self.assertEqual(principal.roles, ('student', 'user'))
+        self.assertTrue(principal.permissions)
+        self.assertEqual(principal.name, "Test Student")
+        self.assertEqual(principal.email, "student@test.com")
     
     def test_performance_comparison(self):
         """Test performance difference between old and new approaches."""
@@ -123,7 +125,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         
         start_time = time.time()
         for _ in range(100):
-            roles = access_token.get('roles', [])
+            roles = token_role_list(access_token)
         new_approach_time = time.time() - start_time
         
         # Verify new approach is faster
@@ -176,7 +178,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         # Test student permissions
         token_data = create_tokens_with_roles(self.student_user)
         access_token = AccessToken(token_data['access'])
-        permissions = access_token.get('permissions', [])
+        permissions = token_permission_list(access_token)
         
         # Student should have these permissions
         self.assertIn('user.read', permissions)
@@ -190,7 +192,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         # Test admin permissions
         token_data = create_tokens_with_roles(self.admin_user)
         access_token = AccessToken(token_data['access'])
-        permissions = access_token.get('permissions', [])
+        permissions = token_permission_list(access_token)
         
         # Admin should have more permissions
         self.assertIn('user.read', permissions)
@@ -201,7 +203,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         """Test that token refresh updates roles correctly."""
         # Create initial token
         token_data = create_tokens_with_roles(self.student_user)
-        initial_roles = AccessToken(token_data['access']).get('roles', [])
+        initial_roles = token_role_list(AccessToken(token_data['access']))
         
         # Update user to admin
         self.student_user.is_staff = True
@@ -210,7 +212,7 @@ class JWTAuthenticationOptimizationTest(APITestCase):
         
         # Create new token (simulating login)
         new_token_data = create_tokens_with_roles(self.student_user)
-        new_roles = AccessToken(new_token_data['access']).get('roles', [])
+        new_roles = token_role_list(AccessToken(new_token_data['access']))
         
         # Verify roles are updated
         self.assertIn('admin', new_roles)
@@ -257,7 +259,7 @@ class AuthenticationPerformanceTest(TestCase):
             try:
                 authenticated_user, _ = auth.authenticate(mock_request)
                 # Verify roles are extracted
-                self.assertIsNotNone(authenticated_user.roles)
+                self.assertIsNotNone(authenticated_user.principal.roles)
             except Exception:
                 pass  # Some tokens might be invalid in test environment
         
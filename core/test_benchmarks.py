@@ -0,0 +1,259 @@
+"""
+Benchmarks for the authentication hot path (harness in core/benchmark.py).
+
+Covers token issuance, CoreUserJWTAuthentication.authenticate end to end,
+every decorator in core/decorators.py and every permission class in
+core/permissions.py, plus the refresh endpoint and an async load test. Runs
+offline against the SQLite test database. Query counts are checked against
+core/benchmark_baselines.json on every run; medians only with
+BENCHMARK_TIMING=1, which also enables the load test.
+"""
+
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework.request import Request
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from core import decorators, permissions
+from core.auth import ClaimsOnlyJWTAuthentication, CoreUserJWTAuthentication, create_tokens_with_roles, refresh_tokens
+from core.benchmark import Baselines, BenchmarkResult, run_benchmark, timing_enabled
+from core.models import User
+from core.revocation import get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import get_token_version_cache, reset_token_version_cache
+from core.user_cache import get_user_cache, reset_user_cache
+
+
+pytestmark = pytest.mark.performance
+
+RESETS = (reset_token_cache, reset_revocation_list, reset_token_version_cache, reset_user_cache)
+
+
+def ok_view(request):
+    return JsonResponse({'ok': True})
+
+
+DECORATED_VIEWS = {
+    'jwt_token_required': decorators.jwt_token_required(ok_view),
+    'authenticated_only': decorators.authenticated_only(ok_view),
+    'admin_only': decorators.admin_only(ok_view),
+    'superuser_only': decorators.superuser_only(ok_view),
+    'staff_only': decorators.staff_only(ok_view),
+    'student_only': decorators.student_only(ok_view),
+    'role_required': decorators.role_required(['admin', 'staff'])(ok_view),
+    'permission_required[all]': decorators.permission_required(['user.read', 'user.update'])(ok_view),
+    'permission_required[any]': decorators.permission_required(['user.read', 'mess.read'], require_all=False)(ok_view),
+    'access_required': decorators.access_required(any_roles=['admin'], all_permissions=['user.delete'])(ok_view),
+}
+
+PERMISSIONS = {
+    'IsAdmin': permissions.IsAdmin(),
+    'ReadOnly': permissions.ReadOnly(),
+    'HasRole': permissions.HasRole(['admin', 'staff']),
+    'HasPermission[all]': permissions.HasPermission(['user.read', 'user.update']),
+    'HasPermission[any]': permissions.HasPermission(['user.read', 'mess.read'], require_all=False),
+    'has_role()': permissions.has_role('superuser')(),
+    'has_permission()': permissions.has_permission('user.delete')(),
+    'AdminOrStaff': permissions.AdminOrStaff(),
+    'StudentOrAdmin': permissions.StudentOrAdmin(),
+}
+
+
+class BaselinesTest(SimpleTestCase):
+
+    def test_flags_query_and_time_regressions(self):
+        baselines = Baselines(path='/nonexistent', tolerance=2.0, save=False, timing=True)
+        baselines.entries = {'b': {'median_us': 100.0, 'queries': 1}}
+
+        self.assertEqual(baselines.check(BenchmarkResult('b', [150.0] * 3, 10, 1)), [])
+        self.assertEqual(baselines.check(BenchmarkResult('new', [1e6] * 3, 10, 9)), [])
+        problems = baselines.check(BenchmarkResult('b', [300.0] * 3, 10, 2))
+        self.assertEqual(len(problems), 2)
+
+    def test_ignores_time_unless_timing(self):
+        baselines = Baselines(path='/nonexistent', tolerance=2.0, save=False, timing=False)
+        baselines.entries = {'b': {'median_us': 100.0, 'queries': 1}}
+
+        self.assertEqual(baselines.check(BenchmarkResult('b', [1e6], 1, 1)), [])
+        self.assertEqual(len(baselines.check(BenchmarkResult('b', [1e6], 1, 2))), 1)
+        self.assertTrue(Baselines(path='/nonexistent', save=True, timing=False).timing)
+
+
+class AuthBenchmarkTest(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baselines = Baselines()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.baselines.write()
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            name="admin", email="bench@test.com", phone="6060606060",
+            roll_no="BEN001", password="testpass123", is_staff=True, is_superuser=True,
+        )
+
+    def setUp(self):
+        for reset in RESETS:
+            reset()
+        self.factory = RequestFactory()
+        self.token = create_tokens_with_roles(self.user)['access']
+        # Steady state: revocation filter, token generation and user cached
+        get_revocation_list().rebuild()
+        get_token_version_cache().current(self.user.pk)
+        get_user_cache().get_user(self.user.pk)
+
+    def tearDown(self):
+        for reset in RESETS:
+            reset()
+
+    def request(self, method='get'):
+        return getattr(self.factory, method)('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def bench(self, name, func, max_queries=None):
+        if self.baselines.timing:
+            result = run_benchmark(name, func)
+            print(result)
+        else:
+            # Only the query count is checked: one warm call is enough
+            result = run_benchmark(name, func, warmup=1, rounds=1, iterations=1)
+        if max_queries is not None:
+            self.assertLessEqual(result.queries, max_queries, name)
+        self.assertEqual(self.baselines.check(result), [])
+        return result
+
+    def test_token_issuance(self):
+        self.bench('create_tokens_with_roles', lambda: create_tokens_with_roles(self.user), max_queries=0)
+
+    def test_authenticate_end_to_end(self):
+        core_auth, claims_auth = CoreUserJWTAuthentication(), ClaimsOnlyJWTAuthentication()
+
+        def authenticate():
+            user, _ = core_auth.authenticate(Request(self.request()))
+            assert user.pk == self.user.pk
+
+        def authenticate_claims_only():
+            claims_auth.authenticate(Request(self.request()))
+
+        def authenticate_cold():
+            # Every cache emptied: signature check, generation and user lookups
+            for reset in RESETS:
+                reset()
+            core_auth.authenticate(Request(self.request()))
+
+        self.bench('authenticate[warm]', authenticate, max_queries=0)
+        self.bench('authenticate[claims_only]', authenticate_claims_only, max_queries=0)
+        self.bench('authenticate[cold]', authenticate_cold)
+
+    def test_decorators(self):
+        for name, view in DECORATED_VIEWS.items():
+            with self.subTest(name):
+                def call(view=view):
+                    # A superuser passes every rule but student_only (the denial path)
+                    assert view(self.request()).status_code in (200, 403)
+                self.bench(f'decorator:{name}', call, max_queries=0)
+
+    def test_permission_classes(self):
+        request = Request(self.request(), authenticators=[CoreUserJWTAuthentication()])
+        request.user  # authenticate once; has_permission sees the token-derived sets
+
+        for name, permission in PERMISSIONS.items():
+            with self.subTest(name):
+                self.bench(f'permission:{name}', lambda p=permission: p.has_permission(request, None), max_queries=0)
+
+        permission = permissions.IsSelfOrAdmin()
+        self.bench('permission:IsSelfOrAdmin',
+                   lambda: permission.has_object_permission(request, None, self.user), max_queries=0)
+
+    def test_token_refresh(self):
+        raw = create_tokens_with_roles(self.user)['refresh']
+
+        def refresh_stock():
+            serializer = TokenRefreshSerializer(data={'refresh': raw})
+            serializer.is_valid(raise_exception=True)
+
+        self.bench('refresh_tokens', lambda: refresh_tokens(raw), max_queries=1)
+        self.bench('refresh[simplejwt]', refresh_stock, max_queries=1)
+
+
+@unittest.skipUnless(timing_enabled(), "wall clock load test; set BENCHMARK_TIMING=1")
+class AsyncLoadBenchmark(TestCase):
+    """
+    Sync vs async decorated views under concurrency. Each request authenticates
+    (warm caches) and then waits 2 ms on simulated downstream I/O: a thread per
+    in-flight request for sync, one event loop for async, with the same number
+    of requests in flight on both sides. Reports the rates; asserts nothing
+    about them.
+    """
+
+    requests = 400
+    in_flight = 16
+    io_seconds = 0.002
+
+    def setUp(self):
+        for reset in RESETS:
+            reset()
+        user = User.objects.create_user(
+            name="Load Student", email="load@test.com", phone="8282828282",
+            roll_no="LOAD001", password="testpass123",
+        )
+        token = create_tokens_with_roles(user)['access']
+        self.factory = RequestFactory()
+        self.header = f'Bearer {token}'
+        # Steady state: nothing below touches the database
+        get_revocation_list().rebuild()
+        get_token_version_cache().current(user.pk)
+
+    def tearDown(self):
+        for reset in RESETS:
+            reset()
+
+    def test_sync_vs_async_throughput(self):
+        io_seconds = self.io_seconds
+
+        @decorators.authenticated_only
+        def sync_view(request):
+            time.sleep(io_seconds)
+            return HttpResponse()
+
+        @decorators.authenticated_only
+        async def async_view(request):
+            await asyncio.sleep(io_seconds)
+            return HttpResponse()
+
+        requests = [self.factory.get('/', HTTP_AUTHORIZATION=self.header) for _ in range(self.requests)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.in_flight) as pool:
+            sync_codes = [response.status_code for response in pool.map(sync_view, requests)]
+        sync_rate = self.requests / (time.perf_counter() - start)
+
+        for request in requests:
+            del request.token_resolution
+
+        async def run():
+            semaphore = asyncio.Semaphore(self.in_flight)
+
+            async def one(request):
+                async with semaphore:
+                    return (await async_view(request)).status_code
+            return await asyncio.gather(*(one(request) for request in requests))
+
+        start = time.perf_counter()
+        async_codes = async_to_sync(run)()
+        async_rate = self.requests / (time.perf_counter() - start)
+
+        print(f"Load test ({self.requests} requests, {self.io_seconds * 1000:.0f} ms I/O each): "
+              f"{sync_rate:.0f}/s sync vs {async_rate:.0f}/s async, {self.in_flight} in flight")
+        self.assertEqual(set(sync_codes), {200})
+        self.assertEqual(set(async_codes), {200})
@@ -0,0 +1,405 @@
+"""
+Tests for capacity-aware booking (core/booking.py) and the booking endpoints.
+"""
+
+import contextlib
+import threading
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+from core.auth import create_tokens_with_roles
+from core.booking import (
+    ALREADY_BOOKED, BOOKED, FULL, NOT_FOUND, AlreadyBooked, SlotFull, book_slot, book_slots, cancel_booking,
+    claim_seat
+)
+from core.models import Booking, BookingManager, MealType, Mess, User
+
+
+def make_slot(capacity=None, mess=None, type="Lunch"):
+    mess = mess or Mess.objects.create(name="Main Mess", location="Block-A")
+    return MealType.objects.create(mess=mess, type=type, session_time="12.30", capacity=capacity)
+
+
+def make_students(count, prefix='7'):
+    return [
+        User.objects.create(name=f"Student {i}", email=f"s{i}@test.com", phone=f"{prefix}{i:09d}")
+        for i in range(count)
+    ]
+
+
+class BookSlotTest(TestCase):
+
+    def test_books_until_full(self):
+        slot = make_slot(capacity=2)
+        first, second, third = make_students(3)
+
+        book_slot(first, slot)
+        book_slot(second, slot)
+        slot.refresh_from_db()
+        with self.assertRaises(SlotFull):
+            book_slot(third, MealType.objects.get(pk=slot.pk))
+
+        self.assertEqual(slot.seats_taken, 2)
+        self.assertTrue(slot.is_full())
+
+    def test_full_slot_answers_without_writing(self):
+        slot = make_slot(capacity=0)
+        student, = make_students(1)
+
+        # Only the read telling "full" from "already booked"
+        with self.assertNumQueries(1):
+            with self.assertRaises(SlotFull):
+                book_slot(student, slot)
+
+    def test_stale_slot_is_refused_by_the_conditional_update(self):
+        slot = make_slot(capacity=1)
+        first, second = make_students(2)
+        stale = MealType.objects.get(pk=slot.pk)
+
+        book_slot(first, slot)
+        with self.assertRaises(SlotFull):
+            book_slot(second, stale)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_duplicate_booking_returns_the_seat(self):
+        slot = make_slot(capacity=5)
+        student, = make_students(1)
+
+        book_slot(student, slot)
+        with self.assertRaises(AlreadyBooked):
+            book_slot(student, slot)
+
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 1)
+
+    def test_rebooking_after_cancelling(self):
+        slot = make_slot(capacity=1)
+        student, = make_students(1)
+        cancel_booking(book_slot(student, slot))
+
+        booking = book_slot(student, MealType.objects.get(pk=slot.pk))
+
+        self.assertFalse(booking.cancelled)
+        self.assertEqual(Booking.objects.filter(user=student, meal_slot=slot).count(), 2)
+        self.assertEqual(book_slots(student.pk, [slot.pk])[slot.pk][0], ALREADY_BOOKED)
+        cancel_booking(booking)
+        self.assertEqual(book_slots(student.pk, [slot.pk])[slot.pk][0], BOOKED)
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 1)
+
+    def test_insert_and_seat_claim_are_the_only_statements(self):
+        slot = make_slot(capacity=5)
+        student, = make_students(1)
+
+        # UPDATE, INSERT and the savepoint pair
+        with self.assertNumQueries(4):
+            book_slot(student, slot)
+        # A duplicate fails the INSERT, rolling its seat claim back, then
+        # confirms it hit the constraint
+        with self.assertNumQueries(6):
+            with self.assertRaises(AlreadyBooked):
+                book_slot(student, slot)
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 1)
+
+    def test_unlimited_slot_still_counts_seats(self):
+        slot = make_slot()
+
+        self.assertTrue(claim_seat(slot.pk))
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 1)
+        self.assertFalse(slot.is_full())
+
+    def test_deleting_an_active_booking_frees_its_seat(self):
+        slot = make_slot(capacity=3)
+        first, second, third = make_students(3)
+        book_slot(first, slot)
+        book_slot(second, slot)
+        cancel_booking(book_slot(third, slot))
+
+        Booking.objects.filter(user=first).delete()   # queryset delete
+        second.delete()                               # cascade from User
+        Booking.objects.filter(user=third).delete()   # already cancelled: seat was freed then
+
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 0)
+
+    def test_cancel_frees_the_seat_once(self):
+        slot = make_slot(capacity=1)
+        student, = make_students(1)
+        booking = book_slot(student, slot)
+
+        self.assertTrue(cancel_booking(booking))
+        self.assertFalse(cancel_booking(Booking.objects.get(pk=booking.pk)))
+        slot.refresh_from_db()
+        self.assertEqual(slot.seats_taken, 0)
+
+
+class BookingEndpointTest(APITestCase):
+
+    def setUp(self):
+        self.slot = make_slot(capacity=1)
+        self.first, self.second = make_students(2)
+
+    def book(self, user):
+        token = create_tokens_with_roles(user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.post('/api/booking/', {'userId': user.pk, 'mealSlotId': self.slot.pk}, format='json')
+
+    def test_slot_full_is_a_409(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+
+        response = self.book(self.second)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {'detail': "Meal slot is full", 'capacity': 1})
+
+    def test_duplicate_is_a_400(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+
+        response = self.book(self.first)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': "Meal already booked"})
+
+    def test_cancelling_reopens_the_slot(self):
+        booking_id = self.book(self.first).json()['booking_id']
+
+        self.assertEqual(self.client.delete(f'/api/booking/{booking_id}/').status_code, 204)
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.seats_taken, 0)
+        self.assertEqual(self.book(self.first).status_code, 201)
+
+
+class BookSlotsTest(TestCase):
+
+    def test_outcome_per_slot_in_fixed_queries(self):
+        open_slot, full_slot, held_slot = make_slot(), make_slot(capacity=0), make_slot(capacity=3)
+        student, = make_students(1)
+        book_slot(student, held_slot)
+        slot_ids = [open_slot.pk, full_slot.pk, held_slot.pk, 999999]
+
+        # select_for_update, held bookings, insert, seat update, plus two
+        # savepoint pairs (the transaction and the insert)
+        with self.assertNumQueries(8):
+            outcomes = book_slots(student.pk, slot_ids)
+
+        self.assertEqual({slot_id: outcome for slot_id, (outcome, _) in outcomes.items()}, {
+            open_slot.pk: BOOKED, full_slot.pk: FULL, held_slot.pk: ALREADY_BOOKED, 999999: NOT_FOUND,
+        })
+        self.assertEqual(outcomes[open_slot.pk][1].user_id, student.pk)
+        open_slot.refresh_from_db()
+        held_slot.refresh_from_db()
+        self.assertEqual((open_slot.seats_taken, held_slot.seats_taken), (1, 1))
+
+    def test_conflicting_rows_are_not_counted_as_booked(self):
+        taken, free = make_slot(capacity=5), make_slot(capacity=5)
+        student, = make_students(1)
+        book_slot(student, taken)
+
+        # As if the booking on `taken` had been written after the held read
+        with mock.patch.object(BookingManager, 'active', lambda manager: Booking.objects.none()):
+            outcomes = book_slots(student.pk, [taken.pk, free.pk])
+
+        self.assertEqual(outcomes[taken.pk], (ALREADY_BOOKED, None))
+        self.assertEqual(outcomes[free.pk][0], BOOKED)
+        taken.refresh_from_db()
+        free.refresh_from_db()
+        self.assertEqual((taken.seats_taken, free.seats_taken), (1, 1))
+
+    def test_capacity_is_respected(self):
+        slot = make_slot(capacity=1)
+        first, second = make_students(2)
+
+        self.assertEqual(book_slots(first.pk, [slot.pk])[slot.pk][0], BOOKED)
+        self.assertEqual(book_slots(second.pk, [slot.pk])[slot.pk][0], FULL)
+
+
+class BookingBulkEndpointTest(APITestCase):
+
+    def setUp(self):
+        self.mess = Mess.objects.create(name="Week Mess", location="Block-B")
+        self.slots = [make_slot(mess=self.mess, type=meal_type) for meal_type in ("Breakfast", "Lunch", "Dinner")]
+        self.student, self.other = make_students(2)
+        self.authenticate(self.student)
+
+    def authenticate(self, user):
+        token = create_tokens_with_roles(user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def post(self, data):
+        return self.client.post('/api/booking/bulk/', data, format='json')
+
+    def test_books_a_list_of_slots(self):
+        slot_ids = [slot.pk for slot in self.slots]
+        response = self.post({'mealSlotIds': slot_ids + [slot_ids[0]]})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['booked'], 3)
+        self.assertEqual([result['mealSlotId'] for result in body['results']], slot_ids)
+        self.assertEqual(Booking.objects.filter(user=self.student).count(), 3)
+
+        again = self.post({'mealSlotIds': slot_ids}).json()
+        self.assertEqual(again['booked'], 0)
+        self.assertEqual({result['status'] for result in again['results']}, {'already_booked'})
+
+    def test_books_by_pattern(self):
+        response = self.post({'messId': self.mess.pk, 'mealTypes': ['Lunch', 'Dinner']})
+
+        self.assertEqual(response.json()['booked'], 2)
+        self.assertEqual(
+            set(Booking.objects.filter(user=self.student).values_list('meal_slot__type', flat=True)),
+            {'Lunch', 'Dinner'},
+        )
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.post({}).status_code, 400)
+        self.assertEqual(self.post({'mealSlotIds': ['x']}).status_code, 400)
+        self.assertEqual(self.post({'mealSlotIds': [True]}).status_code, 400)
+        self.assertEqual(self.post({'messId': 'abc'}).status_code, 400)
+        self.assertEqual(self.post({'messId': True}).status_code, 400)
+        self.assertEqual(self.post({'userId': True, 'mealSlotIds': [self.slots[0].pk]}).status_code, 400)
+        self.assertEqual(self.post({'mealSlotIds': list(range(1, 60))}).status_code, 400)
+        self.assertEqual(self.post({'messId': self.mess.pk, 'mealTypes': ['Brunch']}).status_code, 400)
+        self.assertEqual(self.post({'userId': self.other.pk, 'mealSlotIds': [self.slots[0].pk]}).status_code, 403)
+
+
+class ThreadedTestCase(TransactionTestCase):
+    """Skipped where concurrent writers fail instead of waiting (see backend/test_settings.py)."""
+
+    def setUp(self):
+        super().setUp()
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("in-memory SQLite can't queue concurrent writers")
+
+
+class ConcurrentBookingTest(ThreadedTestCase):
+    """
+    Many threads racing for the last seats never overbook the slot, whether
+    they book one slot at a time or in bulk.
+    """
+
+    capacity = 5
+    students = 40
+
+    def test_no_overbooking_under_concurrency(self):
+        slot = make_slot(capacity=self.capacity)
+        students = make_students(self.students)
+        barrier = threading.Barrier(self.students)
+        outcomes = []
+        lock = threading.Lock()
+
+        def book_one(student):
+            try:
+                book_slot(student, MealType.objects.get(pk=slot.pk))
+                return BOOKED
+            except SlotFull:
+                return FULL
+
+        def book_bulk(student):
+            return book_slots(student.pk, [slot.pk])[slot.pk][0]
+
+        def attempt(student, book):
+            try:
+                barrier.wait(10)
+                try:
+                    outcome = book(student)
+                except Exception as exc:
+                    outcome = repr(exc)
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=attempt, args=(student, book_bulk if i % 2 else book_one))
+            for i, student in enumerate(students)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        slot.refresh_from_db()
+        self.assertEqual(outcomes.count(BOOKED), self.capacity, outcomes)
+        self.assertEqual(outcomes.count(FULL), self.students - self.capacity, outcomes)
+        self.assertEqual(slot.seats_taken, self.capacity)
+        self.assertEqual(Booking.objects.filter(meal_slot=slot).count(), self.capacity)
+
+
+class ConcurrentDuplicateBookingTest(ThreadedTestCase):
+    """The same student booking one slot from many requests gets exactly one booking."""
+
+    requests = 20
+
+    def test_constraint_rejects_concurrent_duplicates(self):
+        slot = make_slot(capacity=10)
+        student, = make_students(1)
+        barrier = threading.Barrier(self.requests)
+        outcomes = []
+        lock = threading.Lock()
+
+        def attempt():
+            try:
+                barrier.wait(10)
+                try:
+                    book_slot(student, MealType.objects.get(pk=slot.pk))
+                    outcome = BOOKED
+                except AlreadyBooked:
+                    outcome = ALREADY_BOOKED
+                except Exception as exc:
+                    outcome = repr(exc)
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt) for _ in range(self.requests)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        slot.refresh_from_db()
+        self.assertEqual(outcomes.count(BOOKED), 1, outcomes)
+        self.assertEqual(outcomes.count(ALREADY_BOOKED), self.requests - 1, outcomes)
+        self.assertEqual(slot.seats_taken, 1)
+        self.assertEqual(Booking.objects.filter(meal_slot=slot).count(), 1)
+
+    def test_single_and_bulk_booking_of_the_same_slots(self):
+        # Both paths lock the slot row before inserting, so they queue rather
+        # than deadlock and the loser reports the slot as already booked
+        mess = Mess.objects.create(name="Main Mess", location="Block-A")
+        slots = [make_slot(capacity=10, mess=mess, type=f"Meal {i}") for i in range(8)]
+        student, = make_students(1)
+        slot_ids = [slot.pk for slot in slots]
+        barrier = threading.Barrier(len(slots) + 2)
+        errors = []
+
+        def single(slot_id):
+            with contextlib.suppress(AlreadyBooked):
+                book_slot(student, MealType.objects.get(pk=slot_id))
+
+        def bulk():
+            book_slots(student.pk, slot_ids)
+
+        def attempt(func, *args):
+            try:
+                barrier.wait(10)
+                func(*args)
+            except Exception as exc:
+                errors.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt, args=(single, slot_id)) for slot_id in slot_ids]
+        threads += [threading.Thread(target=attempt, args=(bulk,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertEqual(errors, [])
+        for slot in MealType.objects.filter(pk__in=slot_ids):
+            self.assertEqual(slot.seats_taken, 1)
+            self.assertEqual(Booking.objects.active().filter(meal_slot=slot).count(), 1)
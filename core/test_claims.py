@@ -0,0 +1,93 @@
+"""
+Tests for compact bitmask role/permission claims (core/claims.py) and the
+role -> permission matrix in core/auth.py.
+"""
+
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from core.models import User
+from core.auth import (
+    BASE_PERMISSIONS, ROLE_PERMISSIONS, create_tokens_with_roles, compute_user_roles,
+    effective_permissions, get_user_permissions, verify_user_permission, verify_user_role
+)
+from core.claims import (
+    REGISTRIES, REGISTRY_VERSION, decode, encode,
+    token_permissions, token_roles, token_role_list
+)
+
+
+def make_user(**flags):
+    return User(user_id=7, name=flags.pop('name', 'Student'), email='c@test.com',
+                phone='9999999999', **flags)
+
+
+class BitmaskClaimsTest(SimpleTestCase):
+
+    def test_roundtrip_every_registry_name(self):
+        roles, permissions = REGISTRIES[REGISTRY_VERSION]
+
+        self.assertEqual(decode(encode(roles, 0), 0, REGISTRY_VERSION), frozenset(roles))
+        self.assertEqual(decode(encode(permissions, 1), 1, REGISTRY_VERSION), frozenset(permissions))
+
+    def test_issued_token_decodes_to_computed_roles(self):
+        user = make_user(is_staff=True, is_superuser=True)
+        token = AccessToken(create_tokens_with_roles(user)['access'])
+        roles = compute_user_roles(user)
+
+        self.assertNotIn('roles', token)
+        self.assertNotIn('phone', token)
+        self.assertEqual(token_role_list(token), roles)
+        self.assertEqual(token_permissions(token), frozenset(get_user_permissions(user, roles)))
+
+    def test_legacy_list_tokens_still_accepted(self):
+        with override_settings(CORE_AUTH={'TOKEN_CLAIMS_FORMAT': 'legacy'}):
+            token = AccessToken(create_tokens_with_roles(make_user())['access'])
+
+        self.assertEqual(token['roles'], ['student', 'user'])
+        self.assertEqual(token_roles(token), frozenset(['student', 'user']))
+        self.assertIn('mess.read', token_permissions(token))
+
+    def test_unknown_registry_version_grants_nothing(self):
+        self.assertEqual(decode(0b11111, 0, REGISTRY_VERSION + 1), frozenset())
+
+    def test_compact_header_is_smaller(self):
+        user = make_user(is_staff=True, is_superuser=True)
+        compact = create_tokens_with_roles(user)['access']
+        with override_settings(CORE_AUTH={'TOKEN_CLAIMS_FORMAT': 'legacy'}):
+            legacy = create_tokens_with_roles(user)['access']
+
+        self.assertLess(len(compact), len(legacy) * 0.6)
+
+
+class RolePermissionMatrixTest(SimpleTestCase):
+
+    def test_matrix_fits_claims_registry(self):
+        _, registered = REGISTRIES[REGISTRY_VERSION]
+
+        for permissions in ROLE_PERMISSIONS.values():
+            self.assertLessEqual(permissions | BASE_PERMISSIONS, frozenset(registered))
+
+    def test_highest_role_wins(self):
+        self.assertEqual(effective_permissions(frozenset(['admin', 'staff', 'user'])),
+                         ROLE_PERMISSIONS['admin'] | BASE_PERMISSIONS)
+        self.assertEqual(effective_permissions(frozenset(['user'])), BASE_PERMISSIONS)
+
+    def test_get_user_permissions_returns_fresh_sorted_list(self):
+        first = get_user_permissions(None, ['student', 'user'])
+        first.append('tampered')
+        second = get_user_permissions(None, ['student', 'user'])
+
+        self.assertNotIn('tampered', second)
+        self.assertEqual(second, sorted(second))
+
+    def test_fallback_roles_computed_once_per_user(self):
+        user = make_user(is_staff=True, name='admin')
+
+        with mock.patch('core.auth.compute_user_roles', wraps=compute_user_roles) as computed:
+            for permission in ('user.read', 'mess.read', 'report.read'):
+                self.assertTrue(verify_user_permission(user, permission))
+            self.assertTrue(verify_user_role(user, 'admin'))
+
+        self.assertEqual(computed.call_count, 1)
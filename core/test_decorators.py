@@ -0,0 +1,83 @@
+"""
+Tests for the compiled authorization engine behind core/decorators.py.
+"""
+
+import json
+from django.http import JsonResponse
+from django.test import TestCase, RequestFactory
+from core.models import User
+from core.auth import create_tokens_with_roles
+from core.decorators import (
+    AccessRule, access_required, admin_only, jwt_token_required,
+    permission_required, role_required, student_only
+)
+
+
+def ok_view(request):
+    return JsonResponse({'ok': True})
+
+
+def make_token(name, phone, is_staff=False, is_superuser=False):
+    # Tokens are checked against their user's token generation, so the user must exist
+    user = User.objects.create(name=name, email=f'{phone}@test.com', phone=phone,
+                               is_staff=is_staff, is_superuser=is_superuser)
+    return create_tokens_with_roles(user)['access']
+
+
+class AccessRuleTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student_token = make_token("Student", '1000000001')
+        cls.admin_token = make_token("admin", '1000000002', is_staff=True)
+        cls.superuser_token = make_token("Root", '1000000003', is_staff=True, is_superuser=True)
+
+    def call(self, view, token):
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        response = view(request)
+        return response.status_code, json.loads(response.content)
+
+    def test_requirements_are_compiled_once(self):
+        view = role_required(['admin', 'staff'])(ok_view)
+
+        self.assertIsInstance(view.access_rule, AccessRule)
+        self.assertEqual(len(view.access_rule.checks), 1)
+
+    def test_any_role(self):
+        view = role_required(['admin', 'staff'])(ok_view)
+
+        self.assertEqual(self.call(view, self.admin_token)[0], 200)
+        status_code, body = self.call(view, self.student_token)
+        self.assertEqual(status_code, 403)
+        self.assertEqual(body['required_roles'], ['admin', 'staff'])
+        self.assertEqual(body['user_roles'], ['student', 'user'])
+
+    def test_all_permissions_reports_missing(self):
+        view = permission_required(['user.read', 'user.delete'])(ok_view)
+
+        self.assertEqual(self.call(view, self.superuser_token)[0], 200)
+        status_code, body = self.call(view, self.student_token)
+        self.assertEqual(status_code, 403)
+        self.assertEqual(body['missing_permissions'], ['user.delete'])
+
+    def test_any_permission(self):
+        view = permission_required(['user.delete', 'mess.read'], require_all=False)(ok_view)
+
+        self.assertEqual(self.call(view, self.student_token)[0], 200)
+
+    def test_admin_only_accepts_staff_flag(self):
+        view = admin_only(ok_view)
+
+        self.assertEqual(self.call(view, self.superuser_token)[0], 200)
+        self.assertEqual(self.call(view, self.student_token)[0], 403)
+
+    def test_roles_and_permissions_combined(self):
+        view = access_required(any_roles=['admin'], all_permissions=['user.delete'])(ok_view)
+
+        self.assertEqual(self.call(view, self.admin_token)[0], 200)
+        self.assertEqual(self.call(view, self.superuser_token)[0], 403)
+
+    def test_missing_token(self):
+        response = student_only(ok_view)(RequestFactory().get('/'))
+
+        self.assertEqual(response.status_code, 401)
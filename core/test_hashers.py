@@ -0,0 +1,155 @@
+"""
+Tests for host-calibrated password hashing and rehash on login.
+"""
+
+import importlib
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from core.hashers import CalibratedPBKDF2PasswordHasher, calibrated_iterations
+from core.models import User
+from core.password_pool import reset_password_pool
+
+
+CALIBRATED_HASHERS = [
+    'core.hashers.CalibratedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+
+class CalibratedHasherTest(SimpleTestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.calibration_file = os.path.join(self.tmpdir.name, 'password_hasher.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        calibrated_iterations.cache_clear()
+
+    def test_test_suite_uses_fast_profile(self):
+        self.assertEqual(settings.PASSWORD_HASHERS[0], 'django.contrib.auth.hashers.MD5PasswordHasher')
+
+    def test_md5_is_opt_in_outside_tests(self):
+        from backend import settings as project_settings
+        md5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+        self.addCleanup(importlib.reload, project_settings)
+
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PASSWORD_HASHER_PROFILE', None)
+            importlib.reload(project_settings)
+            self.assertEqual(project_settings.PASSWORD_HASHERS[0], 'core.hashers.CalibratedPBKDF2PasswordHasher')
+            self.assertNotIn(md5, project_settings.PASSWORD_HASHERS)
+
+            os.environ['PASSWORD_HASHER_PROFILE'] = 'fast'
+            importlib.reload(project_settings)
+            self.assertEqual(project_settings.PASSWORD_HASHERS[0], md5)
+
+    @override_settings(CORE_AUTH={'PASSWORD_HASHER_CALIBRATION_FILE': None})
+    def test_defaults_to_django_iterations(self):
+        self.assertEqual(CalibratedPBKDF2PasswordHasher().iterations, 1_000_000)
+
+    def test_reads_calibration_file(self):
+        with open(self.calibration_file, 'w') as f:
+            json.dump({'iterations': 720_000}, f)
+
+        with override_settings(CORE_AUTH={'PASSWORD_HASHER_CALIBRATION_FILE': self.calibration_file}):
+            self.assertEqual(CalibratedPBKDF2PasswordHasher().iterations, 720_000)
+
+    def test_explicit_setting_wins_over_file(self):
+        with open(self.calibration_file, 'w') as f:
+            json.dump({'iterations': 720_000}, f)
+
+        with override_settings(CORE_AUTH={
+            'PASSWORD_HASHER_CALIBRATION_FILE': self.calibration_file,
+            'PASSWORD_HASH_ITERATIONS': 650_000,
+        }):
+            self.assertEqual(CalibratedPBKDF2PasswordHasher().iterations, 650_000)
+
+    def test_unreadable_file_falls_back(self):
+        with open(self.calibration_file, 'w') as f:
+            f.write('not json')
+
+        with override_settings(CORE_AUTH={'PASSWORD_HASHER_CALIBRATION_FILE': self.calibration_file}):
+            self.assertEqual(CalibratedPBKDF2PasswordHasher().iterations, 1_000_000)
+
+    @override_settings(CORE_AUTH={'PASSWORD_HASH_ITERATIONS': 2000})
+    def test_keeps_algorithm_and_flags_outdated_iterations(self):
+        hasher = CalibratedPBKDF2PasswordHasher()
+        encoded = hasher.encode('secret123', hasher.salt())
+
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$2000$'))
+        self.assertFalse(hasher.must_update(encoded))
+        self.assertTrue(hasher.must_update(hasher.encode('secret123', hasher.salt(), iterations=1000)))
+
+    @override_settings(PASSWORD_HASHERS=CALIBRATED_HASHERS)
+    def test_calibrate_command_writes_recommendation(self):
+        out = StringIO()
+        with override_settings(CORE_AUTH={
+            'PASSWORD_HASHER_CALIBRATION_FILE': self.calibration_file,
+            'PASSWORD_HASH_ITERATIONS': 1000,
+        }):
+            call_command('calibrate_password_hasher', '--target-ms', '1', '--rounds', '1',
+                         '--min-iterations', '10000', '--write', stdout=out)
+
+        with open(self.calibration_file) as f:
+            written = json.load(f)
+        self.assertGreaterEqual(written['iterations'], 10000)
+        self.assertEqual(written['algorithm'], 'pbkdf2_sha256')
+        self.assertIn('Recommended pbkdf2_sha256 iterations', out.getvalue())
+
+        with override_settings(CORE_AUTH={'PASSWORD_HASHER_CALIBRATION_FILE': self.calibration_file}):
+            self.assertEqual(get_hasher('default').iterations, written['iterations'])
+
+
+@override_settings(PASSWORD_HASHERS=CALIBRATED_HASHERS, CORE_AUTH={'PASSWORD_HASH_ITERATIONS': 1000})
+class LoginRehashTest(APITestCase):
+
+    def setUp(self):
+        reset_password_pool()
+        self.user = User.objects.create(
+            name="Rehash Student",
+            email="rehash@test.com",
+            phone="5656565656",
+            roll_no="REHASH001",
+            password=make_password('testpass123', hasher='md5'),
+        )
+
+    def tearDown(self):
+        reset_password_pool()
+
+    def login(self, password='testpass123'):
+        return self.client.post('/auth/student/login/', {'phone': '5656565656', 'password': password})
+
+    def test_upgrades_hash_from_other_hasher(self):
+        self.assertEqual(self.login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_upgrades_outdated_iterations(self):
+        hasher = CalibratedPBKDF2PasswordHasher()
+        User.objects.filter(pk=self.user.pk).update(
+            password=hasher.encode('testpass123', hasher.salt(), iterations=1500)
+        )
+
+        self.assertEqual(self.login().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_failed_login_does_not_rehash(self):
+        original = self.user.password
+
+        self.assertEqual(self.login('wrongpass').status_code, 401)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, original)
@@ -0,0 +1,69 @@
+"""
+Tests for batch token introspection (auth/token/introspect/).
+"""
+
+from rest_framework.test import APITestCase
+from core.auth import create_tokens_with_roles
+from core.models import User
+from core.revocation import get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import get_token_version_cache, reset_token_version_cache
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class TokenIntrospectionTest(APITestCase):
+
+    def setUp(self):
+        for reset in (reset_token_cache, reset_revocation_list, reset_token_version_cache):
+            reset()
+        scanner = User.objects.create_user(
+            name="Scanner", email="scanner@test.com", phone="7171717171",
+            roll_no="SCN001", password="testpass123", is_staff=True,
+        )
+        self.student = User.objects.create_user(
+            name="Scanned Student", email="scanned@test.com", phone="7272727272",
+            roll_no="SCN002", password="testpass123",
+        )
+        self.student_token = create_tokens_with_roles(self.student)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {create_tokens_with_roles(scanner)['access']}")
+        get_revocation_list().rebuild()
+        for user in (scanner, self.student):
+            get_token_version_cache().current(user.pk)
+
+    def tearDown(self):
+        for reset in (reset_token_cache, reset_revocation_list, reset_token_version_cache):
+            reset()
+
+    def introspect(self, tokens):
+        return self.client.post('/auth/token/introspect/', {'tokens': tokens}, format='json')
+
+    def test_batch_results_in_order_without_queries(self):
+        revoked = create_tokens_with_roles(self.student)['access']
+        get_revocation_list().revoke(AccessToken(revoked))
+        self.introspect([self.student_token])
+
+        with self.assertNumQueries(0):
+            response = self.introspect([self.student_token, 'garbage', self.student_token])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        active, garbage, repeat = response.data['results']
+        self.assertEqual(active, {
+            'active': True, 'sub': self.student.pk,
+            'exp': AccessToken(self.student_token)['exp'], 'roles': ['student', 'user'],
+        })
+        self.assertEqual(garbage, {'active': False})
+        self.assertEqual(repeat, active)
+        self.assertEqual(self.introspect([revoked]).data['results'], [{'active': False}])
+
+    def test_requires_staff_caller(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.student_token}")
+        self.assertEqual(self.introspect([self.student_token]).status_code, 403)
+        self.client.credentials()
+        self.assertEqual(self.introspect([self.student_token]).status_code, 401)
+
+    def test_rejects_malformed_and_oversized_batches(self):
+        self.assertEqual(self.introspect('not-a-list').status_code, 400)
+        self.assertEqual(self.introspect([1, 2]).status_code, 400)
+        with self.settings(CORE_AUTH={'INTROSPECTION_MAX_TOKENS': 2}):
+            self.assertEqual(self.introspect([self.student_token] * 3).status_code, 400)
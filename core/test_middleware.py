@@ -0,0 +1,113 @@
+"""
+Tests for single-pass bearer token resolution (core/middleware.py).
+"""
+
+from unittest import mock
+from django.db import DatabaseError
+from django.test import TestCase, RequestFactory
+from rest_framework.test import APITestCase
+from core.models import User
+from core.auth import create_tokens_with_roles
+from core.decorator_views import admin_user_delete
+from core.middleware import JWTPrincipalMiddleware, resolve_request_token, TokenResolution
+from core.token_cache import get_token_cache, reset_token_cache
+
+
+class TokenResolutionTest(TestCase):
+
+    def setUp(self):
+        reset_token_cache()
+        self.admin = User.objects.create_user(
+            name="admin",
+            email="mwadmin@test.com",
+            phone="7878787878",
+            roll_no="MWADMIN001",
+            password="adminpass123",
+            is_staff=True,
+            is_superuser=True,
+        )
+        self.token = create_tokens_with_roles(self.admin)['access']
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        reset_token_cache()
+
+    def test_stacked_decorators_verify_token_once(self):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        response = admin_user_delete(request)
+
+        self.assertEqual(response.status_code, 200)
+        # role_required + permission_required share one resolution
+        self.assertEqual(get_token_cache().stats()['misses'], 1)
+        self.assertEqual(get_token_cache().stats()['hits'], 0)
+
+    def test_middleware_resolves_before_view(self):
+        seen = {}
+
+        def view(request):
+            seen['resolution'] = request.token_resolution
+            return None
+
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        JWTPrincipalMiddleware(view)(request)
+
+        self.assertIsNotNone(seen['resolution'].token)
+        self.assertIs(resolve_request_token(request), seen['resolution'])
+        self.assertEqual(seen['resolution'].principal.user_id, self.admin.user_id)
+
+    def test_missing_and_invalid_headers(self):
+        missing = resolve_request_token(self.factory.get('/'))
+        bad_format = resolve_request_token(self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+        invalid = resolve_request_token(self.factory.get('/', HTTP_AUTHORIZATION='Bearer abc'))
+
+        self.assertEqual(missing.reason, TokenResolution.MISSING)
+        self.assertEqual(bad_format.reason, TokenResolution.BAD_FORMAT)
+        self.assertEqual(invalid.reason, TokenResolution.INVALID)
+        self.assertEqual(invalid.status_code, 401)
+
+    def test_bearer_header_needs_exactly_one_value(self):
+        for header in ('Bearer', f'Bearer {self.token} extra'):
+            with self.subTest(header):
+                resolution = resolve_request_token(self.factory.get('/', HTTP_AUTHORIZATION=header))
+
+                self.assertEqual(resolution.reason, TokenResolution.INVALID)
+                self.assertIsNone(resolution.token)
+
+    def test_non_token_errors_propagate(self):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+        with mock.patch('core.middleware.verify_access_token', side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                resolve_request_token(request)
+
+
+class MiddlewareDRFIntegrationTest(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            name="MW Student",
+            email="mwstudent@test.com",
+            phone="8989898989",
+            roll_no="MWSTU001",
+            password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.student)['access']
+
+    def test_drf_view_uses_middleware_resolution(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        response = self.client.get('/token/info')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.token_resolution.token['user_id'], self.student.user_id)
+
+    def test_drf_rejects_invalid_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        response = self.client.get('/token/info')
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_drf_anonymous_without_header(self):
+        response = self.client.get('/token/info')
+
+        self.assertEqual(response.status_code, 401)
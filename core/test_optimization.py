@@ -1,146 +0,0 @@
-"""
-Test script to demonstrate the JWT token-based role extraction optimization.
-
-This script shows how the new approach is more efficient than the old database-based approach.
-"""
-
-import time
-from django.test import TestCase
-from core.models import User
-from core.auth import compute_user_roles, create_tokens_with_roles, CoreUserJWTAuthentication
-from rest_framework_simplejwt.tokens import AccessToken
-
-
-def test_performance_comparison():
-    """
-    Compare performance between old (database-based) and new (token-based) approaches.
-    """
-    print("🔍 PERFORMANCE COMPARISON: Database vs Token-Based Role Extraction")
-    print("=" * 70)
-    
-    # Create a test user
-    user = User.objects.create(
-        name="Test User",
-        email="test@example.com",
-        phone="1234567890",
-        roll_no="TEST001",
-        is_staff=False,
-        is_superuser=False
-    )
-    
-    # Test 1: Old approach (database-based role computation)
-    print("\n📊 TEST 1: Old Approach (Database-Based)")
-    print("-" * 40)
-    
-    start_time = time.time()
-    for i in range(100):  # Simulate 100 requests
-        roles = compute_user_roles(user)  # This queries database fields
-    end_time = time.time()
-    
-    old_approach_time = end_time - start_time
-    print(f"⏱️  Time for 100 role computations: {old_approach_time:.4f} seconds")
-    print(f"📈 Average per request: {old_approach_time/100:.6f} seconds")
-    print(f"🎯 Roles computed: {roles}")
-    
-    # Test 2: New approach (token-based role extraction)
-    print("\n📊 TEST 2: New Approach (Token-Based)")
-    print("-" * 40)
-    
-    # Create JWT token with roles embedded
-    token_data = create_tokens_with_roles(user)
-    access_token = AccessToken(token_data['access'])
-    
-    start_time = time.time()
-    for i in range(100):  # Simulate 100 requests
-        roles = access_token.get('roles', [])  # Extract from token (no DB queries)
-    end_time = time.time()
-    
-    new_approach_time = end_time - start_time
-    print(f"⏱️  Time for 100 role extractions: {new_approach_time:.4f} seconds")
-    print(f"📈 Average per request: {new_approach_time/100:.6f} seconds")
-    print(f"🎯 Roles extracted: {roles}")
-    
-    # Performance comparison
-    print("\n📊 PERFORMANCE COMPARISON")
-    print("-" * 40)
-    speedup = old_approach_time / new_approach_time
-    print(f"🚀 Speedup: {speedup:.2f}x faster")
-    print(f"💾 Database queries saved: 100 (no queries needed)")
-    print(f"⚡ Efficiency gain: {((old_approach_time - new_approach_time) / old_approach_time * 100):.1f}%")
-    
-    # Cleanup
-    user.delete()
-    
-    return speedup
-
-
-def test_authentication_flow():
-    """
-    Test the complete authentication flow with the new optimization.
-    """
-    print("\n🔐 AUTHENTICATION FLOW TEST")
-    print("=" * 50)
-    
-    # Create test user
-    user = User.objects.create(
-        name="Admin User",
-        email="admin@example.com",
-        phone="9876543210",
-        roll_no="ADMIN001",
-        is_staff=True,
-        is_superuser=False
-    )
-    
-    # Step 1: Create tokens (roles computed once)
-    print("\n1️⃣ Creating JWT tokens...")
-    token_data = create_tokens_with_roles(user)
-    print(f"✅ Tokens created with roles: {token_data['user_info']['roles']}")
-    print(f"✅ Permissions: {token_data['user_info']['permissions']}")
-    
-    # Step 2: Simulate authentication (roles extracted from token)
-    print("\n2️⃣ Simulating authentication...")
-    auth = CoreUserJWTAuthentication()
-    
-    # Create a mock request with the token
-    class MockRequest:
-        def __init__(self, token):
-            self.META = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
-    
-    mock_request = MockRequest(token_data['access'])
-    
-    # Authenticate (this should extract roles from token, not compute from DB)
-    try:
-        authenticated_user, token = auth.authenticate(mock_request)
-        print(f"✅ Authentication successful!")
-        print(f"✅ User roles from token: {authenticated_user.roles}")
-        print(f"✅ User permissions from token: {authenticated_user.permissions}")
-        print(f"✅ Token name: {authenticated_user.token_name}")
-        print(f"✅ Token email: {authenticated_user.token_email}")
-        
-        # Verify no database queries were needed for roles
-        print(f"✅ No database queries needed for role extraction!")
-        
-    except Exception as e:
-        print(f"❌ Authentication failed: {e}")
-    
-    # Cleanup
-    user.delete()
-
-
-if __name__ == "__main__":
-    print("🚀 JWT Token-Based Role Extraction Optimization Test")
-    print("=" * 60)
-    
-    # Run performance comparison
-    speedup = test_performance_comparison()
-    
-    # Run authentication flow test
-    test_authentication_flow()
-    
-    print("\n🎉 OPTIMIZATION SUMMARY")
-    print("=" * 30)
-    print("✅ Roles are now extracted from JWT tokens")
-    print("✅ No database queries for role computation")
-    print(f"✅ {speedup:.1f}x performance improvement")
-    print("✅ Better scalability and reduced database load")
-    print("✅ Backward compatibility maintained") 
\ No newline at end of file
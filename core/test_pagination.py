@@ -0,0 +1,119 @@
+"""
+Tests for keyset pagination of the booking lists (core/pagination.py).
+"""
+
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from core.auth import create_tokens_with_roles
+from core.models import Booking, MealType, Mess, User
+from core.pagination import KeysetPagination
+
+
+def make_bookings(user, count, start=None, same_time_every=3):
+    """
+    count bookings, oldest first from start; every same_time_every share a
+    created_at to exercise the tie-break.
+    """
+    mess = Mess.objects.create(name="Main Mess", location="Block-A")
+    slots = MealType.objects.bulk_create(
+        [MealType(mess=mess, type=f"Meal {i}", session_time="8.30") for i in range(count)]
+    )
+    Booking.objects.bulk_create([Booking(user=user, meal_slot=slot) for slot in slots])
+    start = start or timezone.now() - timedelta(days=1)
+    for i, booking in enumerate(Booking.objects.filter(meal_slot__in=slots).order_by('booking_id')):
+        Booking.objects.filter(pk=booking.pk).update(created_at=start + timedelta(minutes=i // same_time_every))
+
+
+def cursor_of(link):
+    return parse_qs(urlparse(link).query)['cursor'][0] if link else None
+
+
+class KeysetPaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(name="Pager", email="pager@test.com", phone="9090909090")
+        make_bookings(cls.user, 11)
+        cls.expected = list(
+            Booking.objects.order_by('-created_at', '-booking_id').values_list('booking_id', flat=True)
+        )
+
+    def page(self, cursor=None, page_size=3):
+        params = {'page_size': page_size}
+        if cursor:
+            params['cursor'] = cursor
+        request = Request(APIRequestFactory().get('/api/booking/', params))
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(Booking.objects.all(), request)
+        data = paginator.get_paginated_response([row.booking_id for row in rows]).data
+        return data['results'], cursor_of(data['next']), cursor_of(data['previous'])
+
+    def test_walks_forward_and_back_in_total_order(self):
+        seen, cursor, pages = [], None, []
+        while True:
+            results, cursor, _ = self.page(cursor)
+            seen.extend(results)
+            pages.append(results)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(pages), 4)
+
+        # Back from the last page
+        _, _, previous = self.page(self.page(self.page(self.page()[1])[1])[1])
+        self.assertEqual(self.page(previous)[0], pages[2])
+
+    def test_cursors_are_stable_under_inserts(self):
+        first, next_cursor, previous = self.page()
+        self.assertIsNone(previous)
+        Booking.objects.filter(pk=first[0]).update(cancelled=True)
+        # Newer rows land before the cursor, not on the pages after it
+        make_bookings(self.user, 2, start=timezone.now())
+
+        self.assertEqual(self.page(next_cursor)[0], self.expected[3:6])
+
+    def test_one_query_per_page(self):
+        cursor = self.page()[1]
+        with self.assertNumQueries(1):
+            self.page(cursor)
+
+    def test_page_size_is_bounded(self):
+        request = Request(APIRequestFactory().get('/', {'page_size': 10 ** 6}))
+        self.assertEqual(KeysetPagination().get_page_size(request), KeysetPagination.max_page_size)
+        request = Request(APIRequestFactory().get('/', {'page_size': 'x'}))
+        self.assertEqual(KeysetPagination().get_page_size(request), KeysetPagination.page_size)
+
+
+class BookingListPaginationTest(APITestCase):
+
+    def setUp(self):
+        self.student = User.objects.create(name="Student", email="st@test.com", phone="9191919191")
+        self.staff = User.objects.create(name="Staff", email="sf@test.com", phone="9292929292", is_staff=True)
+        make_bookings(self.student, 5)
+
+    def get(self, user, url):
+        token = create_tokens_with_roles(user)['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get(url)
+
+    def test_booking_list_is_paginated(self):
+        body = self.get(self.staff, '/api/booking/?page_size=2').json()
+
+        self.assertEqual(len(body['results']), 2)
+        self.assertIsNotNone(body['next'])
+        self.assertIsNone(body['previous'])
+        self.assertEqual(len(self.client.get(body['next']).json()['results']), 2)
+
+    def test_history_is_paginated(self):
+        body = self.get(self.student, f'/api/history/{self.student.pk}/?page_size=10').json()
+
+        self.assertEqual(len(body['results']), 5)
+        self.assertIsNone(body['next'])
+        self.assertEqual(self.get(self.student, f'/api/history/{self.staff.pk}/').status_code, 403)
+
+    def test_invalid_cursor_is_a_404(self):
+        self.assertEqual(self.get(self.staff, '/api/booking/?cursor=not-a-cursor').status_code, 404)
@@ -0,0 +1,84 @@
+"""
+Tests for the bounded password verification pool used by the login views.
+"""
+
+import threading
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from core.models import User
+from core.password_pool import (
+    PasswordPoolSaturated, PasswordVerificationPool, get_password_pool, reset_password_pool
+)
+
+
+class PasswordVerificationPoolTest(SimpleTestCase):
+
+    def setUp(self):
+        self.encoded = make_password('secret123')
+        self.pool = PasswordVerificationPool(max_workers=1, max_pending=1, timeout=5, retry_after=3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_verifies_and_records_timings(self):
+        self.assertTrue(self.pool.verify('secret123', self.encoded))
+        self.assertFalse(self.pool.verify('wrong', self.encoded))
+
+        stats = self.pool.stats()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['pending'], 0)
+        self.assertGreater(stats['avg_hash_ms'], 0)
+
+    def test_rejects_when_saturated(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_check(password, encoded):
+            started.set()
+            release.wait(5)
+            return True
+
+        with mock.patch('core.password_pool.check_password', slow_check):
+            worker = threading.Thread(target=self.pool.verify, args=('secret123', self.encoded))
+            worker.start()
+            started.wait(5)
+
+            with self.assertRaises(PasswordPoolSaturated) as ctx:
+                self.pool.verify('secret123', self.encoded)
+
+            release.set()
+            worker.join(5)
+
+        self.assertEqual(ctx.exception.retry_after, 3)
+        self.assertEqual(self.pool.stats()['rejected'], 1)
+
+
+class LoginPoolIntegrationTest(APITestCase):
+
+    def setUp(self):
+        reset_password_pool()
+        User.objects.create_user(
+            name="Pool Student",
+            email="pool@test.com",
+            phone="4545454545",
+            roll_no="POOL001",
+            password="testpass123",
+        )
+
+    def tearDown(self):
+        reset_password_pool()
+
+    def test_login_verifies_on_pool(self):
+        response = self.client.post('/auth/student/login/', {'phone': '4545454545', 'password': 'testpass123'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_password_pool().stats()['completed'], 1)
+
+    @override_settings(CORE_AUTH={'PASSWORD_POOL_MAX_PENDING': 0, 'PASSWORD_POOL_RETRY_AFTER': 2})
+    def test_saturated_pool_returns_503_with_retry_after(self):
+        response = self.client.post('/auth/student/login/', {'phone': '4545454545', 'password': 'testpass123'})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
@@ -0,0 +1,68 @@
+"""
+Tests for the set-based DRF permission classes in core/permissions.py.
+"""
+
+from django.test import SimpleTestCase
+from core.models import User
+from core.principal import TokenPrincipal
+from core.permissions import (
+    AdminOrStaff, HasPermission, HasRole, StudentOrAdmin, has_permission, has_role
+)
+
+
+class MockRequest:
+    def __init__(self, user):
+        self.user = user
+
+
+def make_user(**flags):
+    return User(user_id=1, name=flags.pop('name', 'Student'), **flags)
+
+
+def authenticated(user, roles, permissions):
+    # Mirrors what CoreUserJWTAuthentication sets from token claims
+    user.principal = TokenPrincipal(user.user_id, role_set=frozenset(roles), permission_set=frozenset(permissions))
+    return user
+
+
+class PermissionClassTest(SimpleTestCase):
+
+    def setUp(self):
+        self.student = authenticated(make_user(), ['student', 'user'], ['mess.read', 'user.read'])
+        self.admin = authenticated(make_user(name='admin', is_staff=True),
+                                   ['admin', 'staff', 'user'], ['user.delete', 'user.read', 'mess.read'])
+
+    def check(self, permission_class, user):
+        return permission_class().has_permission(MockRequest(user), None)
+
+    def test_factory_precomputes_requirement_sets(self):
+        role_class = has_role(['admin', 'staff'])
+        permission_class = has_permission('user.read', require_all=False)
+
+        self.assertEqual(role_class.required_roles, frozenset(['admin', 'staff']))
+        self.assertEqual(permission_class.required_permissions, frozenset(['user.read']))
+        self.assertFalse(permission_class.require_all)
+
+    def test_has_role(self):
+        self.assertTrue(self.check(has_role(['admin', 'staff']), self.admin))
+        self.assertFalse(self.check(has_role(['admin', 'staff']), self.student))
+
+    def test_has_permission_all_and_any(self):
+        self.assertTrue(self.check(has_permission(['user.read', 'mess.read']), self.student))
+        self.assertFalse(self.check(has_permission(['user.read', 'user.delete']), self.student))
+        self.assertTrue(self.check(has_permission(['user.read', 'user.delete'], require_all=False), self.student))
+
+    def test_direct_instantiation_still_supported(self):
+        self.assertTrue(HasRole('student').has_permission(MockRequest(self.student), None))
+        self.assertFalse(HasPermission(['user.delete']).has_permission(MockRequest(self.student), None))
+
+    def test_convenience_classes(self):
+        self.assertTrue(self.check(AdminOrStaff, self.admin))
+        self.assertFalse(self.check(AdminOrStaff, self.student))
+        self.assertTrue(self.check(StudentOrAdmin, self.student))
+
+    def test_fallback_without_token_claims(self):
+        superuser = make_user(name='Root', is_staff=True, is_superuser=True)
+
+        self.assertTrue(self.check(has_permission(['user.create', 'audit.read']), superuser))
+        self.assertTrue(self.check(AdminOrStaff, superuser))
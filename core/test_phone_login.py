@@ -0,0 +1,69 @@
+"""
+Tests for normalized-phone login lookups.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from core.models import User
+from core.password_pool import reset_password_pool
+from core.pydantic_models import normalize_phone
+from core.throttle import reset_login_throttle
+
+
+class PhoneLoginTest(APITestCase):
+
+    def setUp(self):
+        reset_login_throttle()
+        reset_password_pool()
+        self.user = User.objects.create_user(
+            name="Phone Student", email="phone@test.com", phone="+91 98450-12345",
+            roll_no="PHN001", password="testpass123",
+        )
+
+    def tearDown(self):
+        reset_login_throttle()
+        reset_password_pool()
+
+    def login(self, phone):
+        return self.client.post('/auth/student/login/', {'phone': phone, 'password': 'testpass123'})
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone(' +1 (555) 123-4567 '), '+15551234567')
+        self.assertEqual(normalize_phone('98450.12345'), '9845012345')
+        self.assertEqual(normalize_phone('+91+98450'), '+9198450')
+
+    def test_saves_keep_normalized_phone_in_sync(self):
+        self.assertEqual(self.user.phone_normalized, '+919845012345')
+
+        self.user.phone = '+91 98450 99999'
+        self.user.save(update_fields=['phone'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.phone_normalized, '+919845099999')
+
+    def test_login_matches_any_formatting(self):
+        for phone in ('+91 98450-12345', '+919845012345', '+91 (98450) 12345'):
+            with self.subTest(phone):
+                self.assertEqual(self.login(phone).status_code, 200)
+        self.assertEqual(self.login('9845012345').status_code, 401)
+
+    def test_lookup_is_one_narrow_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login('+91-98450-12345')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertIn('"phone_normalized" = ', sql)
+        self.assertNotIn('"room_no"', sql)
+        self.assertNotIn('"roll_no"', sql)
+
+    def test_signup_rejects_reformatted_duplicate(self):
+        response = self.client.post('/auth/signup/', {
+            'name': "Dup Student", 'email': 'dup@test.com', 'phone': '+919845012345',
+            'roll_no': 'PHN002', 'room_no': 'D-1', 'password': 'testpass123',
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('phone', str(response.data))
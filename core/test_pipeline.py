@@ -0,0 +1,80 @@
+"""
+Tests for the per-prefix lean middleware (core/pipeline.py).
+"""
+
+from unittest import mock
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import clickjacking, csrf
+from django.test import TestCase
+from core.models import User
+
+
+class LeanPipelineTest(TestCase):
+
+    def test_api_prefix_skips_session_csrf_and_frame_options(self):
+        self.client.cookies['sessionid'] = 'stale'
+        response = self.client.get('/api/decorator/unprotected')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertFalse(hasattr(response.wsgi_request, 'user'))
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_api_prefix_posts_without_csrf_token(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post('/api/auth/student/login/', {'phone': '0000000000', 'password': 'x'})
+
+        self.assertNotEqual(response.status_code, 403)
+
+    def test_admin_keeps_full_stack(self):
+        admin = User.objects.create_superuser(
+            name="admin", email="pipeline-admin@test.com", phone="4545454545", password="testpass123",
+        )
+        self.client.force_login(admin)
+
+        response = self.client.get('/admin/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, admin)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(admin)
+        self.assertEqual(client.post('/admin/logout/').status_code, 403)
+
+
+class LeanPipelineCallTest(TestCase):
+    """The stock hooks the lean classes wrap are never entered for /api/ paths."""
+
+    PARENTS = (
+        sessions_middleware.SessionMiddleware, csrf.CsrfViewMiddleware,
+        auth_middleware.AuthenticationMiddleware, messages_middleware.MessageMiddleware,
+        clickjacking.XFrameOptionsMiddleware,
+    )
+    HOOKS = ('process_request', 'process_view', 'process_response')
+
+    def spy_on_hooks(self):
+        spies = {}
+        for parent in self.PARENTS:
+            for hook in self.HOOKS:
+                if hook in vars(parent):
+                    patcher = mock.patch.object(parent, hook, autospec=True, side_effect=vars(parent)[hook])
+                    spies[f'{parent.__name__}.{hook}'] = patcher.start()
+                    self.addCleanup(patcher.stop)
+        return spies
+
+    def test_skipped_middleware_is_never_called_under_api(self):
+        spies = self.spy_on_hooks()
+
+        self.assertEqual(self.client.get('/api/decorator/unprotected').status_code, 200)
+
+        self.assertEqual({name: spy.call_count for name, spy in spies.items() if spy.called}, {})
+
+    def test_middleware_is_called_outside_api(self):
+        spies = self.spy_on_hooks()
+
+        self.client.get('/admin/login/')
+
+        self.assertEqual({name for name, spy in spies.items() if not spy.called}, set())
@@ -0,0 +1,99 @@
+"""
+Tests for TokenPrincipal, the slotted identity built from a verified token.
+"""
+
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from core.auth import CoreUserJWTAuthentication, create_tokens_with_roles
+from core.decorators import authenticated_only
+from core.models import User
+from core.principal import TokenPrincipal, token_principal
+from core.revocation import reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import reset_token_version_cache
+from core.user_cache import reset_user_cache
+
+
+RESETS = (reset_token_cache, reset_revocation_list, reset_token_version_cache, reset_user_cache)
+
+
+class TokenPrincipalTest(SimpleTestCase):
+
+    def test_is_slotted_and_immutable(self):
+        principal = TokenPrincipal(7, name="Ann", role_set=frozenset({'user', 'admin'}))
+
+        self.assertFalse(hasattr(principal, '__dict__'))
+        self.assertEqual(principal.roles, ('admin', 'user'))
+        self.assertEqual(principal.permissions, ())
+        self.assertIsNone(principal.permission_set)
+        with self.assertRaises(AttributeError):
+            principal.roles = ('superuser',)
+        with self.assertRaises(AttributeError):
+            del principal.user_id
+        with self.assertRaises(AttributeError):
+            principal.extra = True
+
+    def test_as_dict(self):
+        principal = TokenPrincipal(7, name="Ann", email="ann@test.com", is_staff=True,
+                                   role_set=frozenset({'admin'}), permission_set=frozenset({'user.read'}))
+
+        self.assertEqual(principal.as_dict(), {
+            'user_id': 7, 'name': "Ann", 'email': "ann@test.com",
+            'roles': ['admin'], 'permissions': ['user.read'],
+            'is_staff': True, 'is_superuser': False,
+        })
+
+
+class TokenPrincipalRequestTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            name="Principal Student", email="principal@test.com", phone="8383838383",
+            roll_no="PRN001", password="testpass123",
+        )
+
+    def setUp(self):
+        for reset in RESETS:
+            reset()
+        self.token = create_tokens_with_roles(self.user)['access']
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        for reset in RESETS:
+            reset()
+
+    def request(self):
+        return self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_from_token(self):
+        principal = token_principal(AccessToken(self.token))
+
+        self.assertEqual(principal.user_id, self.user.pk)
+        self.assertEqual(principal.name, "Principal Student")
+        self.assertEqual(principal.roles, ('student', 'user'))
+        self.assertIn('user.read', principal.permission_set)
+        self.assertEqual(principal.claimed, frozenset({'name', 'email', 'is_staff', 'is_superuser'}))
+
+    def test_shared_across_requests_with_the_same_token(self):
+        auth = CoreUserJWTAuthentication()
+        first, _ = auth.authenticate(self.request())
+        second, _ = auth.authenticate(self.request())
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.principal, second.principal)
+
+    def test_decorators_attach_the_principal(self):
+        seen = []
+
+        @authenticated_only
+        def view(request):
+            seen.append(request.principal)
+            return JsonResponse({'user_id': request.user_id})
+
+        self.assertEqual(view(self.request()).status_code, 200)
+        self.assertEqual(view(self.request()).status_code, 200)
+        self.assertIsInstance(seen[0], TokenPrincipal)
+        self.assertIs(seen[0], seen[1])
+        self.assertFalse(hasattr(self.request(), 'token_data'))
@@ -0,0 +1,110 @@
+"""
+Tests for the claims-preserving refresh endpoint (core.auth.refresh_tokens).
+"""
+
+from unittest import mock
+from django.db.models import F
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from core.auth import create_tokens_with_roles
+from core.claims import token_permission_list, token_role_list
+from core.models import User
+from core.revocation import get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import bump_token_version, get_token_version_cache, reset_token_version_cache
+from core.user_cache import get_user_cache, reset_user_cache
+
+
+class TokenRefreshTest(APITestCase):
+
+    def setUp(self):
+        for reset in (reset_token_cache, reset_revocation_list, reset_token_version_cache, reset_user_cache):
+            reset()
+        self.user = User.objects.create_user(
+            name="Refresh Student", email="refresh@test.com", phone="9191919191",
+            roll_no="REF001", password="testpass123",
+        )
+        self.tokens = create_tokens_with_roles(self.user)
+        # Steady state: revocation filter and generations already loaded
+        get_revocation_list().rebuild()
+        get_token_version_cache().current(self.user.pk)
+
+    def tearDown(self):
+        for reset in (reset_token_cache, reset_revocation_list, reset_token_version_cache, reset_user_cache):
+            reset()
+
+    def refresh(self, raw=None):
+        return self.client.post('/auth/token/refresh/', {'refresh': raw or self.tokens['refresh']})
+
+    def test_carries_claims_forward_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.refresh()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('refresh', response.data)
+        access = AccessToken(response.data['access'])
+        original = AccessToken(self.tokens['access'])
+        self.assertEqual(token_role_list(access), ['student', 'user'])
+        self.assertEqual(token_permission_list(access), token_permission_list(original))
+        self.assertEqual(access['name'], "Refresh Student")
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/decorator/user-profile').status_code, 200)
+
+    def test_rederives_claims_after_role_change(self):
+        self.user.is_staff = True
+        self.user.name = "admin"
+        self.user.save()
+
+        response = self.refresh()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh', response.data)
+        access = AccessToken(response.data['access'])
+        self.assertIn('admin', token_role_list(access))
+        self.assertIn('user.delete', token_permission_list(access))
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/decorator/admin-dashboard').status_code, 200)
+        # The new refresh token is current again: no further re-derivation
+        with self.assertNumQueries(0):
+            self.assertNotIn('refresh', self.refresh(response.data['refresh']).data)
+
+    def test_rederives_from_the_database_not_a_stale_cached_user(self):
+        get_user_cache().get_user(self.user.pk)
+        # Role change made by another worker: no signal reaches this process's
+        # user cache, only the generation is reloaded
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, role_version=F('role_version') + 1)
+        get_token_version_cache().invalidate(self.user.pk)
+
+        response = self.refresh()
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.data['access'])
+        self.assertIn('staff', token_role_list(access))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(self.client.get('/decorator/user-profile').status_code, 200)
+
+    def test_rejects_retired_and_revoked_refresh_tokens(self):
+        get_revocation_list().revoke(RefreshToken(self.tokens['refresh']))
+        self.assertEqual(self.refresh().status_code, 401)
+
+        other = create_tokens_with_roles(self.user)['refresh']
+        bump_token_version(self.user.pk)
+        self.assertEqual(self.refresh(other).status_code, 401)
+
+    def test_rejects_access_token_and_garbage(self):
+        self.assertEqual(self.refresh(self.tokens['access']).status_code, 401)
+        self.assertEqual(self.refresh('not-a-token').status_code, 401)
+        self.assertEqual(self.client.post('/auth/token/refresh/', {}).status_code, 400)
+
+    @mock.patch.object(api_settings, 'ROTATE_REFRESH_TOKENS', True)
+    @mock.patch.object(api_settings, 'BLACKLIST_AFTER_ROTATION', True)
+    def test_rotation_revokes_the_used_refresh_token(self):
+        response = self.refresh()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh', response.data)
+        self.assertEqual(self.refresh().status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
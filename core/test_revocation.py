@@ -0,0 +1,164 @@
+"""
+Tests for jti revocation: the Bloom filter, the per-process revocation list
+and its enforcement in authentication and the decorators.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from core.auth import CoreUserJWTAuthentication, create_tokens_with_roles
+from core.models import RevokedToken, User
+from core.revocation import BloomFilter, RevocationList, get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+
+
+class BloomFilterTest(SimpleTestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f'jti-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_duplicate_add_is_not_counted(self):
+        bloom = BloomFilter(capacity=10, error_rate=0.01)
+
+        self.assertTrue(bloom.add('a'))
+        self.assertFalse(bloom.add('a'))
+        self.assertEqual(len(bloom), 1)
+
+
+class RevocationListTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            name="Revoke Student", email="revoke@test.com", phone="6767676767",
+            roll_no="REV001", password="testpass123",
+        )
+        self.revocations = RevocationList(capacity=100, error_rate=0.001, sync_interval=3600, rebuild_interval=3600)
+
+    def test_revoke_and_check(self):
+        token = AccessToken.for_user(self.user)
+        self.revocations.revoke(token, reason='test')
+
+        self.assertTrue(self.revocations.is_revoked(token['jti']))
+        row = RevokedToken.objects.get(jti=token['jti'])
+        self.assertEqual(row.user_id, self.user.pk)
+        self.assertEqual(row.reason, 'test')
+
+    def test_not_revoked_costs_no_queries(self):
+        self.revocations.rebuild()
+
+        with self.assertNumQueries(0):
+            for i in range(100):
+                self.assertFalse(self.revocations.is_revoked(f'unknown-{i}'))
+
+    def test_sync_picks_up_revocations_from_other_processes(self):
+        self.revocations.rebuild()
+        RevokedToken.objects.create(jti='elsewhere', expires_at=timezone.now() + timedelta(minutes=5))
+
+        # Not visible until the next sync
+        self.assertFalse(self.revocations.is_revoked('elsewhere'))
+        self.revocations.sync_interval = 0
+        self.assertTrue(self.revocations.is_revoked('elsewhere'))
+
+    def test_rebuild_drops_expired_revocations(self):
+        RevokedToken.objects.create(jti='expired', expires_at=timezone.now() - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='live', expires_at=timezone.now() + timedelta(minutes=5))
+        self.revocations.rebuild()
+
+        self.assertEqual(self.revocations.stats()['entries'], 1)
+        self.assertTrue(self.revocations.is_revoked('live'))
+
+    def test_purge_command_deletes_expired_rows(self):
+        RevokedToken.objects.create(jti='expired', expires_at=timezone.now() - timedelta(minutes=1))
+        RevokedToken.objects.create(jti='live', expires_at=timezone.now() + timedelta(minutes=5))
+
+        call_command('purge_revoked_tokens', stdout=StringIO())
+
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+class RevocationEnforcementTest(APITestCase):
+
+    def setUp(self):
+        reset_revocation_list()
+        reset_token_cache()
+        self.user = User.objects.create_user(
+            name="Logout Student", email="logout@test.com", phone="7878787878",
+            roll_no="OUT001", password="testpass123",
+        )
+        self.tokens = create_tokens_with_roles(self.user)
+
+    def tearDown(self):
+        reset_revocation_list()
+        reset_token_cache()
+
+    def auth(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_logout_revokes_access_and_refresh(self):
+        self.auth(self.tokens['access'])
+        self.assertEqual(self.client.get('/token/info').status_code, 200)
+
+        response = self.client.post('/auth/logout/', {'refresh': self.tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/token/info').status_code, 401)
+        self.assertEqual(self.client.get('/decorator/user-profile').status_code, 401)
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 2)
+
+    def test_logout_rejects_foreign_refresh_token(self):
+        other = User.objects.create_user(
+            name="Other", email="other@test.com", phone="7878787879", roll_no="OUT002", password="x",
+        )
+        self.auth(self.tokens['access'])
+
+        response = self.client.post('/auth/logout/', {'refresh': create_tokens_with_roles(other)['refresh']})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(RevokedToken.objects.exists())
+
+    def test_logout_reads_the_configured_user_id_claim(self):
+        with mock.patch.object(api_settings, 'USER_ID_CLAIM', 'sub'):
+            reset_token_cache()
+            tokens = create_tokens_with_roles(self.user)
+            self.auth(tokens['access'])
+            response = self.client.post('/auth/logout/', {'refresh': tokens['refresh']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(RevokedToken.objects.filter(user=self.user).count(), 2)
+
+    def test_get_validated_token_rejects_revoked_cached_token(self):
+        auth = CoreUserJWTAuthentication()
+        token = auth.get_validated_token(self.tokens['access'])
+
+        get_revocation_list().revoke(token)
+
+        with self.assertRaises(InvalidToken):
+            auth.get_validated_token(self.tokens['access'])
+
+    @override_settings(CORE_AUTH={'REVOCATION_SYNC_INTERVAL': 3600})
+    def test_valid_tokens_skip_the_revocation_table(self):
+        self.auth(self.tokens['access'])
+        self.client.get('/decorator/user-profile')  # builds the filter
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/decorator/user-profile').status_code, 200)
@@ -0,0 +1,98 @@
+"""
+Tests for login throttling (core/throttle.py).
+"""
+
+from unittest import mock
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APITestCase
+from core.models import User
+from core.password_pool import get_password_pool, reset_password_pool
+from core.throttle import LocalBucketStore, SharedBucketStore, parse_rate, reset_login_throttle
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'throttle-tests'},
+}
+
+
+class BucketStoreTest(SimpleTestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/min'), (5, 60))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+        self.assertIsNone(parse_rate(None))
+
+    def test_local_bucket_allows_burst_then_refills(self):
+        store = LocalBucketStore(maxsize=100)
+        clock = [1000.0]
+
+        with mock.patch('core.throttle.time.monotonic', lambda: clock[0]):
+            self.assertEqual([store.consume('k', 3, 60) for _ in range(3)], [0, 0, 0])
+            wait = store.consume('k', 3, 60)
+            self.assertAlmostEqual(wait, 20.0)
+            self.assertEqual(store.consume('other', 3, 60), 0)
+
+            clock[0] += 20
+            self.assertEqual(store.consume('k', 3, 60), 0)
+            self.assertGreater(store.consume('k', 3, 60), 0)
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_shared_store_limits_across_workers(self):
+        worker_a, worker_b = SharedBucketStore('throttle'), SharedBucketStore('throttle')
+        worker_a.clear()
+
+        results = [store.consume('k', 4, 60) for store in (worker_a, worker_b) * 3]
+
+        self.assertEqual(results[:4], [0, 0, 0, 0])
+        self.assertTrue(all(wait > 0 for wait in results[4:]))
+
+
+class LoginThrottleTest(APITestCase):
+
+    def setUp(self):
+        reset_login_throttle()
+        reset_password_pool()
+        User.objects.create_user(
+            name="Throttle Student", email="throttle@test.com", phone="2323232323",
+            roll_no="THR001", password="testpass123",
+        )
+
+    def tearDown(self):
+        reset_login_throttle()
+        reset_password_pool()
+
+    def login(self, phone='2323232323', password='wrongpass'):
+        return self.client.post('/auth/student/login/', {'phone': phone, 'password': password})
+
+    @override_settings(CORE_AUTH={'LOGIN_THROTTLE_PHONE_RATE': '3/min', 'LOGIN_THROTTLE_IP_RATE': None})
+    def test_phone_limit_rejects_before_query_or_hash(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 401)
+
+        with self.assertNumQueries(0):
+            response = self.login(password='testpass123')
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '20')
+        self.assertEqual(get_password_pool().stats()['completed'], 3)
+
+    @override_settings(CORE_AUTH={'LOGIN_THROTTLE_PHONE_RATE': '10/min', 'LOGIN_THROTTLE_IP_RATE': '2/min'})
+    def test_ip_limit_spans_phone_numbers(self):
+        self.assertEqual(self.login('1111111111').status_code, 401)
+        self.assertEqual(self.login('2222222222').status_code, 401)
+
+        self.assertEqual(self.login('3333333333').status_code, 429)
+        self.client.defaults['REMOTE_ADDR'] = '10.0.0.2'
+        self.assertEqual(self.login().status_code, 401)
+
+    @override_settings(CACHES=LOCMEM_CACHES, CORE_AUTH={
+        'LOGIN_THROTTLE_BACKEND': 'throttle', 'LOGIN_THROTTLE_PHONE_RATE': '2/min', 'LOGIN_THROTTLE_IP_RATE': None,
+    })
+    def test_shared_backend_mode(self):
+        SharedBucketStore('throttle').clear()
+
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.login().status_code, 401)
+        reset_login_throttle()  # a different worker, same shared store
+        self.assertEqual(self.login().status_code, 429)
@@ -0,0 +1,103 @@
+"""
+Tests for per-user token generations ("log out everywhere").
+"""
+
+from rest_framework.test import APITestCase
+from core.auth import create_tokens_with_roles
+from core.models import User
+from core.revocation import get_revocation_list, reset_revocation_list
+from core.token_cache import reset_token_cache
+from core.token_version import (
+    RETIRED, TOKEN_VERSION_CLAIM, bump_token_version, get_token_version_cache, reset_token_version_cache
+)
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class TokenVersionTest(APITestCase):
+
+    def setUp(self):
+        reset_token_cache()
+        reset_revocation_list()
+        reset_token_version_cache()
+        self.user = User.objects.create_user(
+            name="Version Student", email="version@test.com", phone="8989898989",
+            roll_no="VER001", room_no="C-1", password="testpass123",
+        )
+        self.token = create_tokens_with_roles(self.user)['access']
+
+    def tearDown(self):
+        reset_token_cache()
+        reset_revocation_list()
+        reset_token_version_cache()
+
+    def get(self, path, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+        return self.client.get(path)
+
+    def assertRetired(self, token=None):
+        self.assertEqual(self.get('/token/info', token).status_code, 401)
+        self.assertEqual(self.get('/decorator/user-profile', token).status_code, 401)
+
+    def test_tokens_carry_generation(self):
+        self.assertEqual(AccessToken(self.token)[TOKEN_VERSION_CLAIM], 0)
+
+    def test_logout_all_retires_outstanding_tokens(self):
+        other_device = create_tokens_with_roles(self.user)['access']
+        self.assertEqual(self.get('/token/info').status_code, 200)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(self.client.post('/auth/logout/all/').status_code, 200)
+
+        self.assertRetired()
+        self.assertRetired(other_device)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(self.get('/token/info', create_tokens_with_roles(self.user)['access']).status_code, 200)
+
+    def test_deactivation_retires_tokens(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(get_token_version_cache().current(self.user.pk), RETIRED)
+        self.assertRetired()
+
+    def test_role_change_retires_access_tokens(self):
+        self.user.is_staff = True
+        self.user.save(update_fields=['is_staff'])
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.token_version, self.user.role_version), (0, 1))
+        self.assertRetired()
+
+    def test_unrelated_changes_keep_tokens(self):
+        self.user.room_no = "C-2"
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['room_no'])  # no stored-row lookup either
+
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.token_version, self.user.role_version), (0, 0))
+        self.assertEqual(self.get('/token/info').status_code, 200)
+
+    def test_stale_instance_does_not_undo_a_bump(self):
+        stale = User.objects.get(pk=self.user.pk)
+        bump_token_version(self.user.pk)
+
+        stale.room_no = "C-3"
+        stale.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertRetired()
+
+    def test_deleted_user_tokens_are_rejected(self):
+        self.user.delete()
+
+        self.assertRetired()
+
+    def test_steady_state_check_is_a_cache_read(self):
+        get_revocation_list().rebuild()
+        self.get('/decorator/user-profile')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get('/decorator/user-profile').status_code, 200)
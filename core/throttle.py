@@ -0,0 +1,184 @@
+"""
+Login attempt throttling.
+
+Each login attempt draws from two buckets, one keyed by the phone number and
+one by the client IP, before the view touches the database or the password
+hasher. A credential-stuffing burst against one account, or from one
+address, is answered with 429 for the price of a dict lookup.
+
+Two stores implement the same ``consume(key, limit, period)`` contract:
+
+- LocalBucketStore: token buckets in a bounded per-process LRU. Limits apply
+  per worker, so N workers admit up to N times the configured rate.
+- SharedBucketStore: a sliding-window counter on a Django cache alias
+  (CORE_AUTH["LOGIN_THROTTLE_BACKEND"]), so limits hold across workers. It
+  only needs add/incr/get, which Redis and Memcached do atomically; the
+  ``locmem`` backend works as a local stand-in.
+
+Rates use DRF's format: "5/min", "100/hour".
+"""
+
+import math
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import BaseThrottle
+
+from core.conf import auth_settings
+from core.lru import LRUCache
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60). None disables the rule."""
+    if rate is None:
+        return None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """Token buckets: ``limit`` tokens of burst, refilled at limit/period per second."""
+
+    def __init__(self, maxsize):
+        # Idle buckets are full again after `period`, so evicting them is lossless
+        self.buckets = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def consume(self, key, limit, period):
+        """Return 0 if the attempt is admitted, else seconds until it would be."""
+        now = time.monotonic()
+        rate = limit / period
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                tokens = float(limit)
+            else:
+                tokens, updated_at = bucket
+                tokens = min(float(limit), tokens + (now - updated_at) * rate)
+            if tokens >= 1:
+                self.buckets.set(key, (tokens - 1, now), ttl=period)
+                return 0
+            self.buckets.set(key, (tokens, now), ttl=period)
+            return (1 - tokens) / rate
+
+    def clear(self):
+        self.buckets.clear()
+
+
+class SharedBucketStore:
+    """
+    Sliding-window counter: the current fixed window's count plus the previous
+    window's count weighted by how much of it still overlaps the sliding window.
+    """
+
+    key_prefix = "core:login-throttle:"
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def consume(self, key, limit, period):
+        now = time.time()
+        window = int(now // period)
+        elapsed = now - window * period
+        current_key = f"{self.key_prefix}{key}:{window}"
+        cache = self.cache
+
+        cache.add(current_key, 0, timeout=period * 2)
+        try:
+            count = cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr(); start the window over
+            cache.set(current_key, 1, timeout=period * 2)
+            count = 1
+        previous = cache.get(f"{self.key_prefix}{key}:{window - 1}", 0)
+
+        if previous * (period - elapsed) / period + count <= limit:
+            return 0
+        return period - elapsed
+
+    def clear(self):
+        self.cache.clear()
+
+
+class LoginThrottle:
+    """
+    Usage:
+    retry_after = get_login_throttle().check(request, phone)
+    if retry_after:
+        ...  # 429, Retry-After: retry_after
+    """
+
+    def __init__(self, store, phone_rate, ip_rate):
+        self.store = store
+        self.phone_rule = parse_rate(phone_rate)
+        self.ip_rule = parse_rate(ip_rate)
+        self._ident = BaseThrottle()
+        self.allowed = 0
+        self.rejected_phone = 0
+        self.rejected_ip = 0
+
+    def check(self, request, phone):
+        """Seconds the caller must wait (0 when the attempt is admitted)."""
+        if self.ip_rule is not None:
+            wait = self.store.consume(f"ip:{self._ident.get_ident(request)}", *self.ip_rule)
+            if wait:
+                self.rejected_ip += 1
+                return math.ceil(wait)
+        if self.phone_rule is not None:
+            wait = self.store.consume(f"phone:{phone.strip()}", *self.phone_rule)
+            if wait:
+                self.rejected_phone += 1
+                return math.ceil(wait)
+        self.allowed += 1
+        return 0
+
+    def stats(self):
+        return {
+            "backend": "shared" if isinstance(self.store, SharedBucketStore) else "local",
+            "allowed": self.allowed,
+            "rejected_phone": self.rejected_phone,
+            "rejected_ip": self.rejected_ip,
+        }
+
+
+_login_throttle = None
+_login_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    """Return the process-wide LoginThrottle."""
+    global _login_throttle
+    if _login_throttle is None:
+        with _login_throttle_lock:
+            if _login_throttle is None:
+                alias = auth_settings.LOGIN_THROTTLE_BACKEND
+                store = (SharedBucketStore(alias) if alias
+                         else LocalBucketStore(maxsize=auth_settings.LOGIN_THROTTLE_CACHE_SIZE))
+                _login_throttle = LoginThrottle(
+                    store,
+                    phone_rate=auth_settings.LOGIN_THROTTLE_PHONE_RATE,
+                    ip_rate=auth_settings.LOGIN_THROTTLE_IP_RATE,
+                )
+    return _login_throttle
+
+
+def reset_login_throttle():
+    global _login_throttle
+    with _login_throttle_lock:
+        _login_throttle = None
+
+
+@receiver(setting_changed)
+def reset_login_throttle_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] in ("CORE_AUTH", "CACHES"):
+        reset_login_throttle()
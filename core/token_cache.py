@@ -0,0 +1,151 @@
+"""
+Cache of verified access tokens.
+
+Verifying a JWT means an HMAC check plus a base64/JSON decode. Clients resend
+the same bearer token for its whole lifetime, so the verified token is kept in
+a bounded LRU keyed by a digest of the raw token and served until its ``exp``.
+Shared by CoreUserJWTAuthentication and the wrappers in core/decorators.py.
+
+Revocation (core/revocation.py) is checked on every call, cached or not.
+
+introspect_tokens() answers "is this token good, and for whom" for batches of
+raw tokens (scanner devices) from the same cache.
+"""
+
+import hashlib
+import threading
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.claims import token_role_list
+from core.conf import auth_settings
+from core.lru import LRUCache
+from core.revocation import ais_token_revoked, is_token_revoked
+
+
+def token_digest(raw_token):
+    if isinstance(raw_token, str):
+        raw_token = raw_token.encode()
+    return hashlib.blake2b(raw_token, digest_size=16).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified tokens, each entry expiring at the token's ``exp``.
+
+    Usage:
+    token = cache.get(raw_token)  # None on miss
+    cache.put(raw_token, validated_token)
+    """
+
+    def __init__(self, maxsize):
+        self.entries = LRUCache(maxsize=maxsize)
+
+    def get(self, raw_token):
+        return self.entries.get(token_digest(raw_token))
+
+    def put(self, raw_token, validated_token):
+        exp = validated_token.get('exp')
+        if exp is None:
+            # Never cache a token that would not expire on its own
+            return
+        self.entries.set(token_digest(raw_token), validated_token, expires_at=exp)
+
+    def verify(self, raw_token, token_class=AccessToken):
+        """Return a verified token, constructing (and caching) it on a miss."""
+        token = self.get(raw_token)
+        if token is None:
+            token = token_class(raw_token)
+            self.put(raw_token, token)
+        return token
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return self.entries.stats()
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    """Return the process-wide VerifiedTokenCache."""
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = VerifiedTokenCache(maxsize=auth_settings.TOKEN_CACHE_SIZE)
+    return _token_cache
+
+
+def reset_token_cache():
+    global _token_cache
+    with _token_cache_lock:
+        _token_cache = None
+
+
+@receiver(setting_changed)
+def reset_token_cache_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] in ("CORE_AUTH", "SIMPLE_JWT", "SECRET_KEY"):
+        reset_token_cache()
+
+
+def verify_access_token(raw_token):
+    """
+    Drop-in replacement for ``AccessToken(raw_token)`` that reuses earlier
+    verifications. Raises TokenError exactly like AccessToken on a miss, and
+    also for revoked tokens.
+    """
+    token = get_token_cache().verify(raw_token, AccessToken)
+    if is_token_revoked(token):
+        raise TokenError("Token has been revoked")
+    return token
+
+
+async def averify_access_token(raw_token):
+    """
+    Async verify_access_token(). Verification itself is CPU-only (and cached);
+    the revocation and generation checks are awaited.
+    """
+    token = get_token_cache().verify(raw_token, AccessToken)
+    if await ais_token_revoked(token):
+        raise TokenError("Token has been revoked")
+    return token
+
+
+_INACTIVE = {"active": False}
+
+
+def introspect_tokens(raw_tokens):
+    """
+    One entry per raw token, in order: {"active": False} for anything that
+    would be rejected (bad signature, expired, revoked, retired), otherwise
+    {"active": True, "sub": user_id, "exp": exp, "roles": [...]}. Repeated
+    tokens in a batch are verified once.
+    """
+    user_id_claim = api_settings.USER_ID_CLAIM
+    seen = {}
+    results = []
+    for raw_token in raw_tokens:
+        entry = seen.get(raw_token)
+        if entry is None:
+            try:
+                token = verify_access_token(raw_token)
+            except TokenError:
+                entry = _INACTIVE
+            else:
+                entry = {
+                    "active": True,
+                    "sub": token.get(user_id_claim),
+                    "exp": token["exp"],
+                    "roles": token_role_list(token),
+                }
+            seen[raw_token] = entry
+        results.append(entry)
+    return results
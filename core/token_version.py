@@ -0,0 +1,208 @@
+"""
+Per-user token generations ("log out everywhere").
+
+Every user row carries two counters that are written into the tokens it is
+issued:
+
+- ``token_version`` (claim ``tv``): the session generation. Bumping it retires
+  every outstanding access *and* refresh token of the user. Bumped on demand
+  (logout from all devices) and by core/signals.py when is_active changes.
+- ``role_version`` (claim ``rv``): the claims generation. Bumped by
+  core/signals.py when a field roles derive from changes. Outstanding access
+  tokens stop being accepted, but refresh tokens stay valid: the refresh
+  endpoint re-derives roles and permissions for them (core.auth.refresh_tokens).
+
+Checking a token compares its claims with the current generations, which are
+served from a per-process LRU (plus the shared USER_CACHE_BACKEND tier when
+configured); a miss costs one narrow query, never a full User load. Tokens
+issued before the claims existed count as generation 0. The ``a``-prefixed
+variants do the same from async code without blocking the event loop.
+"""
+
+import threading
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db.models import F
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from core.conf import auth_settings
+from core.lru import LRUCache
+from core.models import User
+from core.user_cache import get_user_cache
+
+
+TOKEN_VERSION_CLAIM = 'tv'
+ROLE_VERSION_CLAIM = 'rv'
+
+# Fields that decide which roles a user gets (see core.auth.compute_user_roles)
+ROLE_VERSION_FIELDS = ('name', 'is_staff', 'is_superuser')
+# Fields that decide whether a user may authenticate at all
+TOKEN_VERSION_FIELDS = ('is_active',)
+
+# Cached for users that no longer exist (or are inactive), so their tokens fail
+# without a query per request
+RETIRED = (-1, -1)
+
+
+class TokenVersionCache:
+    """
+    Usage:
+    token_version, role_version = get_token_version_cache().current(user_id)  # RETIRED for missing/inactive users
+    get_token_version_cache().invalidate(user_id)
+    """
+
+    key_prefix = "core:tv:"
+
+    def __init__(self, maxsize, ttl, backend_alias=None, backend_ttl=None):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.backend_alias = backend_alias
+        self.backend_ttl = backend_ttl
+        self.db_loads = 0
+
+    @property
+    def shared(self):
+        if not self.backend_alias:
+            return None
+        return caches[self.backend_alias]
+
+    def _key(self, user_id):
+        return f"{self.key_prefix}{user_id}"
+
+    def current(self, user_id):
+        versions = self.local.get(user_id)
+        if versions is not None:
+            return versions
+
+        shared = self.shared
+        if shared is not None:
+            versions = shared.get(self._key(user_id))
+            if versions is not None:
+                versions = tuple(versions)
+                self.local.set(user_id, versions)
+                return versions
+
+        versions = self._load(user_id, self._row(user_id).first())
+        if shared is not None:
+            shared.set(self._key(user_id), versions, self.backend_ttl)
+        return versions
+
+    async def acurrent(self, user_id):
+        """Async current()."""
+        versions = self.local.get(user_id)
+        if versions is not None:
+            return versions
+
+        shared = self.shared
+        if shared is not None:
+            versions = await shared.aget(self._key(user_id))
+            if versions is not None:
+                versions = tuple(versions)
+                self.local.set(user_id, versions)
+                return versions
+
+        versions = self._load(user_id, await self._row(user_id).afirst())
+        if shared is not None:
+            await shared.aset(self._key(user_id), versions, self.backend_ttl)
+        return versions
+
+    @staticmethod
+    def _row(user_id):
+        return User.objects.filter(pk=user_id).values_list('token_version', 'role_version', 'is_active')
+
+    def _load(self, user_id, row):
+        self.db_loads += 1
+        versions = (row[0], row[1]) if row and row[2] else RETIRED
+        self.local.set(user_id, versions)
+        return versions
+
+    def invalidate(self, user_id):
+        self.local.delete(user_id)
+        shared = self.shared
+        if shared is not None:
+            shared.delete(self._key(user_id))
+
+    def clear(self):
+        self.local.clear()
+        self.db_loads = 0
+
+    def stats(self):
+        return {
+            "local": self.local.stats(),
+            "shared_enabled": self.backend_alias is not None,
+            "db_loads": self.db_loads,
+        }
+
+
+_token_version_cache = None
+_token_version_cache_lock = threading.Lock()
+
+
+def get_token_version_cache():
+    """Return the process-wide TokenVersionCache."""
+    global _token_version_cache
+    if _token_version_cache is None:
+        with _token_version_cache_lock:
+            if _token_version_cache is None:
+                _token_version_cache = TokenVersionCache(
+                    maxsize=auth_settings.TOKEN_VERSION_CACHE_SIZE,
+                    ttl=auth_settings.TOKEN_VERSION_CACHE_TTL,
+                    backend_alias=auth_settings.USER_CACHE_BACKEND,
+                    backend_ttl=auth_settings.USER_CACHE_BACKEND_TTL,
+                )
+    return _token_version_cache
+
+
+def reset_token_version_cache():
+    global _token_version_cache
+    with _token_version_cache_lock:
+        _token_version_cache = None
+
+
+@receiver(setting_changed)
+def reset_token_version_cache_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] in ("CORE_AUTH", "CACHES"):
+        reset_token_version_cache()
+
+
+def token_versions(token):
+    """(token_version, role_version) claimed by a token."""
+    return token.get(TOKEN_VERSION_CLAIM, 0), token.get(ROLE_VERSION_CLAIM, 0)
+
+
+def is_token_version_current(token):
+    """
+    False if the token's user is gone, inactive or has moved to a newer
+    session or claims generation. Used for access tokens.
+    """
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return True  # rejected by the caller for lacking a user anyway
+    return token_versions(token) == get_token_version_cache().current(user_id)
+
+
+async def ais_token_version_current(token):
+    """Async is_token_version_current()."""
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if user_id is None:
+        return True
+    return token_versions(token) == await get_token_version_cache().acurrent(user_id)
+
+
+def _bump(user_id, field):
+    User.objects.filter(pk=user_id).update(**{field: F(field) + 1})
+    get_token_version_cache().invalidate(user_id)
+    # queryset.update() sends no post_save, so drop the cached row ourselves
+    get_user_cache().invalidate(user_id)
+    return User.objects.filter(pk=user_id).values_list(field, flat=True).first()
+
+
+def bump_token_version(user_id):
+    """Retire every access and refresh token issued to the user so far. Returns the new generation."""
+    return _bump(user_id, 'token_version')
+
+
+def bump_role_version(user_id):
+    """Retire the user's access tokens and make refresh re-derive their claims. Returns the new generation."""
+    return _bump(user_id, 'role_version')
@@ -1,14 +1,14 @@
 from django.urls import path
 from . import views
 from .views import RegisterView, AdminCreateView, BaseLoginMixin, StudentLoginView, AdminLoginView, UserListView, UserDetailView, MessListCreateView, MessDetailView, health_check, home, cors_test
-from .views import MealSlotDetailView, MealSlotView, GenerateCouponView, ValidateCouponView, MyCouponListView, BookingDeleteView, BookingView, MealAvailabilityView, NotificationView, MessUsageReportView, MessUsageExportView, BookingHistoryView, AuditLogView
-from .views import TokenInfoView, RoleBasedTestView, PermissionBasedTestView, SuperUserOnlyView, StudentOnlyView, FlexiblePermissionView, ComplexPermissionView
+from .views import MealSlotDetailView, MealSlotView, GenerateCouponView, ValidateCouponView, MyCouponListView, BookingDeleteView, BookingView, BookingBulkView, MealAvailabilityView, NotificationView, MessUsageReportView, MessUsageExportView, BookingHistoryView, AuditLogView
+from .views import AuthCacheStatsView, LogoutView, LogoutAllView, TokenRefreshView, TokenIntrospectView, TokenInfoView, RoleBasedTestView, PermissionBasedTestView, SuperUserOnlyView, StudentOnlyView, FlexiblePermissionView, ComplexPermissionView
 from .decorator_views import (
     admin_dashboard, create_user, system_settings, staff_dashboard, superuser_panel, 
     student_portal, user_list, user_management, flexible_access, user_profile, 
-    token_info, admin_user_delete, unprotected_endpoint, decorator_test_info
+    token_info, admin_user_delete, unprotected_endpoint, decorator_test_info, async_user_profile
 )
-from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 urlpatterns = [
     path('', views.health_check),
@@ -20,12 +20,16 @@ urlpatterns = [
     path('auth/admin/login/', AdminLoginView.as_view()),
     path('auth/signup/', RegisterView.as_view(), name='register'),
     path('auth/admin/signup/', AdminCreateView.as_view()),
+    path('auth/logout/', LogoutView.as_view(), name='logout'),
+    path('auth/logout/all/', LogoutAllView.as_view(), name='logout-all'),
     
     # JWT Token endpoints
     path('auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("auth/token/introspect/", TokenIntrospectView.as_view(), name="token-introspect"),
     
     # Token and Role Testing
+    path('auth/cache-stats/', AuthCacheStatsView.as_view(), name='auth-cache-stats'),
     path('token/info', TokenInfoView.as_view(), name='token-info'),
     path('test/role-based', RoleBasedTestView.as_view(), name='role-test'),
     path('test/permission-based', PermissionBasedTestView.as_view(), name='permission-test'),
@@ -46,6 +50,7 @@ urlpatterns = [
     path('decorator/user-management', user_management, name='user-management'),
     path('decorator/flexible-access', flexible_access, name='flexible-access'),
     path('decorator/user-profile', user_profile, name='user-profile'),
+    path('decorator/async/user-profile', async_user_profile, name='async-user-profile'),
     path('decorator/token-info', token_info, name='decorator-token-info'),
     path('decorator/admin-user-delete', admin_user_delete, name='admin-user-delete'),
     path('decorator/unprotected', unprotected_endpoint, name='unprotected'),
@@ -66,6 +71,7 @@ urlpatterns = [
     path("coupons/my/", MyCouponListView.as_view()),   # GET – students see only their coupons
 
     path("booking/", BookingView.as_view(),        name="booking-create"),
+    path("booking/bulk/", BookingBulkView.as_view(), name="booking-bulk"),
     path("booking/<int:booking_id>/", BookingDeleteView.as_view(), name="booking-delete"),
     path("booking/availability/", MealAvailabilityView.as_view(), name="meal-avail"),
 
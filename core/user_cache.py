@@ -0,0 +1,148 @@
+"""
+Two-tier cache for resolving authenticated users.
+
+Tier 1 is a per-process LRU (core.lru.LRUCache). Tier 2 is an optional shared
+Django cache backend (CORE_AUTH["USER_CACHE_BACKEND"]) so that workers can
+warm each other. Entries are dropped on post_save/post_delete of core.User
+(see core/signals.py), so flag changes like is_active apply on the next request
+handled by the writing process. Other processes keep their local copy for up
+to USER_CACHE_TTL seconds.
+aget_user() is the async variant: local hits never leave the event loop and
+misses use the async cache and ORM APIs.
+"""
+
+import copy
+import threading
+
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from core.conf import auth_settings
+from core.lru import LRUCache
+from core.models import User
+
+
+class UserCache:
+    """
+    Resolves users by primary key, hitting the database only on a miss.
+
+    Usage:
+    user = get_user_cache().get_user(user_id)  # raises User.DoesNotExist
+    get_user_cache().invalidate(user_id)
+    """
+
+    key_prefix = "core:user:"
+
+    def __init__(self, maxsize, ttl, backend_alias=None, backend_ttl=None):
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.backend_alias = backend_alias
+        self.backend_ttl = backend_ttl
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.db_loads = 0
+
+    @property
+    def shared(self):
+        if not self.backend_alias:
+            return None
+        return caches[self.backend_alias]
+
+    def _key(self, user_id):
+        return f"{self.key_prefix}{user_id}"
+
+    def get_user(self, user_id):
+        user = self.local.get(user_id)
+        if user is not None:
+            # Callers annotate the instance per request, so never hand out the
+            # cached object itself.
+            return copy.copy(user)
+
+        shared = self.shared
+        if shared is not None:
+            user = shared.get(self._key(user_id))
+            if user is not None:
+                self.shared_hits += 1
+                self.local.set(user_id, user)
+                return copy.copy(user)
+            self.shared_misses += 1
+
+        user = User.objects.get(pk=user_id)
+        self.db_loads += 1
+        self.local.set(user_id, user)
+        if shared is not None:
+            shared.set(self._key(user_id), user, self.backend_ttl)
+        return copy.copy(user)
+
+    async def aget_user(self, user_id):
+        """Async get_user()."""
+        user = self.local.get(user_id)
+        if user is not None:
+            return copy.copy(user)
+
+        shared = self.shared
+        if shared is not None:
+            user = await shared.aget(self._key(user_id))
+            if user is not None:
+                self.shared_hits += 1
+                self.local.set(user_id, user)
+                return copy.copy(user)
+            self.shared_misses += 1
+
+        user = await User.objects.aget(pk=user_id)
+        self.db_loads += 1
+        self.local.set(user_id, user)
+        if shared is not None:
+            await shared.aset(self._key(user_id), user, self.backend_ttl)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        self.local.delete(user_id)
+        shared = self.shared
+        if shared is not None:
+            shared.delete(self._key(user_id))
+
+    def clear(self):
+        self.local.clear()
+        self.shared_hits = self.shared_misses = self.db_loads = 0
+
+    def stats(self):
+        return {
+            "local": self.local.stats(),
+            "shared_enabled": self.backend_alias is not None,
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+            "db_loads": self.db_loads,
+        }
+
+
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+
+def get_user_cache():
+    """Return the process-wide UserCache, building it from settings on first use."""
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = UserCache(
+                    maxsize=auth_settings.USER_CACHE_SIZE,
+                    ttl=auth_settings.USER_CACHE_TTL,
+                    backend_alias=auth_settings.USER_CACHE_BACKEND,
+                    backend_ttl=auth_settings.USER_CACHE_BACKEND_TTL,
+                )
+    return _user_cache
+
+
+def reset_user_cache():
+    """Drop the process-wide cache so the next call rebuilds it from settings."""
+    global _user_cache
+    with _user_cache_lock:
+        _user_cache = None
+
+
+@receiver(setting_changed)
+def reset_user_cache_on_setting_change(*args, **kwargs):
+    if kwargs["setting"] in ("CORE_AUTH", "CACHES"):
+        reset_user_cache()
@@ -13,14 +13,26 @@ from .models import User, Mess, MealType, Coupon, Menu, Feedback, MessItems, Mon
 
 from .serializers import UserSerializer, MessSerializer, RegisterSerializer, MealTypeSerializer, CouponSerializer, BookingSerializer, NotificationSerializer, MessUsageReportSerializer, AuditLogSerializer
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
-from django.contrib.auth.hashers import check_password
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from core.permissions import IsSelfOrAdmin, HasRole, HasPermission, AdminOrStaff, has_role, has_permission
-from core.auth import create_tokens_with_roles
+from core.auth import create_tokens_with_roles, refresh_tokens, ClaimsOnlyJWTAuthentication, compute_user_roles, get_user_permissions
+from core.conf import auth_settings
+from core.user_cache import get_user_cache
+from core.token_cache import get_token_cache, introspect_tokens
+from core.middleware import resolution_stats
+from core.password_pool import get_password_pool, PasswordPoolSaturated
+from core.revocation import get_revocation_list
+from core.token_version import bump_token_version, get_token_version_cache
+from core.throttle import get_login_throttle
+from core.principal import ClaimsPrincipal
+from core.pagination import KeysetPagination
+from core.booking import AlreadyBooked, SlotFull, book_slot, book_slots, cancel_booking
 import uuid
 
 # Add Pydantic imports
-from .pydantic_models import UserPydantic, MessPydantic, CouponPydantic
+from .pydantic_models import UserPydantic, MessPydantic, CouponPydantic, normalize_phone
 from pydantic import ValidationError
 
 class DualValidationMixin:
@@ -132,6 +144,8 @@ class AdminCreateView(APIView):
 
 
 class MessListCreateView(APIView):
+    # is_staff for the POST check comes from the token, so no auth query
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -197,6 +211,51 @@ class BaseLoginMixin(APIView):
     """Shared helper for both login views."""
     permission_classes = [AllowAny]
 
+    # Everything the login checks, the password check and create_tokens_with_roles read
+    LOGIN_FIELDS = (
+        'user_id', 'name', 'email', 'phone', 'password', 'is_active',
+        'is_staff', 'is_superuser', 'token_version', 'role_version',
+    )
+
+    def _find_user(self, normalized_phone):
+        """One probe on the phone_normalized unique index, loading only LOGIN_FIELDS."""
+        return User.objects.only(*self.LOGIN_FIELDS).get(phone_normalized=normalized_phone)
+
+    def _check_password(self, password, user):
+        """
+        Verify on the bounded password pool so hashing can't occupy every worker,
+        upgrading hashes stored with outdated hasher parameters on success.
+        Raises PasswordPoolSaturated when the pool is full.
+        """
+        valid, new_encoded = get_password_pool().verify_and_update(password, user.password)
+        if valid and new_encoded:
+            user.password = new_encoded
+            user.save(update_fields=['password'])
+        return valid
+
+    def _throttled_response(self, request, phone):
+        """
+        429 if this phone or client IP is over its login rate, else None.
+        Runs before the user lookup so rejected attempts cost no query or hash.
+        """
+        retry_after = get_login_throttle().check(request, phone)
+        if not retry_after:
+            return None
+        response = Response(
+            {"detail": "Too many login attempts, please retry later"},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        response["Retry-After"] = str(retry_after)
+        return response
+
+    def _saturated_response(self, exc):
+        response = Response(
+            {"detail": "Too many logins in progress, please retry shortly"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+        response["Retry-After"] = str(exc.retry_after)
+        return response
+
     def _issue_tokens(self, user):
         # Use the new role-based token generation
         token_data = create_tokens_with_roles(user)
@@ -218,8 +277,13 @@ class StudentLoginView(BaseLoginMixin):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        phone = normalize_phone(str(phone))
+        throttled = self._throttled_response(request, phone)
+        if throttled:
+            return throttled
+
         try:
-            user = User.objects.get(phone=phone)
+            user = self._find_user(phone)
         except User.DoesNotExist:
             return Response(
                 {"detail": "Invalid credentials"},
@@ -233,7 +297,12 @@ class StudentLoginView(BaseLoginMixin):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if check_password(password, user.password):
+        try:
+            valid = self._check_password(password, user)
+        except PasswordPoolSaturated as exc:
+            return self._saturated_response(exc)
+
+        if valid:
             return self._issue_tokens(user)
 
         return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
@@ -254,8 +323,13 @@ class AdminLoginView(BaseLoginMixin):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        phone = normalize_phone(str(phone))
+        throttled = self._throttled_response(request, phone)
+        if throttled:
+            return throttled
+
         try:
-            user = User.objects.get(phone=phone)
+            user = self._find_user(phone)
         except User.DoesNotExist:
             return Response(
                 {"detail": "Invalid credentials"},
@@ -269,10 +343,99 @@ class AdminLoginView(BaseLoginMixin):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if check_password(password, user.password):
+        try:
+            valid = self._check_password(password, user)
+        except PasswordPoolSaturated as exc:
+            return self._saturated_response(exc)
+
+        if valid:
             return self._issue_tokens(user)
 
         return Response({"detail": "Invalid credentials"}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenRefreshView(APIView):
+    """
+    Accepts {"refresh": "<token>"} and returns a new access token that keeps
+    the refresh token's role/permission claims (see core.auth.refresh_tokens).
+    A "refresh" key is included when the refresh token was rotated or its
+    claims had to be re-derived.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get_authenticate_header(self, request):
+        # Keeps invalid refresh tokens at 401 (DRF answers 403 without a header)
+        return 'Bearer realm="api"'
+
+    def post(self, request):
+        raw_refresh = request.data.get("refresh")
+        if not raw_refresh:
+            return Response({"refresh": ["This field is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(refresh_tokens(raw_refresh), status=status.HTTP_200_OK)
+
+
+class TokenIntrospectView(APIView):
+    """
+    Batch token check for scanner devices and the kitchen display.
+    Accepts {"tokens": ["<access token>", ...]} and returns
+    {"results": [{"active": true, "sub": 7, "exp": 1700000000, "roles": [...]}, ...]}
+    in the same order; rejected tokens are just {"active": false}.
+    Served from the verified-token cache; no user rows are loaded.
+    """
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
+    permission_classes = [AdminOrStaff]
+
+    def post(self, request):
+        tokens = request.data.get("tokens")
+        max_tokens = auth_settings.INTROSPECTION_MAX_TOKENS
+        if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+            return Response({"tokens": ["A list of token strings is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(tokens) > max_tokens:
+            return Response({"tokens": [f"At most {max_tokens} tokens per request."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = Response({"results": introspect_tokens(tokens)}, status=status.HTTP_200_OK)
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+class LogoutView(APIView):
+    """
+    Revokes the presented access token and, if given, the refresh token
+    from the same login. Accepts {"refresh": "<token>"} (optional).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revocations = get_revocation_list()
+        user_id = request.user.pk
+
+        refresh = request.data.get("refresh")
+        if refresh:
+            try:
+                refresh_token = RefreshToken(refresh)
+            except TokenError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            # simplejwt may store the id as a string
+            if str(refresh_token.get(api_settings.USER_ID_CLAIM)) != str(user_id):
+                return Response({"detail": "Refresh token belongs to another user"}, status=status.HTTP_400_BAD_REQUEST)
+            revocations.revoke(refresh_token, reason="logout")
+
+        revocations.revoke(request.auth, reason="logout")
+        return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
+
+
+class LogoutAllView(APIView):
+    """
+    Retires every access and refresh token issued to the caller so far,
+    on all devices, by bumping their token generation.
+    """
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        bump_token_version(request.user.pk)
+        return Response({"detail": "Logged out on all devices"}, status=status.HTTP_200_OK)
     
 
 class MealSlotView(APIView):
@@ -374,7 +537,7 @@ class ValidateCouponView(APIView):
         except Coupon.DoesNotExist:
             return Response({"detail": "Invalid coupon"}, status=404)
 
-        if coupon.user != request.user:
+        if coupon.user_id != request.user.pk:
             return Response({"detail": "You are not allowed to use this coupon"}, status=403)
 
         if coupon.cancelled:
@@ -389,7 +552,7 @@ class MyCouponListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        coupons = Coupon.objects.filter(user=request.user)
+        coupons = Coupon.objects.filter(user_id=request.user.pk)
         return Response(CouponSerializer(coupons, many=True).data)
 
 # Bookings
@@ -400,10 +563,13 @@ class BookingView(APIView):
         if request.user.is_staff:
             bookings = Booking.objects.all()
         else:
-            bookings = Booking.objects.filter(user=request.user)
+            bookings = Booking.objects.filter(user_id=request.user.pk)
 
-        serializer = BookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+        # One page at a time, newest first (?cursor=..., ?page_size=...)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(bookings.select_related('user', 'meal_slot__mess'), request, view=self)
+        serializer = BookingSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request):
         student_id  = request.data.get("userId")
@@ -412,22 +578,109 @@ class BookingView(APIView):
         if None in [student_id, slot_id]:
             return Response({"detail": "userId and mealSlotId are required"}, status=400)
 
+        if str(student_id) != str(request.user.pk) and not request.user.is_staff:
+            return Response({"detail": "You can only book meals for yourself"}, status=403)
+
         try:
-            user_obj = User.objects.get(pk=student_id)
-            slot     = MealType.objects.get(pk=slot_id)
-        except (User.DoesNotExist, MealType.DoesNotExist):
+            # The caller is already loaded; only staff booking for others needs a lookup
+            if str(student_id) == str(request.user.pk):
+                user_obj = request.user.user if isinstance(request.user, ClaimsPrincipal) else request.user
+            else:
+                user_obj = User.objects.get(pk=student_id)
+            slot     = MealType.objects.select_related('mess').get(pk=slot_id)
+        except (User.DoesNotExist, MealType.DoesNotExist, ValueError):
             return Response({"detail": "User or meal slot not found"}, status=404)
 
-        if (request.user != user_obj) and (not request.user.is_staff):
-            return Response({"detail": "You can only book meals for yourself"}, status=403)
-
-        if Booking.objects.filter(user=user_obj, meal_slot=slot, cancelled=False).exists():
+        # No exists() pre-check: the (user, meal_slot) constraint rejects duplicates
+        try:
+            booking = book_slot(user_obj, slot)
+        except SlotFull:
+            return self._slot_full_response(slot)
+        except AlreadyBooked:
             return Response({"detail": "Meal already booked"}, status=400)
-
-        booking = Booking.objects.create(user=user_obj, meal_slot=slot)
         return Response(BookingSerializer(booking).data, status=201)
+
+    def _slot_full_response(self, slot):
+        # Final answer, not a transient error: no Retry-After
+        return Response(
+            {"detail": "Meal slot is full", "capacity": slot.capacity},
+            status=status.HTTP_409_CONFLICT,
+        )
     
     # Booking.objects.active()  # gets all non-cancelled bookings
+
+
+class BookingBulkView(APIView):
+    """
+    Books many meal slots (e.g. a whole week) in one request.
+    Accepts either an explicit list or a pattern over one mess's slots:
+    {"mealSlotIds": [3, 4, 5]}
+    {"messId": 2, "mealTypes": ["Lunch", "Dinner"]}    # mealTypes optional
+    plus an optional "userId" (staff only; defaults to the caller).
+    Returns {"userId": 7, "booked": 2, "results": [{"mealSlotId": 3,
+    "status": "booked", "bookingId": 41}, {"mealSlotId": 4, "status": "full"}, ...]}
+    with status one of booked / already_booked / full / not_found.
+    """
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    max_slots = 50
+
+    def post(self, request):
+        user_id = request.data.get("userId", request.user.pk)
+        if not self._is_id(user_id):
+            return Response({"userId": ["An integer user id is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if user_id != request.user.pk:
+            if not request.user.is_staff:
+                return Response({"detail": "You can only book meals for yourself"}, status=403)
+            if not User.objects.filter(pk=user_id).exists():
+                return Response({"detail": "User not found"}, status=404)
+
+        slot_ids, errors = self._slot_ids(request.data)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        outcomes = book_slots(user_id, slot_ids)
+        results = []
+        for slot_id in slot_ids:
+            outcome, booking = outcomes[slot_id]
+            result = {"mealSlotId": slot_id, "status": outcome}
+            if booking is not None:
+                result["bookingId"] = booking.booking_id
+            results.append(result)
+        booked = sum(1 for result in results if "bookingId" in result)
+        return Response({"userId": user_id, "booked": booked, "results": results}, status=status.HTTP_200_OK)
+
+    def _slot_ids(self, data):
+        """The requested slot ids, in order and without repeats, or an error dict."""
+        if "mealSlotIds" in data:
+            slot_ids = data["mealSlotIds"]
+            if not isinstance(slot_ids, list) or not slot_ids or not all(self._is_id(slot_id) for slot_id in slot_ids):
+                return None, {"mealSlotIds": ["A non-empty list of meal slot ids is required."]}
+            slot_ids = list(dict.fromkeys(slot_ids))
+        elif "messId" in data:
+            if not self._is_id(data["messId"]):
+                return None, {"messId": ["An integer mess id is required."]}
+            meal_types = data.get("mealTypes")
+            if meal_types is not None and not (
+                    isinstance(meal_types, list) and all(isinstance(meal_type, str) for meal_type in meal_types)):
+                return None, {"mealTypes": ["A list of meal type names is required."]}
+            slots = MealType.objects.filter(mess_id=data["messId"])
+            if meal_types is not None:
+                slots = slots.filter(type__in=meal_types)
+            slot_ids = list(slots.order_by('pk').values_list('pk', flat=True)[:self.max_slots + 1])
+            if not slot_ids:
+                return None, {"detail": "No meal slots match"}
+        else:
+            return None, {"detail": "mealSlotIds or messId is required"}
+
+        if len(slot_ids) > self.max_slots:
+            return None, {"detail": f"At most {self.max_slots} meal slots per request."}
+        return slot_ids, None
+
+    @staticmethod
+    def _is_id(value):
+        # JSON true/false would pass as 1/0
+        return isinstance(value, int) and not isinstance(value, bool)
     
 
 class BookingDeleteView(APIView):
@@ -436,7 +689,7 @@ class BookingDeleteView(APIView):
     def delete(self, request, booking_id):
         booking = get_object_or_404(Booking, pk=booking_id)
 
-        if (booking.user != request.user) and (not request.user.is_staff):
+        if (booking.user_id != request.user.pk) and (not request.user.is_staff):
             return Response({"detail": "Not authorized to cancel"}, status=403)
 
         if booking.cancelled:
@@ -444,8 +697,9 @@ class BookingDeleteView(APIView):
 
         #cancellation allowed until 1 hr of booked meal-slot
         if booking.can_cancel():
-            booking.cancelled = True
-            booking.save()
+            # Frees the seat in the same transaction
+            if not cancel_booking(booking):
+                return Response({"detail": "Booking already cancelled"}, status=400)
             return Response({"message": "Booking cancelled"}, status=204)
         else:
             return Response({"detail": "Cancellation window expired (1 hour limit)"}, status=403)
@@ -458,11 +712,14 @@ class BookingHistoryView(APIView):
         if request.user.user_id != int(userId) and not request.user.is_staff:
             return Response({"detail": "Permission denied."}, status=403)
 
-        bookings = Booking.objects.filter(user__user_id=userId).order_by('-created_at')
-        serializer = BookingSerializer(bookings, many=True)
-        return Response(serializer.data)
+        bookings = Booking.objects.filter(user_id=userId).select_related('user', 'meal_slot__mess')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(bookings, request, view=self)
+        serializer = BookingSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 class MealAvailabilityView(APIView):
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -568,11 +825,31 @@ class AuditLogView(APIView):
         return Response(serializer.data)
 
 
+class AuthCacheStatsView(APIView):
+    """
+    Hit/miss counters of the authentication caches, for confirming DB load drop.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "user_cache": get_user_cache().stats(),
+            "token_cache": get_token_cache().stats(),
+            "token_resolution": resolution_stats.stats(),
+            "password_pool": get_password_pool().stats(),
+            "revocation": get_revocation_list().stats(),
+            "token_version": get_token_version_cache().stats(),
+            "login_throttle": get_login_throttle().stats(),
+        })
+
+
 class TokenInfoView(APIView):
     """
     View to demonstrate role-based token information.
     Optimized to use token-based roles and permissions.
+    roll_no/room_no are not token claims and come from the user cache.
     """
+    authentication_classes = [ClaimsOnlyJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
@@ -581,12 +858,12 @@ class TokenInfoView(APIView):
         Uses token-based data for better performance.
         """
         # Get roles and permissions from token (already extracted during authentication)
-        roles = getattr(request.user, 'roles', [])
-        permissions = getattr(request.user, 'permissions', [])
+        principal = request.user.principal
+        roles = list(principal.roles)
+        permissions = list(principal.permissions)
         
-        # If not available from token, fallback to computation (for backward compatibility)
+        # If not available from token, fallback to the precomputed role matrix
         if not roles:
-            from core.auth import compute_user_roles, get_user_permissions
             roles = compute_user_roles(request.user)
             permissions = get_user_permissions(request.user, roles)
         
@@ -622,7 +899,7 @@ class RoleBasedTestView(APIView):
     def get(self, request):
         return Response({
             "message": "Access granted! You have admin or staff role.",
-            "user_roles": getattr(request.user, 'roles', []),
+            "user_roles": request.user.principal.roles,
             "endpoint": "Admin/Staff only endpoint"
         })
 
@@ -636,7 +913,7 @@ class PermissionBasedTestView(APIView):
     def get(self, request):
         return Response({
             "message": "Access granted! You have user.read and mess.read permissions.",
-            "user_permissions": getattr(request.user, 'permissions', []),
+            "user_permissions": request.user.principal.permissions,
             "endpoint": "Permission-based endpoint"
         })
 
@@ -650,7 +927,7 @@ class SuperUserOnlyView(APIView):
     def get(self, request):
         return Response({
             "message": "Superuser access granted!",
-            "user_roles": getattr(request.user, 'roles', []),
+            "user_roles": request.user.principal.roles,
             "endpoint": "Superuser only endpoint"
         })
 
@@ -664,7 +941,7 @@ class StudentOnlyView(APIView):
     def get(self, request):
         return Response({
             "message": "Student access granted!",
-            "user_roles": getattr(request.user, 'roles', []),
+            "user_roles": request.user.principal.roles,
             "endpoint": "Student only endpoint"
         })
 
@@ -678,7 +955,7 @@ class FlexiblePermissionView(APIView):
     def get(self, request):
         return Response({
             "message": "Access granted! You have at least one of the required permissions.",
-            "user_permissions": getattr(request.user, 'permissions', []),
+            "user_permissions": request.user.principal.permissions,
             "endpoint": "Flexible permission endpoint (ANY permission)"
         })
 
@@ -695,8 +972,8 @@ class ComplexPermissionView(APIView):
     def get(self, request):
         return Response({
             "message": "Access granted! You are admin AND have user.delete permission.",
-            "user_roles": getattr(request.user, 'roles', []),
-            "user_permissions": getattr(request.user, 'permissions', []),
+            "user_roles": request.user.principal.roles,
+            "user_permissions": request.user.principal.permissions,
             "endpoint": "Complex permission endpoint (Role + Permission)"
         })
 
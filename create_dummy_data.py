@@ -2,6 +2,12 @@
 """
 Dummy Data Creation Script for Mess Management System
 This script will clean the database and insert comprehensive dummy data.
+
+Passwords are hashed with the configured (slow, production) hasher. For a
+quick local seed, opt in to MD5 for both the script and the server:
+
+    PASSWORD_HASHER_PROFILE=fast python create_dummy_data.py
+    PASSWORD_HASHER_PROFILE=fast python manage.py runserver
 """
 
 import os
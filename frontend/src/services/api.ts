@@ -144,8 +144,11 @@ class ApiService {
 	}
 
 	// Bookings
-	async getBookings() {
-		return this.get('/booking/');
+	// Booking lists are paginated ({ next, previous, results }, newest first);
+	// these return one page of results. Pass a cursor from next/previous to page.
+	async getBookings(cursor?: string) {
+		const page = await this.get<{ results: any[] }>('/booking/', cursor ? { cursor } : undefined);
+		return page.results;
 	}
 
 	async createBooking(form: any) {
@@ -156,8 +159,9 @@ class ApiService {
 		return this.delete(`/booking/${bookingId}/`);
 	}
 
-	async getBookingHistory(userId: string) {
-		return this.get(`/history/${userId}/`);
+	async getBookingHistory(userId: string, cursor?: string) {
+		const page = await this.get<{ results: any[] }>(`/history/${userId}/`, cursor ? { cursor } : undefined);
+		return page.results;
 	}
 
 	async getMealAvailability() {